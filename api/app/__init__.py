@@ -27,6 +27,8 @@ def register_extensions(app):
 
 
 def wire_services(app):
+    from app.common.cache import build_cache
+    from app.data_mining.visualization.cache import MeasureCache
     from app.repositories.clean_dataset_repository import CleanDatasetRepository
     from app.repositories.dataset_repository import DatasetRepository
     from app.repositories.project_repository import ProjectRepository
@@ -50,18 +52,23 @@ def wire_services(app):
     projects = ProjectRepository(session)
     datasets = DatasetRepository(session)
     cleans = CleanDatasetRepository(session)
+    backend = build_cache(
+        app.config["MEASURE_CACHE_URL"], app.config["MEASURE_CACHE_TTL"], app.config["MEASURE_CACHE_MAX_ENTRIES"]
+    )
+    cache = None if backend is None else MeasureCache(backend)
+    chunk_size = app.config["CSV_CHUNK_SIZE"]
 
     # Cada domínio registra seu serviço nesta tabela conforme é implementado.
     services = {
         "auth": AuthService(users),
         "user": UserService(users, storage),
         "project": ProjectService(projects, storage),
-        "dataset": DatasetService(datasets, projects, storage),
-        "cleaning": DataCleaningService(datasets, cleans, storage),
-        "normalization": DataNormalizationService(datasets, cleans, storage),
-        "reduction": DataReductionService(datasets, cleans, storage),
+        "dataset": DatasetService(datasets, projects, storage, chunk_size=chunk_size, cache=cache),
+        "cleaning": DataCleaningService(datasets, cleans, storage, chunk_size=chunk_size, cache=cache),
+        "normalization": DataNormalizationService(datasets, cleans, storage, chunk_size=chunk_size, cache=cache),
+        "reduction": DataReductionService(datasets, cleans, storage, chunk_size=chunk_size, cache=cache),
         "classification": ClassificationService(datasets, cleans),
-        "visualization": VisualizationService(datasets, cleans),
+        "visualization": VisualizationService(datasets, cleans, cache=cache),
     }
     app.services = services
 
@@ -0,0 +1,86 @@
+"""Backends de cache chave -> valor com expiração (TTL) e limite de tamanho.
+
+``MemoryCache`` vale por processo e serve de substituto local; ``RedisCache`` é compartilhado
+entre os workers e só exige o pacote ``redis`` quando é configurado. Os dois expõem ``get``,
+``set`` e ``delete_prefix``; os valores precisam ser serializáveis em JSON.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryCache:
+    """LRU com TTL: a entrada menos usada sai quando passa de ``max_entries``."""
+
+    def __init__(self, ttl: int = 3600, max_entries: int = 1024, clock=time.monotonic):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """Cache compartilhado; o TTL vai em cada chave e o limite de tamanho é o ``maxmemory`` do servidor
+    (com ``maxmemory-policy allkeys-lru``).
+    """
+
+    def __init__(self, client, ttl: int = 3600, namespace: str = "easyminer:"):
+        self._client = client
+        self._ttl = ttl
+        self._namespace = namespace
+
+    @classmethod
+    def from_url(cls, url: str, **options) -> "RedisCache":
+        import redis
+
+        return cls(redis.Redis.from_url(url), **options)
+
+    def get(self, key: str):
+        raw = self._client.get(self._namespace + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value) -> None:
+        self._client.set(self._namespace + key, json.dumps(value), ex=self._ttl)
+
+    def delete_prefix(self, prefix: str) -> None:
+        keys = list(self._client.scan_iter(match=f"{self._namespace}{prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+def build_cache(url: str | None, ttl: int, max_entries: int):
+    """``RedisCache`` quando há URL configurada; senão ``MemoryCache``. TTL 0 desliga o cache."""
+    if not ttl:
+        return None
+    if url:
+        return RedisCache.from_url(url, ttl=ttl)
+    return MemoryCache(ttl=ttl, max_entries=max_entries)
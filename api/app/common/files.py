@@ -1,4 +1,7 @@
+import hashlib
+import shutil
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
 
 import pandas as pd
 
@@ -7,8 +10,45 @@ def bytes_to_mb_label(num_bytes: int) -> str:
     return f"{round(num_bytes / (1024 * 1024), 4)}MB"
 
 
-def read_csv(file_url: str) -> pd.DataFrame:
-    return pd.read_csv(file_url)
+def read_csv(file_url: str, **options) -> pd.DataFrame:
+    return pd.read_csv(file_url, **options)
+
+
+def iter_csv(source, chunk_size: int, **options):
+    """Lê o CSV em blocos de ``chunk_size`` linhas; a memória fica limitada ao tamanho do bloco."""
+    return pd.read_csv(source, chunksize=chunk_size, **options)
+
+
+def content_hash(stream, block_size: int = 1024 * 1024) -> str:
+    """sha256 do conteúdo, lido em blocos; o cursor volta ao início."""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for block in iter(lambda: stream.read(block_size), b""):
+        digest.update(block.encode() if isinstance(block, str) else block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def spool_upload(stream, max_memory: int = 8 * 1024 * 1024):
+    """Copia um upload para um arquivo temporário próprio (memória até ``max_memory``, depois disco).
+
+    O Flask fecha os arquivos da requisição quando a view retorna; respostas em streaming precisam
+    de uma cópia que sobreviva até o último bloco.
+    """
+    spool = SpooledTemporaryFile(max_size=max_memory)
+    shutil.copyfileobj(stream, spool)
+    spool.seek(0)
+    return spool
+
+
+def missing_value_options(features: list[str], sentinels: list[str]) -> dict:
+    """Opções do parser que já leem as sentinelas como NA, só nas colunas escolhidas.
+
+    As sentinelas padrão do pandas (vazio, ``null``, ``NaN``...) continuam valendo para todas as
+    colunas; as do usuário entram por coluna, então ``0`` ou ``?`` não viram NA fora das features.
+    """
+    na_values = {feature: list(sentinels) for feature in features}
+    return {"na_values": na_values, "keep_default_na": True}
 
 
 def dataframe_to_csv_upload(df: pd.DataFrame, filename: str):
@@ -19,3 +59,21 @@ def dataframe_to_csv_upload(df: pd.DataFrame, filename: str):
     buffer.filename = filename
     buffer.content_type = "text/csv"
     return buffer, size_label
+
+
+def chunks_to_csv_upload(chunks, filename: str, max_memory: int = 8 * 1024 * 1024):
+    """Versão em blocos de ``dataframe_to_csv_upload``: escreve cada bloco assim que chega.
+
+    O arquivo fica em memória até ``max_memory`` e depois vai para disco, então o consumo não
+    depende do tamanho do dataset.
+    """
+    spool = SpooledTemporaryFile(max_size=max_memory)
+    header = True
+    for chunk in chunks:
+        spool.write(chunk.to_csv(header=header, index=False).encode())
+        header = False
+    size_label = bytes_to_mb_label(spool.tell())
+    spool.seek(0)
+    spool.filename = filename
+    spool.content_type = "text/csv"
+    return spool, size_label
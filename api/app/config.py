@@ -6,6 +6,15 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_DATABASE_URI")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+    CSV_CHUNK_SIZE = 50_000
+    # precisão dos sketches de quantis do perfil: erro de posto em torno de 1.7 / k
+    QUANTILE_SKETCH_K = int(os.getenv("QUANTILE_SKETCH_K", 200))
+    # contadores do sketch de valores frequentes (moda) por coluna: erro de contagem até n / (capacidade + 1)
+    FREQUENT_ITEMS_CAPACITY = int(os.getenv("FREQUENT_ITEMS_CAPACITY", 256))
+    # cache das medidas de visualização; sem URL fica em memória, por processo; TTL 0 desliga
+    MEASURE_CACHE_URL = os.getenv("MEASURE_CACHE_URL")
+    MEASURE_CACHE_TTL = int(os.getenv("MEASURE_CACHE_TTL", 3600))
+    MEASURE_CACHE_MAX_ENTRIES = 1024
     S3_KEY = os.getenv("S3_KEY")
     S3_BUCKET = os.getenv("S3_BUCKET")
     S3_SECRET = os.getenv("S3_SECRET")
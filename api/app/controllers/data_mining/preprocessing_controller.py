@@ -1,7 +1,9 @@
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from flask_login import current_user, login_required
 
 from app.common.decorators import handle_errors
+from app.common.errors import ValidationError
+from app.common.files import spool_upload
 from app.common.responses import success_payload
 from app.schemas.data_mining.cleaning import DataCleaningSchema
 from app.schemas.data_mining.normalization import DataNormalizationSchema
@@ -25,13 +27,17 @@ def data_cleaning(dataset_id):
             $ref: '#/components/schemas/DataCleaningSchema'
     responses:
       200:
-        description: Limpeza de dados realizada com sucesso
+        description: Limpeza de dados realizada com sucesso (com dry_run, só a prévia)
       401:
         description: Não autorizado
       404:
         description: Dataset não encontrado
     """
     data = DataCleaningSchema.model_validate(request.get_json(silent=True) or {})
+    if data.dry_run:
+        report = current_app.services["cleaning"].preview(dataset_id, data, current_user.id)
+        body, status = success_payload("Prévia da limpeza de dados gerada com sucesso!", {"dry_run": report})
+        return jsonify(body), status
     clean = current_app.services["cleaning"].clean(dataset_id, data, current_user.id)
     payload = {"clean_dataset": {"id": clean.id, "size_file": clean.size_file, "file_url": clean.file_url}}
     body, status = success_payload("Limpeza de dados realizada com sucesso!", payload)
@@ -53,19 +59,69 @@ def data_normalization(dataset_id):
             $ref: '#/components/schemas/DataNormalizationSchema'
     responses:
       200:
-        description: Normalização de dados realizada com sucesso
+        description: Normalização de dados realizada com sucesso (com dry_run, só a prévia)
       401:
         description: Não autorizado
       404:
         description: Dataset não encontrado
     """
     data = DataNormalizationSchema.model_validate(request.get_json(silent=True) or {})
+    if data.dry_run:
+        report = current_app.services["normalization"].preview(dataset_id, data, current_user.id)
+        body, status = success_payload("Prévia da normalização de dados gerada com sucesso!", {"dry_run": report})
+        return jsonify(body), status
     clean = current_app.services["normalization"].normalize(dataset_id, data, current_user.id)
-    payload = {"normalized_dataset": {"id": clean.id, "size_file": clean.size_file, "file_url": clean.file_url}}
+    payload = {"normalized_dataset": {
+        "id": clean.id, "size_file": clean.size_file, "file_url": clean.file_url, "params": clean.params,
+    }}
     body, status = success_payload("Normalização de dados realizada com sucesso!", payload)
     return jsonify(body), status
 
 
+@preprocessing_bp.post("/data-normalization/<int:dataset_id>/transform")
+@login_required
+@handle_errors
+def data_normalization_transform(dataset_id):
+    """Aplica a normalização salva do dataset a um CSV novo, sem reajustar.
+    ---
+    tags:
+      - Preprocessing
+    requestBody:
+      content:
+        multipart/form-data:
+          schema:
+            type: object
+            properties:
+              csv_file:
+                type: string
+                format: binary
+    responses:
+      200:
+        description: CSV normalizado (text/csv, enviado em blocos)
+      401:
+        description: Não autorizado
+      404:
+        description: Dataset ou parâmetros de normalização não encontrados
+      422:
+        description: Dados inválidos
+    """
+    csv_file = request.files.get("csv_file")
+    if not csv_file:
+        raise ValidationError("Dados inválidos!", {"csv_file": ["O campo é obrigatório."]})
+    source = spool_upload(csv_file.stream)
+    try:
+        rows = current_app.services["normalization"].transform(dataset_id, source, current_user.id)
+    except Exception:
+        source.close()
+        raise
+    response = Response(
+        rows, mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=dataset_{dataset_id}_normalized.csv"},
+    )
+    response.call_on_close(source.close)
+    return response
+
+
 @preprocessing_bp.post("/data-reduction/<int:dataset_id>")
 @login_required
 @handle_errors
@@ -81,14 +137,20 @@ def data_reduction(dataset_id):
             $ref: '#/components/schemas/DataReductionSchema'
     responses:
       200:
-        description: Redução de dados realizada com sucesso
+        description: Redução de dados realizada com sucesso (com dry_run, só a prévia)
       401:
         description: Não autorizado
       404:
         description: Dataset não encontrado
     """
     data = DataReductionSchema.model_validate(request.get_json(silent=True) or {})
+    if data.dry_run:
+        report = current_app.services["reduction"].preview(dataset_id, data, current_user.id)
+        body, status = success_payload("Prévia da redução de dados gerada com sucesso!", {"dry_run": report})
+        return jsonify(body), status
     clean = current_app.services["reduction"].reduce(dataset_id, data, current_user.id)
-    payload = {"reduced_dataset": {"id": clean.id, "size_file": clean.size_file, "file_url": clean.file_url}}
+    payload = {"reduced_dataset": {
+        "id": clean.id, "size_file": clean.size_file, "file_url": clean.file_url, "params": clean.params,
+    }}
     body, status = success_payload("Redução de dados realizada com sucesso!", payload)
     return jsonify(body), status
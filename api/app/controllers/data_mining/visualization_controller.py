@@ -3,7 +3,7 @@ from flask_login import current_user, login_required
 
 from app.common.decorators import handle_errors
 from app.common.responses import success_payload
-from app.schemas.data_mining.visualization import VisualizationSchema
+from app.schemas.data_mining.visualization import VisualizationBatchSchema, VisualizationSchema
 
 visualization_bp = Blueprint("data-visualization", __name__)
 
@@ -44,6 +44,35 @@ def _make_handler(group, label):
     return handler
 
 
+@visualization_bp.post("/batch/<int:dataset_id>")
+@login_required
+@handle_errors
+def visualization_batch(dataset_id):
+    """Executa várias medidas de visualização com uma única leitura do dataset.
+    ---
+    tags:
+      - Visualization
+    requestBody:
+      content:
+        application/json:
+          schema:
+            $ref: '#/components/schemas/VisualizationBatchSchema'
+    responses:
+      200:
+        description: Resultados indexados pela key de cada medida
+      401:
+        description: Não autorizado
+      404:
+        description: Dataset não encontrado
+      422:
+        description: Grupo, método ou features inválidos
+    """
+    data = VisualizationBatchSchema.model_validate(request.get_json(silent=True) or {})
+    results = current_app.services["visualization"].measure_batch(dataset_id, data, current_user.id)
+    body, status = success_payload("Visualização de medidas realizada com sucesso!", results)
+    return jsonify(body), status
+
+
 for _path, (_group, _label) in _ROUTES.items():
     visualization_bp.add_url_rule(
         f"/{_path}/<int:dataset_id>",
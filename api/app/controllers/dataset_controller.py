@@ -1,4 +1,4 @@
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from flask_login import current_user, login_required
 
 from app.common.decorators import handle_errors
@@ -150,3 +150,26 @@ def delete_dataset(dataset_id):
         "Base de dados deletada com sucesso!", DatasetReadSchema.model_validate(dataset).model_dump()
     )
     return jsonify(body), status
+
+
+@dataset_bp.get("/<int:dataset_id>/clean-dataset/download")
+@login_required
+@handle_errors
+def download_clean_dataset(dataset_id):
+    """Baixa o CSV completo do dataset limpo, materializando views derivadas.
+    ---
+    tags:
+      - Datasets
+    responses:
+      200:
+        description: CSV do dataset limpo (text/csv, enviado em blocos)
+      401:
+        description: Não autorizado
+      404:
+        description: Base de dados ou dataset limpo não encontrado
+    """
+    rows = current_app.services["dataset"].export_clean(dataset_id, current_user.id)
+    return Response(
+        rows, mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=dataset_{dataset_id}_clean.csv"},
+    )
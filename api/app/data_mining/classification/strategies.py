@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 
 import pandas as pd
+from scipy import sparse
 from sklearn.metrics import classification_report, confusion_matrix
 from sklearn.model_selection import train_test_split
 from sklearn.neighbors import KNeighborsClassifier
 
 from app.common.errors import ValidationError
+from app.data_mining.encoding import categorical_features, encode_features
 
 
 class ClassificationStrategy(ABC):
@@ -20,13 +22,22 @@ class KNNStrategy(ClassificationStrategy):
 
     def run(self, df, features, target, params):
         X, y = df[features], df[target]
-        mask = ~(X.isnull().any(axis=1) | y.isnull())
+        encoding = params.get("encoding")
+        # com codificação, categoria ausente vira linha de zeros; só nulos numéricos descartam a amostra
+        checked = X.drop(columns=categorical_features(X, features)) if encoding else X
+        mask = ~(checked.isnull().any(axis=1) | y.isnull())
         X, y = X[mask], y[mask]
         if len(X) == 0:
             raise ValidationError("Dados inválidos!", {"dataset": ["Todas as amostras possuem valores ausentes."]})
 
         k = params["k_neighbors"]
         metric = params["distance_metric"]
+        if encoding:
+            if metric == "mahalanobis":
+                raise ValidationError(
+                    "Dados inválidos!", {"distance_metric": ["Mahalanobis não aceita features codificadas."]}
+                )
+            X, _ = encode_features(X, features, encoding, params.get("hash_features") or 1024)
         test_size = params["test_size"]
         try:
             X_train, X_test, y_train, y_test = train_test_split(
@@ -37,10 +48,11 @@ class KNNStrategy(ClassificationStrategy):
                 "Dados inválidos!",
                 {"dataset": [f"Não foi possível dividir os dados para treino/teste: {exc}"]},
             )
-        if k > len(X_train):
+        n_train = X_train.shape[0]
+        if k > n_train:
             raise ValidationError(
                 "Dados inválidos!",
-                {"k_neighbors": [f"k ({k}) não pode ser maior que o número de amostras de treino ({len(X_train)})."]},
+                {"k_neighbors": [f"k ({k}) não pode ser maior que o número de amostras de treino ({n_train})."]},
             )
         model = KNeighborsClassifier(n_neighbors=k, metric=metric)
         model.fit(X_train, y_train)
@@ -53,8 +65,8 @@ class KNNStrategy(ClassificationStrategy):
                 "features_used": features, "target": target,
             },
             "dataset_info": {
-                "total_samples": len(X), "features_count": len(features),
-                "train_samples": len(X_train), "test_samples": len(X_test),
+                "total_samples": X.shape[0], "features_count": len(features), "encoded_features": X.shape[1],
+                "train_samples": X_train.shape[0], "test_samples": X_test.shape[0],
                 "test_size_percentage": round(test_size * 100, 2),
                 "unique_classes": len(y.unique()),
                 "class_distribution": y.value_counts().to_dict(),
@@ -62,13 +74,19 @@ class KNNStrategy(ClassificationStrategy):
             "performance_metrics": classification_report(y_test, y_pred, output_dict=True, zero_division=0),
             "confusion_matrix": confusion_matrix(y_test, y_pred).tolist(),
             "plot_algorithm": {
-                "x": X_test.iloc[:, 0].tolist(),
-                "y": X_test.iloc[:, 1].tolist() if X_test.shape[1] > 1 else [],
+                "x": _column(X_test, 0),
+                "y": _column(X_test, 1) if X_test.shape[1] > 1 else [],
                 "predicted_labels": y_pred.tolist(), "true_labels": y_test.tolist(),
             },
         }
 
 
+def _column(X, i: int) -> list:
+    if sparse.issparse(X):
+        return X[:, i].toarray().ravel().tolist()
+    return X.iloc[:, i].tolist()
+
+
 _REGISTRY = {s.name: s for s in (KNNStrategy,)}
 
 
@@ -1,45 +1,175 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
 import pandas as pd
+from sklearn.neighbors import KDTree
 
 from app.common.errors import ValidationError
+from app.data_mining.sketches import FrequentItems, MomentSketch, QuantileSketch
 
 
 class MissingValueStrategy(ABC):
     name: str
 
+    @abstractmethod
+    def fill(self, frame: pd.DataFrame, features: list[str], params: dict) -> pd.DataFrame: ...
+
+    # modo em blocos: o sketch acumula a coluna no 1º passo e fill_value decide o preenchimento
+    def sketch(self):
+        raise ValidationError("Dados inválidos!", {"chunked": [f"O método '{self.name}' não roda em blocos."]})
+
+    def fill_value(self, sketch): ...
+
+
+class ColumnFillStrategy(MissingValueStrategy):
+    """Preenche cada coluna de forma independente, com uma estatística global dela."""
+
+    def fill(self, frame, features, params):
+        for column in features:
+            frame[column] = self.apply(frame[column])
+        return frame
+
     @abstractmethod
     def apply(self, series: pd.Series) -> pd.Series: ...
 
+    @abstractmethod
+    def sketch(self): ...
+
+    @abstractmethod
+    def fill_value(self, sketch): ...
+
 
-class MeanFillStrategy(MissingValueStrategy):
+class MeanFillStrategy(ColumnFillStrategy):
     name = "media"
 
     def apply(self, series: pd.Series) -> pd.Series:
         return series.fillna(series.mean().round(4))
 
+    def sketch(self):
+        return MomentSketch()
+
+    def fill_value(self, sketch):
+        return round(sketch.mean, 4) if sketch.count else None
 
-class MedianFillStrategy(MissingValueStrategy):
+
+class MedianFillStrategy(ColumnFillStrategy):
     name = "mediana"
 
     def apply(self, series: pd.Series) -> pd.Series:
         return series.fillna(series.median().round(4))
 
+    def sketch(self):
+        return QuantileSketch()
+
+    def fill_value(self, sketch):
+        # aproximada (KLL) quando a coluna passa de k valores
+        return round(sketch.quantile(0.5), 4) if sketch.count else None
 
-class ModeFillStrategy(MissingValueStrategy):
+
+class ModeFillStrategy(ColumnFillStrategy):
     name = "moda"
 
     def apply(self, series: pd.Series) -> pd.Series:
         mode = series.mode()
         if mode.empty:
-            raise ValidationError(
-                "Dados inválidos!",
-                {"methods": ["Coluna sem valores válidos para calcular a moda."]},
-            )
+            _raise_no_mode()
         return series.fillna(mode.iloc[0])
 
-
-_REGISTRY = {s.name: s for s in (MeanFillStrategy, MedianFillStrategy, ModeFillStrategy)}
+    def sketch(self):
+        return FrequentItems()
+
+    def fill_value(self, sketch):
+        # exata enquanto a coluna tiver até `capacity` valores distintos; depois, Misra–Gries
+        value = sketch.most_common()
+        if value is None:
+            _raise_no_mode()
+        return value
+
+
+class GroupFillStrategy(MissingValueStrategy):
+    """Preenche com a estatística do grupo (``group_by``), num único ``groupby().transform``.
+
+    Grupos sem nenhum valor da feature, e linhas sem chave, caem na estatística global.
+    """
+
+    statistic: str
+
+    def fill(self, frame, features, params):
+        key = params.get("group_by")
+        if not key or key not in frame.columns:
+            raise ValidationError("Dados inválidos!", {"group_by": ["Informe uma coluna existente para agrupar."]})
+        if key in features:
+            raise ValidationError("Dados inválidos!", {"group_by": ["A coluna de grupo não pode ser uma feature."]})
+        by_group = frame.groupby(key)[features].transform(self.statistic).round(4)
+        overall = frame[features].agg(self.statistic).round(4)
+        frame[features] = frame[features].fillna(by_group).fillna(overall)
+        return frame
+
+
+class GroupMeanFillStrategy(GroupFillStrategy):
+    name = "media_por_grupo"
+    statistic = "mean"
+
+
+class GroupMedianFillStrategy(GroupFillStrategy):
+    name = "mediana_por_grupo"
+    statistic = "median"
+
+
+class KNNFillStrategy(MissingValueStrategy):
+    """Média das features faltantes nos ``knn_neighbors`` vizinhos completos mais próximos.
+
+    A distância usa só as features observadas na linha, padronizadas. Linhas com o mesmo padrão
+    de faltantes compartilham uma KD-tree sobre as linhas completas, e as consultas vão em lotes
+    de ``batch_size``: a memória fica em O(linhas completas + lote × k), nunca linhas × linhas.
+    """
+
+    name = "knn"
+
+    def __init__(self, batch_size: int = 10_000):
+        self.batch_size = batch_size
+
+    def fill(self, frame, features, params):
+        # colunas sem nenhum valor ficam como estão, igual ao preenchimento pela média
+        columns = [f for f in features if frame[f].notna().any()]
+        values = frame[columns].to_numpy(dtype=float)
+        missing = np.isnan(values)
+        if not missing.any():
+            return frame
+        overall = np.round(frame[columns].mean().to_numpy(), 4)
+        center, scale = frame[columns].mean().to_numpy(), frame[columns].std(ddof=0).to_numpy()
+        scale[~(scale > 0)] = 1.0
+        complete = values[~missing.any(axis=1)]
+        k = min(params.get("knn_neighbors") or 5, len(complete))
+
+        patterns, inverse = np.unique(missing, axis=0, return_inverse=True)
+        for index, pattern in enumerate(patterns):
+            observed = ~pattern
+            if not pattern.any() or k == 0 or not observed.any():
+                continue
+            tree = KDTree((complete[:, observed] - center[observed]) / scale[observed])
+            rows = np.flatnonzero(inverse.ravel() == index)
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                query = (values[np.ix_(batch, observed)] - center[observed]) / scale[observed]
+                neighbors = tree.query(query, k=k, return_distance=False)
+                values[np.ix_(batch, pattern)] = np.round(complete[:, pattern][neighbors].mean(axis=1), 4)
+        # sem linhas completas (ou sem nada observado na linha), a média global
+        frame[columns] = np.where(np.isnan(values), overall, values)
+        return frame
+
+
+def _raise_no_mode():
+    raise ValidationError(
+        "Dados inválidos!",
+        {"methods": ["Coluna sem valores válidos para calcular a moda."]},
+    )
+
+
+_REGISTRY = {s.name: s for s in (
+    MeanFillStrategy, MedianFillStrategy, ModeFillStrategy, GroupMeanFillStrategy, GroupMedianFillStrategy,
+    KNNFillStrategy,
+)}
 
 
 def get_strategy(name: str) -> MissingValueStrategy:
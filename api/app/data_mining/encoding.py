@@ -0,0 +1,59 @@
+"""Codificação esparsa de features categóricas direto dos códigos de categoria do pandas.
+
+``onehot`` abre uma coluna por categoria; ``hashing`` espalha todas as categorias em
+``hash_features`` colunas compartilhadas, com sinal alternado para as colisões se cancelarem
+na média (o mesmo truque do ``FeatureHasher``). Colunas numéricas entram como estão. O
+resultado é uma ``csr_matrix``: nada é densificado, mesmo com milhares de categorias.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from app.common.errors import ValidationError
+
+ENCODINGS = ("onehot", "hashing")
+
+
+def encode_features(df: pd.DataFrame, features: list[str], encoding: str, hash_features: int = 1024):
+    """Devolve ``(matriz esparsa, nomes das colunas)``; categoria ausente é uma linha de zeros."""
+    if encoding not in ENCODINGS:
+        raise ValidationError("Dados inválidos!", {"encoding": ["Escolha entre 'onehot' ou 'hashing'."]})
+    n_rows = len(df)
+    blocks, names = [], []
+    hashed_rows, hashed_columns, hashed_signs = [], [], []
+    for feature in features:
+        column = df[feature]
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            blocks.append(sparse.csr_matrix(column.to_numpy(dtype=float).reshape(-1, 1)))
+            names.append(feature)
+            continue
+        categorical = column.astype("category").cat
+        codes = categorical.codes.to_numpy()
+        rows = np.flatnonzero(codes >= 0)
+        codes = codes[rows]
+        if encoding == "onehot":
+            width = len(categorical.categories)
+            ones = np.ones(len(rows))
+            blocks.append(sparse.csr_matrix((ones, (rows, codes)), shape=(n_rows, width)))
+            names.extend(f"{feature}={category}" for category in categorical.categories)
+        else:
+            # um hash por categoria (não por linha); as linhas só indexam pelo código
+            labels = np.array([f"{feature}={category}" for category in categorical.categories], dtype=object)
+            hashes = pd.util.hash_array(labels)
+            buckets = (hashes % np.uint64(hash_features)).astype(np.int64)
+            signs = np.where(hashes >> np.uint64(63), -1.0, 1.0)
+            hashed_rows.append(rows)
+            hashed_columns.append(buckets[codes])
+            hashed_signs.append(signs[codes])
+    if encoding == "hashing" and hashed_rows:
+        # entradas repetidas (colisões na mesma linha) são somadas pela csr_matrix; sinais opostos zeram
+        data = (np.concatenate(hashed_signs), (np.concatenate(hashed_rows), np.concatenate(hashed_columns)))
+        hashed = sparse.csr_matrix(data, shape=(n_rows, hash_features))
+        hashed.eliminate_zeros()
+        blocks.append(hashed)
+        names.extend(f"hash_{i}" for i in range(hash_features))
+    return sparse.hstack(blocks, format="csr"), names
+
+
+def categorical_features(df: pd.DataFrame, features: list[str]) -> list[str]:
+    return [f for f in features if not pd.api.types.is_numeric_dtype(df[f]) or pd.api.types.is_bool_dtype(df[f])]
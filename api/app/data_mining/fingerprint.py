@@ -0,0 +1,29 @@
+"""Impressão digital de uma execução de pré-processamento: versão da fonte + parâmetros canônicos.
+
+Duas execuções com a mesma impressão digital produzem o mesmo resultado, então a segunda pode
+devolver o registro já gravado em vez de recalcular e reenviar o arquivo.
+"""
+import hashlib
+import json
+
+# opções que mudam só a forma da resposta, não o conteúdo gravado
+_IGNORED = {"dry_run", "dry_run_rows"}
+
+
+def version_of(record) -> str | None:
+    """Versão do conteúdo de um ``Dataset`` (hash do CSV) ou ``CleanDataset`` (impressão digital)."""
+    return getattr(record, "content_hash", None) or getattr(record, "fingerprint", None)
+
+
+def run_fingerprint(source_version: str | None, step: str, data) -> str | None:
+    if not source_version:
+        return None
+    params = json.dumps(data.model_dump(exclude=_IGNORED), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{source_version}|{step}|{params}".encode()).hexdigest()
+
+
+def matches(existing, step: str, data) -> bool:
+    """O resultado atual veio desta mesma requisição sobre a mesma fonte (reenvio ou script repetido)."""
+    if existing is None or not existing.fingerprint:
+        return False
+    return existing.fingerprint == run_fingerprint(existing.source_version, step, data)
@@ -1,21 +1,51 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler, StandardScaler
 
 from app.common.errors import ValidationError
+from app.data_mining.sketches import MomentSketch
 
 
 class NormalizationStrategy(ABC):
     name: str
 
+    def fit(self, frame: pd.DataFrame) -> dict:
+        """Ajusta um único scaler sobre a matriz de features e devolve os parâmetros por coluna."""
+        scaler = self._scaler().fit(frame.to_numpy(dtype=float))
+        return {
+            column: {key: _to_float(values[i]) for key, values in self._fitted(scaler).items()}
+            for i, column in enumerate(frame.columns)
+        }
+
+    def transform(self, frame: pd.DataFrame, params: dict) -> pd.DataFrame:
+        """Aplica parâmetros já ajustados, sem reajustar — serve para blocos e para CSVs novos."""
+        columns = list(frame.columns)
+        offset, scale = self._affine({c: params[c] for c in columns})
+        values = (frame.to_numpy(dtype=float) - offset) / scale
+        return pd.DataFrame(values, index=frame.index, columns=columns).round(4)
+
     def apply(self, series: pd.Series) -> pd.Series:
-        scaled = self._scaler().fit_transform(series.values.reshape(-1, 1))
-        return pd.Series(scaled.flatten(), index=series.index).round(4)
+        frame = series.to_frame()
+        return self.transform(frame, self.fit(frame)).iloc[:, 0]
+
+    def fit_sketches(self, sketches: dict[str, MomentSketch]) -> dict:
+        """Mesmos parâmetros de ``fit``, calculados a partir de sketches acumulados bloco a bloco."""
+        return {column: self._from_sketch(sketch) for column, sketch in sketches.items()}
 
     @abstractmethod
     def _scaler(self): ...
 
+    @abstractmethod
+    def _from_sketch(self, sketch: MomentSketch) -> dict: ...
+
+    @abstractmethod
+    def _fitted(self, scaler) -> dict[str, np.ndarray]: ...
+
+    @abstractmethod
+    def _affine(self, params: dict) -> tuple[np.ndarray, np.ndarray]: ...
+
 
 class MinMaxStrategy(NormalizationStrategy):
     name = "minmax"
@@ -23,6 +53,19 @@ class MinMaxStrategy(NormalizationStrategy):
     def _scaler(self):
         return MinMaxScaler()
 
+    def _fitted(self, scaler):
+        return {"min": scaler.data_min_, "max": scaler.data_max_}
+
+    def _from_sketch(self, sketch):
+        if not sketch.count:
+            return {"min": None, "max": None}
+        return {"min": sketch.min, "max": sketch.max}
+
+    def _affine(self, params):
+        low = _column_array(params, "min")
+        span = _column_array(params, "max") - low
+        return low, np.where(span == 0, 1.0, span)
+
 
 class ZScoreStrategy(NormalizationStrategy):
     name = "zscore"
@@ -30,6 +73,29 @@ class ZScoreStrategy(NormalizationStrategy):
     def _scaler(self):
         return StandardScaler()
 
+    def _fitted(self, scaler):
+        # scale_ já troca desvio zero por 1, igual ao que o StandardScaler faria no transform
+        return {"mean": scaler.mean_, "std": scaler.scale_}
+
+    def _from_sketch(self, sketch):
+        if not sketch.count:
+            return {"mean": None, "std": None}
+        std = sketch.std(ddof=0)
+        return {"mean": sketch.mean, "std": std if std > 0 else 1.0}
+
+    def _affine(self, params):
+        std = _column_array(params, "std")
+        return _column_array(params, "mean"), np.where(std == 0, 1.0, std)
+
+
+def _to_float(value) -> float | None:
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def _column_array(params: dict, key: str) -> np.ndarray:
+    return np.array([np.nan if p[key] is None else p[key] for p in params.values()], dtype=float)
+
 
 _REGISTRY = {s.name: s for s in (MinMaxStrategy, ZScoreStrategy)}
 
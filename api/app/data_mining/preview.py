@@ -0,0 +1,37 @@
+"""Relatório do modo ``dry_run``: o efeito de uma etapa de pré-processamento sem gravar nada."""
+import json
+
+import pandas as pd
+
+
+def dry_run_report(before: pd.DataFrame, after: pd.DataFrame, preview_rows: int = 10) -> dict:
+    """Deltas por coluna numérica do resultado (nulos, mínimo, máximo, média) e as primeiras linhas."""
+    columns = {}
+    for column in after.select_dtypes("number").columns:
+        previous = before[column] if column in before.columns else None
+        nulls_after = int(after[column].isna().sum())
+        nulls_before = None if previous is None else int(previous.isna().sum())
+        columns[column] = {
+            "nulls_before": nulls_before,
+            "nulls_after": nulls_after,
+            "nulls_filled": None if nulls_before is None else max(nulls_before - nulls_after, 0),
+            "before": _stats(previous),
+            "after": _stats(after[column]),
+        }
+    return {
+        "rows_before": len(before),
+        "rows_kept": len(after),
+        "features": columns,
+        # to_json troca NaN por null e numpy por tipos nativos
+        "preview": json.loads(after.head(preview_rows).to_json(orient="records")),
+    }
+
+
+def _stats(values: pd.Series | None) -> dict | None:
+    if values is None or not pd.api.types.is_numeric_dtype(values):
+        return None
+    return {"min": _round(values.min()), "max": _round(values.max()), "mean": _round(values.mean())}
+
+
+def _round(value) -> float | None:
+    return None if pd.isna(value) else round(float(value), 4)
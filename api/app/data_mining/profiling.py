@@ -0,0 +1,119 @@
+"""Perfil de um CSV guardado junto do dataset, calculado na ingestão e a cada arquivo derivado.
+
+O perfil é um "zone map": para cada bloco de ``chunk_rows`` linhas do arquivo, a contagem de
+valores não nulos, o mínimo e o máximo de cada coluna numérica. Quem lê o arquivo em blocos do
+mesmo tamanho consegue descartar blocos que não podem contribuir para o resultado.
+
+O perfil também guarda, por coluna numérica do arquivo inteiro, um ``MomentSketch`` (``moments``)
+e um ``QuantileSketch`` (``quantiles``) serializados: dispersão, forma, mediana, quartis e
+histogramas saem deles sem ler o CSV. Toda coluna, numérica ou texto, tem ainda um
+``FrequentItems`` (``frequent``) para a moda e os valores mais frequentes.
+"""
+import pandas as pd
+
+from app.config import Config
+from app.data_mining.sketches import FrequentItems, MomentSketch, QuantileSketch
+
+
+class ProfileBuilder:
+    def __init__(self, chunk_rows: int, quantile_k: int | None = None, frequent_capacity: int | None = None):
+        self.chunk_rows = chunk_rows
+        self.quantile_k = quantile_k or Config.QUANTILE_SKETCH_K
+        self.frequent_capacity = frequent_capacity or Config.FREQUENT_ITEMS_CAPACITY
+        self.rows = 0
+        self._chunks: list[dict] = []
+        self._moments: dict[str, MomentSketch] = {}
+        self._quantiles: dict[str, QuantileSketch] = {}
+        self._frequent: dict[str, FrequentItems] = {}
+        self._text_columns: set[str] = set()
+
+    def add(self, frame: pd.DataFrame) -> None:
+        numeric = frame.select_dtypes("number")
+        # coluna que vira texto em algum bloco não tem sketches válidos (a medida lê o arquivo)
+        self._text_columns.update(column for column in frame.columns if column not in numeric.columns)
+        for column, values in numeric.items():
+            values = values.to_numpy()
+            self._moments.setdefault(column, MomentSketch()).update(values)
+            self._quantiles.setdefault(column, QuantileSketch(self.quantile_k)).update(values)
+        for column, values in frame.items():
+            self._frequent.setdefault(column, FrequentItems(self.frequent_capacity)).update(values)
+        # os blocos de entrada podem ter qualquer tamanho; o perfil sempre corta a cada chunk_rows
+        offset = 0
+        while offset < len(frame):
+            position = self.rows % self.chunk_rows
+            take = min(self.chunk_rows - position, len(frame) - offset)
+            if position == 0:
+                self._chunks.append({"rows": 0, "count": {}, "min": {}, "max": {}})
+            _merge(self._chunks[-1], frame.iloc[offset:offset + take])
+            self.rows += take
+            offset += take
+
+    def track(self, chunks):
+        """Repassa os blocos adiante, perfilando cada um no caminho."""
+        for chunk in chunks:
+            self.add(chunk)
+            yield chunk
+
+    def result(self) -> dict:
+        return {
+            "chunk_rows": self.chunk_rows, "rows": self.rows, "chunks": self._chunks,
+            "moments": self._serialize(self._moments, self._text_columns),
+            "quantiles": self._serialize(self._quantiles, self._text_columns),
+            # coluna número num bloco e texto noutro conta "1" e 1 como valores diferentes
+            "frequent": self._serialize(self._frequent, self._text_columns & self._moments.keys()),
+        }
+
+    @staticmethod
+    def _serialize(sketches: dict, skip: set[str]) -> dict:
+        return {column: sketch.to_dict() for column, sketch in sketches.items() if column not in skip}
+
+
+def profile_frame(df: pd.DataFrame, chunk_rows: int) -> dict:
+    builder = ProfileBuilder(chunk_rows)
+    builder.add(df)
+    return builder.result()
+
+
+def zone_map(profile: dict | None, column: str) -> list[tuple[int, float | None, float | None]] | None:
+    """(contagem, mínimo, máximo) de ``column`` em cada bloco, ou None se o perfil não cobre a coluna."""
+    if not profile or not profile.get("chunks"):
+        return None
+    if any(column not in chunk["count"] for chunk in profile["chunks"]):
+        return None
+    return [(chunk["count"][column], chunk["min"][column], chunk["max"][column]) for chunk in profile["chunks"]]
+
+
+def moments_of(profile: dict | None) -> dict[str, MomentSketch]:
+    """Sketches de momentos guardados no perfil (vazio em perfis antigos, de antes dos sketches)."""
+    if not profile:
+        return {}
+    return {column: MomentSketch.from_dict(data) for column, data in profile.get("moments", {}).items()}
+
+
+def quantiles_of(profile: dict | None) -> dict[str, QuantileSketch]:
+    if not profile:
+        return {}
+    return {column: QuantileSketch.from_dict(data) for column, data in profile.get("quantiles", {}).items()}
+
+
+def frequent_of(profile: dict | None) -> dict[str, FrequentItems]:
+    if not profile:
+        return {}
+    return {column: FrequentItems.from_dict(data) for column, data in profile.get("frequent", {}).items()}
+
+
+def _merge(entry: dict, part: pd.DataFrame) -> None:
+    numeric = part.select_dtypes("number")
+    entry["rows"] += len(part)
+    counts, lows, highs = numeric.count(), numeric.min(), numeric.max()
+    for column in numeric.columns:
+        entry["count"][column] = entry["count"].get(column, 0) + int(counts[column])
+        entry["min"][column] = _pick(min, entry["min"].get(column), lows[column])
+        entry["max"][column] = _pick(max, entry["max"].get(column), highs[column])
+
+
+def _pick(choose, current: float | None, value) -> float | None:
+    value = None if pd.isna(value) else float(value)
+    if value is None or current is None:
+        return current if value is None else value
+    return choose(current, value)
@@ -1,48 +1,395 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
 import pandas as pd
-from sklearn.decomposition import PCA
+from scipy import sparse
+from sklearn.decomposition import PCA, IncrementalPCA, TruncatedSVD
+from sklearn.random_projection import (GaussianRandomProjection, SparseRandomProjection,
+                                       johnson_lindenstrauss_min_dim)
 
 from app.common.errors import ValidationError
+from app.data_mining.encoding import encode_features
+from app.data_mining.profiling import zone_map
+from app.data_mining.sampling import reservoir_sample
+from app.data_mining.sketches import MomentSketch, QuantileSketch
 
 
 class ReductionStrategy(ABC):
     name: str
+    # amostragens devolvem linhas da fonte com o índice original, então o resultado pode ser uma view
+    selects_rows = False
+    # sorteia com random_seed (ou uma semente nova); sem semente o resultado muda a cada execução
+    randomized = False
+
+    def __init__(self):
+        # informações do ajuste que o service guarda junto do dataset reduzido
+        self.summary: dict = {}
 
     @abstractmethod
     def reduce(self, df: pd.DataFrame, features: list[str], params: dict) -> pd.DataFrame: ...
 
+    def reduce_chunks(self, read_chunks, features: list[str], params: dict, profile: dict | None = None):
+        """Modo em blocos: ``read_chunks()`` abre uma nova leitura do arquivo; devolve os blocos reduzidos.
+
+        ``profile`` é o zone map do arquivo (ver ``profiling``), alinhado com os blocos lidos.
+        """
+        raise ValidationError("Dados inválidos!", {"chunked": [f"O método '{self.name}' não suporta modo em blocos."]})
+
+    def row_subset(self, params: dict) -> bool:
+        """O resultado são linhas da fonte, sem colunas novas (pode virar view)."""
+        return self.selects_rows
+
+    def _seed(self, params) -> int:
+        # sem semente informada sorteia uma e guarda no resumo, para o resultado ser reproduzível
+        seed = params.get("random_seed")
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % 2**32)
+        self.summary["random_seed"] = seed
+        return seed
+
 
 class PCAStrategy(ReductionStrategy):
     name = "pca"
 
     def reduce(self, df, features, params):
+        self._validate(df.columns, features, params)
+        target = params["target"]
+        matrix = _feature_matrix(df, features, params)
+        n_components = self._n_components(params, *matrix.shape)
+        solver = _pca_solver(*matrix.shape, n_components, is_sparse=sparse.issparse(matrix))
+        pca = PCA(n_components=n_components, svd_solver=solver, random_state=0)
+        values = pca.fit_transform(matrix)
+        self.summary = _components_summary(pca.explained_variance_ratio_, solver)
+        result = pd.DataFrame(values, columns=_pc_columns(values.shape[1]))
+        result[target] = df[target].values
+        return result
+
+    def reduce_chunks(self, read_chunks, features, params, profile=None):
+        """IncrementalPCA: 1º passo ajusta com ``partial_fit`` bloco a bloco, 2º passo projeta."""
+        target = params["target"]
+        _reject_encoding_in_chunks(params)
+        variance = params.get("explained_variance")
+        n_components = None if variance else self._n_components(params, None, len(features))
+        pca = IncrementalPCA(n_components=n_components)
+        pending = None
+        for chunk in read_chunks():
+            self._validate(chunk.columns, features, params)
+            values = chunk[features].to_numpy(dtype=float)
+            pending = values if pending is None else np.vstack([pending, values])
+            # partial_fit exige ao menos n_components linhas; blocos curtos esperam o próximo
+            if len(pending) >= (n_components or len(features)):
+                pca.partial_fit(pending)
+                pending = None
+        if pending is not None:
+            # sobra menor que n_components no fim do arquivo: fica fora do ajuste, mas é projetada
+            if not hasattr(pca, "components_"):
+                raise ValidationError("Dados inválidos!", {"n_components": ["Registros insuficientes para o PCA."]})
+            if len(pending) >= pca.n_components_:
+                pca.partial_fit(pending)
+
+        ratios = pca.explained_variance_ratio_
+        keep = int(np.searchsorted(np.cumsum(ratios), variance) + 1) if variance else len(ratios)
+        keep = min(keep, len(ratios))
+        self.summary = _components_summary(ratios[:keep], "incremental")
+        return self._project_chunks(read_chunks, pca, keep, features, target)
+
+    @staticmethod
+    def _project_chunks(read_chunks, pca, keep, features, target):
+        components = pca.components_[:keep]
+        for chunk in read_chunks():
+            values = (chunk[features].to_numpy(dtype=float) - pca.mean_) @ components.T
+            result = pd.DataFrame(values, columns=_pc_columns(keep))
+            result[target] = chunk[target].to_numpy()
+            yield result
+
+    @staticmethod
+    def _validate(columns, features, params):
         target = params.get("target")
-        if not target or target not in df.columns:
+        if not target or target not in columns:
             raise ValidationError("Dados inválidos!", {"target": [f"A coluna target '{target}' não está registrada."]})
         if len(features) < 2:
             raise ValidationError("Dados inválidos!", {"features": ["PCA requer ao menos 2 features."]})
-        result = pd.DataFrame(PCA(n_components=2).fit_transform(df[features]), columns=["PC1", "PC2"])
-        result[target] = df[target].values
-        return result
+
+    @staticmethod
+    def _n_components(params, n_rows, n_features):
+        if params.get("explained_variance"):
+            return params["explained_variance"]
+        n_components = params.get("n_components") or 2
+        limit = n_features if n_rows is None else min(n_rows, n_features)
+        if n_components > limit:
+            raise ValidationError(
+                "Dados inválidos!",
+                {"n_components": [f"O número de componentes não pode passar de {limit}."]},
+            )
+        return n_components
+
+
+def _components_summary(ratios, solver: str) -> dict:
+    # resumo comum aos métodos de componentes (PCA e SVD truncado)
+    return {
+        "n_components": len(ratios),
+        "solver": solver,
+        "explained_variance_ratio": [round(float(r), 4) for r in ratios],
+    }
+
+
+def _pc_columns(n: int) -> list[str]:
+    return [f"PC{i + 1}" for i in range(n)]
+
+
+def _pca_solver(n_rows: int, n_features: int, n_components, is_sparse: bool = False) -> str:
+    """Evita o SVD completo em matrizes grandes.
+
+    Com meta de variância (float) em matriz alta, decompõe só a covariância (n_features²);
+    com número fixo de componentes bem menor que a matriz, usa o SVD randomizado. Entrada
+    esparsa só aceita ``arpack`` (centraliza implicitamente) ou ``covariance_eigh``.
+    """
+    if is_sparse:
+        if isinstance(n_components, float) or n_components >= min(n_rows, n_features):
+            return "covariance_eigh"
+        return "arpack"
+    if isinstance(n_components, float):
+        return "covariance_eigh" if n_rows >= 10 * n_features else "full"
+    if max(n_rows, n_features) <= 500 or n_components >= 0.8 * min(n_rows, n_features):
+        return "full"
+    return "randomized"
+
+
+def _feature_matrix(df: pd.DataFrame, features: list[str], params: dict):
+    """Features como estão, ou a matriz esparsa de ``encoding`` quando há categóricas."""
+    if params.get("encoding"):
+        return encode_features(df, features, params["encoding"], params.get("hash_features") or 1024)[0]
+    return df[features]
+
+
+def _reject_encoding_in_chunks(params: dict) -> None:
+    # categorias vistas em cada bloco mudam as colunas do one-hot; a codificação precisa do arquivo todo
+    if params.get("encoding"):
+        raise ValidationError("Dados inválidos!", {"encoding": ["A codificação esparsa não roda em blocos."]})
+
+
+class TruncatedSVDStrategy(ReductionStrategy):
+    """SVD truncado: como o PCA, mas sem centralizar, então a matriz esparsa do ``encoding`` não é densificada.
+
+    O ``target`` é opcional; quando informado, acompanha os componentes no resultado.
+    """
+
+    name = "svd_truncado"
+
+    def reduce(self, df, features, params):
+        self._validate(df.columns, features, params)
+        matrix = _feature_matrix(df, features, params)
+        n_components = _fixed_components(params, matrix.shape[1])
+        svd = TruncatedSVD(n_components=n_components, algorithm="randomized", random_state=0)
+        values = svd.fit_transform(matrix)
+        self.summary = _components_summary(svd.explained_variance_ratio_, "randomized")
+        return _components_frame(values, "SV", df, params)
+
+    def reduce_chunks(self, read_chunks, features, params, profile=None):
+        """1º passo soma XᵀX (n_features²) bloco a bloco; os vetores singulares são os autovetores dela.
+
+        2º passo projeta. Sem centralizar, o resultado é o mesmo do SVD truncado em memória (a menos do sinal).
+        """
+        _reject_encoding_in_chunks(params)
+        n_components = _fixed_components(params, len(features))
+        gram, sums, rows = 0.0, 0.0, 0
+        for chunk in read_chunks():
+            self._validate(chunk.columns, features, params)
+            values = chunk[features].to_numpy(dtype=float)
+            gram, sums, rows = gram + values.T @ values, sums + values.sum(axis=0), rows + len(values)
+        if not rows:
+            raise ValidationError("Dados inválidos!", {"features": ["O arquivo não tem registros."]})
+        eigenvalues, eigenvectors = np.linalg.eigh(gram)
+        components = eigenvectors[:, np.argsort(eigenvalues)[::-1][:n_components]]
+        # variância de cada projeção sobre a variância total, como o explained_variance_ratio_ do sklearn
+        mean = sums / rows
+        covariance = gram / rows - np.outer(mean, mean)
+        total = float(np.trace(covariance))
+        ratios = np.einsum("ij,ik,kj->j", components, covariance, components)
+        self.summary = _components_summary(ratios / total if total else np.zeros(len(ratios)), "gram")
+        return _project_chunks(read_chunks, features, params, lambda values: values @ components, "SV")
+
+    def _validate(self, columns, features, params):
+        _validate_projection(columns, features, params, self.name)
+        if params.get("jl_epsilon"):
+            raise ValidationError(
+                "Dados inválidos!", {"jl_epsilon": ["jl_epsilon só vale para projeções aleatórias."]}
+            )
+
+
+class RandomProjectionStrategy(ReductionStrategy):
+    """Projeção aleatória: a matriz só depende do número de features e da semente, então não há ajuste.
+
+    ``n_components`` fixa a dimensão; ``jl_epsilon`` a deriva do lema de Johnson–Lindenstrauss (distâncias
+    preservadas a menos de 1 ± ε). Em blocos é uma única passada.
+    """
+
+    projection: type
+    randomized = True
+
+    def reduce(self, df, features, params):
+        _validate_projection(df.columns, features, params, self.name)
+        matrix = _feature_matrix(df, features, params)
+        projector = self._projector(params, *matrix.shape)
+        values = projector.fit_transform(matrix)
+        return _components_frame(np.asarray(values), "RP", df, params)
+
+    def reduce_chunks(self, read_chunks, features, params, profile=None):
+        _reject_encoding_in_chunks(params)
+        # as colunas são conferidas no 1º bloco, antes de começar a gravar o resultado
+        first = next(read_chunks(), None)
+        _validate_projection([] if first is None else first.columns, features, params, self.name)
+        n_rows = None
+        if params.get("jl_epsilon"):
+            # a dimensão de JL depende do total de linhas: vem do perfil ou de uma passada de contagem
+            n_rows = profile["rows"] if profile else sum(len(chunk) for chunk in read_chunks())
+        projector = self._projector(params, n_rows, len(features))
+        return _project_chunks(read_chunks, features, params, projector.transform, "RP")
+
+    def _projector(self, params, n_rows, n_features):
+        epsilon = params.get("jl_epsilon")
+        if epsilon:
+            n_components = int(johnson_lindenstrauss_min_dim(max(n_rows, 1), eps=epsilon))
+            if n_components > n_features:
+                raise ValidationError("Dados inválidos!", {"jl_epsilon": [
+                    f"Com {n_rows} registros, ε={epsilon} exige {n_components} componentes, "
+                    f"mais que as {n_features} features; aumente o ε ou use n_components."
+                ]})
+        else:
+            n_components = _fixed_components(params, n_features)
+        seed = self._seed(params)
+        projector = self._make(n_components, seed)
+        # o ajuste só sorteia a matriz de projeção a partir do formato; nenhuma linha é lida
+        projector.fit(sparse.csr_matrix((1, n_features)))
+        self.summary.update(n_components=n_components, jl_epsilon=epsilon)
+        return projector
+
+    def _make(self, n_components, seed):
+        return self.projection(n_components=n_components, random_state=seed)
+
+
+class GaussianProjectionStrategy(RandomProjectionStrategy):
+    name = "projecao_gaussiana"
+    projection = GaussianRandomProjection
+
+
+class SparseProjectionStrategy(RandomProjectionStrategy):
+    """Matriz de Achlioptas/Li: quase toda zerada, então projetar custa uma fração da gaussiana."""
+
+    name = "projecao_esparsa"
+    projection = SparseRandomProjection
+
+    def _make(self, n_components, seed):
+        return self.projection(n_components=n_components, dense_output=True, random_state=seed)
+
+
+def _validate_projection(columns, features, params, name):
+    target = params.get("target")
+    if target and target not in columns:
+        raise ValidationError("Dados inválidos!", {"target": [f"A coluna target '{target}' não está registrada."]})
+    if params.get("explained_variance"):
+        raise ValidationError(
+            "Dados inválidos!", {"explained_variance": [f"O método '{name}' aceita só n_components."]}
+        )
+    if len(features) < 2:
+        raise ValidationError(
+            "Dados inválidos!", {"features": ["A redução de dimensão requer ao menos 2 features."]}
+        )
+
+
+def _fixed_components(params, n_features) -> int:
+    n_components = params.get("n_components") or 2
+    if n_components > n_features:
+        raise ValidationError(
+            "Dados inválidos!",
+            {"n_components": [f"O número de componentes não pode passar de {n_features}."]},
+        )
+    return n_components
+
+
+def _components_frame(values, prefix: str, df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    result = pd.DataFrame(values, columns=[f"{prefix}{i + 1}" for i in range(values.shape[1])])
+    if params.get("target"):
+        result[params["target"]] = df[params["target"]].values
+    return result
+
+
+def _project_chunks(read_chunks, features, params, project, prefix):
+    for chunk in read_chunks():
+        yield _components_frame(project(chunk[features].to_numpy(dtype=float)), prefix, chunk, params)
 
 
 class RandomSamplingStrategy(ReductionStrategy):
     name = "amostragem_aleatoria"
+    selects_rows = True
+    randomized = True
 
     def reduce(self, df, features, params):
+        n = self._size(params)
+        if n > len(df):
+            _raise_sample_too_large()
+        seed = self._seed(params)
+        return df.sample(n=n, replace=False, random_state=seed)
+
+    def reduce_chunks(self, read_chunks, features, params, profile=None):
+        """Reservoir sampling (Algoritmo L) em uma passada: memória O(n), não O(dataset).
+
+        A amostra sai na ordem do arquivo.
+        """
+        n = self._size(params)
+        sample, rows = reservoir_sample(read_chunks(), n, np.random.default_rng(self._seed(params)))
+        if rows < n:
+            _raise_sample_too_large()
+        return [sample]
+
+    @staticmethod
+    def _size(params) -> int:
         n = params.get("random_records")
         if not n:
             raise ValidationError("Dados inválidos!", {"random_records": ["O campo é obrigatório."]})
-        if n > len(df):
-            raise ValidationError("Dados inválidos!", {"random_records": ["Amostra maior que o número de registros."]})
-        return df.sample(n=n, replace=False)
+        return n
+
+
+def _raise_sample_too_large():
+    raise ValidationError("Dados inválidos!", {"random_records": ["Amostra maior que o número de registros."]})
 
 
 class SystematicSamplingStrategy(ReductionStrategy):
     name = "amostragem_sistematica"
+    selects_rows = True
 
     def reduce(self, df, features, params):
+        n, largest = self._params(features, params)
+        feature = features[0]
+        return df.nlargest(n, feature) if largest else df.nsmallest(n, feature)
+
+    def reduce_chunks(self, read_chunks, features, params, profile=None):
+        """Top-k em blocos: guarda só os n melhores vistos até agora (memória O(n)).
+
+        Com o zone map do arquivo, blocos cujo máximo (ou mínimo) não alcança o n-ésimo melhor
+        garantido são descartados sem ordenar nem mesclar.
+        """
+        n, largest = self._params(features, params)
+        feature = features[0]
+        zones = zone_map(profile, feature)
+        bound = _guaranteed_bound(zones, n, largest) if zones else None
+        best, start, skipped = None, 0, 0
+        for i, chunk in enumerate(read_chunks()):
+            end = start + len(chunk)
+            chunk.index = pd.RangeIndex(start, end)
+            start = end
+            kth = best[feature].iloc[-1] if best is not None and len(best) == n else None
+            if zones and i < len(zones) and _cannot_contribute(zones[i], bound, kth, largest):
+                skipped += 1
+                continue
+            # concat com `best` primeiro: em empate vence a linha que aparece antes, como no nlargest
+            top = _top(chunk, n, feature, largest)
+            best = top if best is None else _top(pd.concat([best, top]), n, feature, largest)
+        self.summary = {"chunks_skipped": skipped}
+        return [] if best is None else [best]
+
+    @staticmethod
+    def _params(features, params) -> tuple[int, bool]:
         n = params.get("systematic_records")
         method = params.get("systematic_method")
         if not n:
@@ -51,11 +398,370 @@ class SystematicSamplingStrategy(ReductionStrategy):
             raise ValidationError("Dados inválidos!", {"features": ["Apenas uma feature deve ser selecionada."]})
         if method not in ("maiores", "menores"):
             raise ValidationError("Dados inválidos!", {"systematic_method": ["Escolha entre 'maiores' ou 'menores'."]})
-        feature = features[0]
-        return df.nlargest(n, feature) if method == "maiores" else df.nsmallest(n, feature)
+        return n, method == "maiores"
+
+
+class IntervalSamplingStrategy(ReductionStrategy):
+    """Amostragem sistemática de verdade: uma linha a cada k, a partir de um início sorteado."""
+
+    name = "amostragem_intervalar"
+    selects_rows = True
+    randomized = True
+
+    def reduce(self, df, features, params):
+        positions = self._positions(len(df), params)
+        return df.iloc[positions]
+
+    def reduce_chunks(self, read_chunks, features, params, profile=None):
+        # o passo k depende do total de linhas, que só o perfil conhece antes de ler o arquivo
+        if not profile:
+            return super().reduce_chunks(read_chunks, features, params, profile)
+        positions = self._positions(profile["rows"], params)
+        return self._select_chunks(read_chunks, positions)
+
+    @staticmethod
+    def _select_chunks(read_chunks, positions):
+        start = 0
+        for chunk in read_chunks():
+            end = start + len(chunk)
+            inside = positions[(positions >= start) & (positions < end)]
+            if len(inside):
+                yield chunk.iloc[inside - start]
+            start = end
+
+    def _positions(self, total: int, params) -> np.ndarray:
+        n = params.get("interval_records")
+        if not n:
+            raise ValidationError("Dados inválidos!", {"interval_records": ["O campo é obrigatório."]})
+        if n > total:
+            raise ValidationError(
+                "Dados inválidos!", {"interval_records": ["Amostra maior que o número de registros."]}
+            )
+        step = total // n
+        start = int(np.random.default_rng(self._seed(params)).integers(step))
+        self.summary["interval"] = step
+        return start + step * np.arange(n)
+
+
+class StratifiedSamplingStrategy(ReductionStrategy):
+    """Amostragem estratificada pela coluna target, com alocação proporcional ou igual por classe."""
+
+    name = "amostragem_estratificada"
+    selects_rows = True
+    randomized = True
+
+    def reduce(self, df, features, params):
+        target = params.get("target")
+        if not target or target not in df.columns:
+            raise ValidationError(
+                "Dados inválidos!", {"target": [f"A coluna target '{target}' não está registrada."]}
+            )
+        n = params.get("stratified_records")
+        if not n:
+            raise ValidationError("Dados inválidos!", {"stratified_records": ["O campo é obrigatório."]})
+        labels = df[target]
+        sizes = labels.value_counts()
+        if n > sizes.sum():
+            raise ValidationError(
+                "Dados inválidos!", {"stratified_records": ["Amostra maior que o número de registros."]}
+            )
+        allocation = params.get("stratified_allocation") or "proporcional"
+        if allocation not in _ALLOCATIONS:
+            raise ValidationError(
+                "Dados inválidos!", {"stratified_allocation": ["Escolha entre 'proporcional' ou 'igual'."]}
+            )
+        quotas = _ALLOCATIONS[allocation](sizes, n)
+
+        # embaralha uma vez e numera as linhas dentro de cada classe: fica quem está abaixo da cota
+        order = np.random.default_rng(self._seed(params)).permutation(len(df))
+        shuffled = labels.iloc[order]
+        rank = shuffled.groupby(shuffled, sort=False).cumcount().to_numpy()
+        keep = rank < shuffled.map(quotas).fillna(0).to_numpy()
+        self.summary["allocation"] = allocation
+        self.summary["class_distribution"] = {str(label): int(quota) for label, quota in quotas.items()}
+        return df.iloc[np.sort(order[keep])]
+
+
+def _proportional_quotas(sizes: pd.Series, n: int) -> pd.Series:
+    """Maiores restos: cotas proporcionais ao tamanho da classe que somam exatamente n."""
+    raw = sizes * n / sizes.sum()
+    quotas = np.floor(raw).astype(int)
+    missing = n - int(quotas.sum())
+    remainders = (raw - quotas).sort_values(ascending=False, kind="stable")
+    quotas.loc[remainders.index[:missing]] += 1
+    return quotas
+
+
+def _equal_quotas(sizes: pd.Series, n: int) -> pd.Series:
+    """Mesma cota para todas as classes; o que as classes pequenas não preenchem vai para as maiores."""
+    quotas = pd.Series(0, index=sizes.index)
+    remaining, left = n, len(sizes)
+    for label, size in sizes.sort_values(kind="stable").items():
+        quotas.loc[label] = min(size, remaining // left)
+        remaining -= quotas.loc[label]
+        left -= 1
+    for label in sizes.index:
+        if remaining == 0:
+            break
+        if quotas.loc[label] < sizes.loc[label]:
+            quotas.loc[label] += 1
+            remaining -= 1
+    return quotas
+
+
+_ALLOCATIONS = {"proporcional": _proportional_quotas, "igual": _equal_quotas}
+
+
+def _top(df, n, feature, largest):
+    return df.nlargest(n, feature) if largest else df.nsmallest(n, feature)
+
+
+def _guaranteed_bound(zones, n, largest):
+    """Limite que o n-ésimo melhor valor certamente alcança, só olhando o zone map.
+
+    Para "maiores": ordenando os blocos pelo mínimo (decrescente), assim que os blocos somam n
+    valores não nulos, o mínimo do último bloco somado é um piso para o n-ésimo maior.
+    """
+    filled = [(count, low, high) for count, low, high in zones if count]
+    filled.sort(key=lambda z: z[1] if largest else z[2], reverse=largest)
+    total = 0
+    for count, low, high in filled:
+        total += count
+        if total >= n:
+            return low if largest else high
+    return None
+
+
+def _cannot_contribute(zone, bound, kth, largest):
+    count, low, high = zone
+    if not count:
+        return True
+    edge = high if largest else low
+    if bound is not None and (edge < bound if largest else edge > bound):
+        return True
+    # empate com o n-ésimo já guardado perde para a linha que apareceu antes
+    return kth is not None and (edge <= kth if largest else edge >= kth)
+
+
+class OutlierFilterStrategy(ReductionStrategy):
+    """Remove (ou marca na coluna ``outlier``) as linhas com alguma feature fora dos limites.
+
+    Limites por feature: ``iqr`` (Q1 - t·IQR, Q3 + t·IQR, t = 1.5), ``zscore`` (média ± t·desvio,
+    t = 3) ou ``mad`` (mediana ± t·MAD / 0.6745, t = 3.5; com MAD zero a feature fica sem limites).
+    Cada um sai de uma única chamada vetorizada sobre a matriz de features; a máscara de linhas é o
+    OR das máscaras por feature.
+    """
+
+    name = "remocao_outliers"
+    selects_rows = True
+
+    def row_subset(self, params):
+        return self._action(params) == "remover"
+
+    def reduce(self, df, features, params):
+        method, threshold = self._method(params)
+        values = _numeric_frame(df, features)
+        if method == "iqr":
+            quartiles = values.quantile([0.25, 0.75])
+            low, high = quartiles.loc[0.25].to_numpy(), quartiles.loc[0.75].to_numpy()
+            bounds = (low - threshold * (high - low), high + threshold * (high - low))
+        elif method == "zscore":
+            center, spread = values.mean().to_numpy(), values.std().to_numpy()
+            bounds = (center - threshold * spread, center + threshold * spread)
+        else:
+            center = values.median().to_numpy()
+            bounds = _mad_bounds(center, (values - center).abs().median().to_numpy(), threshold)
+        return self._filter(df, values, bounds, features, params)
+
+    def reduce_chunks(self, read_chunks, features, params, profile=None):
+        """1º passo (2 no MAD) acumula sketches por feature; o último filtra bloco a bloco."""
+        method, threshold = self._method(params)
+        if method == "zscore":
+            moments = _sketch_pass(read_chunks, features, MomentSketch)
+            center = np.array([moments[f].mean if moments[f].count else np.nan for f in features])
+            spread = np.array([moments[f].std() for f in features])
+            bounds = (center - threshold * spread, center + threshold * spread)
+        else:
+            quantiles = _sketch_pass(read_chunks, features, QuantileSketch)
+            if method == "iqr":
+                low = np.array([quantiles[f].quantile(0.25) for f in features])
+                high = np.array([quantiles[f].quantile(0.75) for f in features])
+                bounds = (low - threshold * (high - low), high + threshold * (high - low))
+            else:
+                center = np.array([quantiles[f].quantile(0.5) for f in features])
+                deviations = _sketch_pass(read_chunks, features, QuantileSketch, center=center)
+                mad = np.array([deviations[f].quantile(0.5) for f in features])
+                bounds = _mad_bounds(center, mad, threshold)
+        self.summary.update(method=method, threshold=threshold, outliers={f: 0 for f in features}, rows=0)
+        return self._filter_chunks(read_chunks, features, bounds, params)
+
+    def _filter_chunks(self, read_chunks, features, bounds, params):
+        for chunk in read_chunks():
+            yield self._filter(chunk, _numeric_frame(chunk, features), bounds, features, params, accumulate=True)
+
+    def _filter(self, df, values, bounds, features, params, accumulate=False):
+        method, threshold = self._method(params)
+        outside = values.lt(bounds[0]) | values.gt(bounds[1])
+        rows = outside.any(axis=1)
+        counts = outside.sum()
+        if accumulate:
+            for feature in features:
+                self.summary["outliers"][feature] += int(counts[feature])
+            self.summary["rows"] += int(rows.sum())
+        else:
+            self.summary.update(
+                method=method, threshold=threshold,
+                outliers={f: int(counts[f]) for f in features}, rows=int(rows.sum()),
+            )
+        self.summary["bounds"] = {f: [_bound(low), _bound(high)] for f, low, high in zip(features, *bounds)}
+        if self._action(params) == "remover":
+            return df[~rows]
+        return df.assign(outlier=rows)
+
+    @staticmethod
+    def _method(params) -> tuple[str, float]:
+        method = params.get("outlier_method") or "iqr"
+        if method not in _OUTLIER_THRESHOLDS:
+            raise ValidationError(
+                "Dados inválidos!", {"outlier_method": ["Escolha entre 'iqr', 'zscore' ou 'mad'."]}
+            )
+        return method, params.get("outlier_threshold") or _OUTLIER_THRESHOLDS[method]
+
+    @staticmethod
+    def _action(params) -> str:
+        action = params.get("outlier_action") or "remover"
+        if action not in ("remover", "marcar"):
+            raise ValidationError("Dados inválidos!", {"outlier_action": ["Escolha entre 'remover' ou 'marcar'."]})
+        return action
+
+
+class DeduplicationStrategy(ReductionStrategy):
+    """Remove linhas repetidas nas ``features``, comparando hashes uint64 de ``hash_pandas_object``.
+
+    Colisões de 64 bits são desprezíveis nas contagens de linhas que a API aceita.
+    """
+
+    name = "remocao_duplicatas"
+    selects_rows = True
+
+    def reduce(self, df, features, params):
+        duplicated = pd.Series(_row_hashes(df, features)).duplicated(keep=self._keep(params)).to_numpy()
+        self._summarize(len(df), int(duplicated.sum()))
+        return df[~duplicated]
+
+    def reduce_chunks(self, read_chunks, features, params, profile=None):
+        """1º passo: hash -> posição mantida (primeira ou última), em arrays ordenados de até
+        ``dedup_max_hashes`` entradas (16 bytes cada); 2º passo: só as linhas mantidas saem.
+
+        Os hashes de cada bloco ficam pendentes e só são fundidos aos arrays quando somam tanto
+        quanto eles: cada hash é copiado O(log n) vezes, não uma vez por bloco.
+        """
+        keep = self._keep(params)
+        limit = params.get("dedup_max_hashes") or 10_000_000
+        keys, kept = np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+        pending_keys, pending_kept, pending = [], [], 0
+        rows = 0
+        for chunk in read_chunks():
+            pending_keys.append(_row_hashes(chunk, features))
+            pending_kept.append(np.arange(rows, rows + len(chunk)))
+            rows += len(chunk)
+            pending += len(chunk)
+            if pending >= len(keys):
+                keys, kept = _distinct_hashes([keys, *pending_keys], [kept, *pending_kept], keep)
+                pending_keys, pending_kept, pending = [], [], 0
+                self._check_limit(len(keys), limit)
+        keys, kept = _distinct_hashes([keys, *pending_keys], [kept, *pending_kept], keep)
+        self._check_limit(len(keys), limit)
+        self._summarize(rows, rows - len(keys))
+        return self._kept_chunks(read_chunks, features, keys, kept)
+
+    @staticmethod
+    def _check_limit(distinct: int, limit: int) -> None:
+        if distinct > limit:
+            raise ValidationError("Dados inválidos!", {"dedup_max_hashes": [
+                f"Mais de {limit} linhas distintas; aumente o limite ou use o modo em memória."
+            ]})
+
+    @staticmethod
+    def _kept_chunks(read_chunks, features, keys, kept):
+        start = 0
+        for chunk in read_chunks():
+            positions = np.arange(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk[kept[np.searchsorted(keys, _row_hashes(chunk, features))] == positions]
+
+    def _summarize(self, rows: int, duplicates: int) -> None:
+        self.summary.update(
+            rows=rows, duplicates=duplicates, duplicate_ratio=round(duplicates / rows, 4) if rows else 0.0
+        )
+
+    @staticmethod
+    def _keep(params) -> str:
+        keep = params.get("dedup_keep") or "primeira"
+        if keep not in _DEDUP_KEEP:
+            raise ValidationError("Dados inválidos!", {"dedup_keep": ["Escolha entre 'primeira' ou 'ultima'."]})
+        return _DEDUP_KEEP[keep]
+
+
+_DEDUP_KEEP = {"primeira": "first", "ultima": "last"}
+
+
+def _distinct_hashes(keys: list[np.ndarray], positions: list[np.ndarray], keep: str):
+    """Hashes distintos em ordem, cada um com a primeira (ou a última) posição em que aparece."""
+    keys, positions = np.concatenate(keys), np.concatenate(positions)
+    if keys.size == 0:
+        return keys, positions
+    order = np.lexsort((positions, keys))
+    keys, positions = keys[order], positions[order]
+    changes = keys[1:] != keys[:-1]
+    boundary = np.r_[True, changes] if keep == "first" else np.r_[changes, True]
+    return keys[boundary], positions[boundary]
+
+
+def _row_hashes(df: pd.DataFrame, features: list[str]) -> np.ndarray:
+    # colunas numéricas viram float64: um bloco com NaN não pode mudar o hash de "1" para "1.0"
+    keys = df[features]
+    keys = keys.astype({column: "float64" for column in keys.select_dtypes("number").columns})
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+_OUTLIER_THRESHOLDS = {"iqr": 1.5, "zscore": 3.0, "mad": 3.5}
+
+
+def _numeric_frame(df: pd.DataFrame, features: list[str]) -> pd.DataFrame:
+    return df[features].apply(pd.to_numeric, errors="coerce")
+
+
+def _sketch_pass(read_chunks, features, sketch_type, center=None) -> dict:
+    sketches = {feature: sketch_type() for feature in features}
+    for chunk in read_chunks():
+        values = _numeric_frame(chunk, features).to_numpy(dtype=float)
+        if center is not None:
+            values = np.abs(values - center)
+        for i, feature in enumerate(features):
+            sketches[feature].update(values[:, i])
+    return sketches
+
+
+def _mad_bounds(center, mad, threshold):
+    # MAD zero (mais da metade dos valores na mediana) fecharia os limites na própria mediana e marcaria
+    # todo o resto; a feature fica sem limites (NaN não marca nada e volta como None em params)
+    spread = np.where(mad > 0, mad, np.nan) / 0.6745
+    return center - threshold * spread, center + threshold * spread
+
+
+def _bound(value) -> float | None:
+    return None if np.isnan(value) else round(float(value), 4)
 
 
-_REGISTRY = {s.name: s for s in (PCAStrategy, RandomSamplingStrategy, SystematicSamplingStrategy)}
+_REGISTRY = {
+    s.name: s
+    for s in (
+        PCAStrategy, TruncatedSVDStrategy, GaussianProjectionStrategy, SparseProjectionStrategy,
+        RandomSamplingStrategy, SystematicSamplingStrategy, IntervalSamplingStrategy, StratifiedSamplingStrategy,
+        OutlierFilterStrategy, DeduplicationStrategy,
+    )
+}
 
 
 def get_strategy(name: str) -> ReductionStrategy:
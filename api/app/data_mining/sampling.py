@@ -0,0 +1,30 @@
+"""Amostra aleatória uniforme de um arquivo lido em blocos, sem saber antes quantas linhas ele tem."""
+import numpy as np
+import pandas as pd
+
+
+def reservoir_sample(chunks, n: int, rng: np.random.Generator) -> tuple[pd.DataFrame | None, int]:
+    """Reservoir sampling (Algoritmo L) em uma passada: memória O(n), não O(dataset).
+
+    Devolve ``(amostra, linhas lidas)``; a amostra sai na ordem do arquivo, com a posição de cada
+    linha como índice. Com menos de ``n`` linhas, a amostra é o arquivo inteiro.
+    """
+    reservoir = None
+    slots = np.empty(0, dtype=np.int64)  # posição global (no arquivo) da linha em cada vaga
+    weight = np.exp(np.log(rng.random()) / n)
+    next_pos = n + int(np.log(rng.random()) // np.log1p(-weight))
+    start = 0
+    for chunk in chunks:
+        end = start + len(chunk)
+        chunk.index = pd.RangeIndex(start, end)
+        if len(slots) < n:
+            slots = np.concatenate([slots, np.arange(start, min(end, start + n - len(slots)))])
+        # só as linhas sorteadas pelo Algoritmo L são visitadas; o resto do bloco é pulado
+        while next_pos < end:
+            slots[rng.integers(n)] = next_pos
+            weight *= np.exp(np.log(rng.random()) / n)
+            next_pos += int(np.log(rng.random()) // np.log1p(-weight)) + 1
+        taken = chunk.loc[slots[(slots >= start) & (slots < end)]]
+        reservoir = taken if reservoir is None else pd.concat([reservoir[reservoir.index.isin(slots)], taken])
+        start = end
+    return (None if reservoir is None else reservoir.sort_index()), start
@@ -0,0 +1,289 @@
+"""Sketches mergeáveis de estatísticas por coluna, usados quando o CSV é lido em blocos.
+
+Cada sketch absorve um bloco com ``update(values)`` e junta outro do mesmo tipo com
+``merge(other)``; o resultado não depende de como o arquivo foi fatiado.
+"""
+import numpy as np
+import pandas as pd
+
+
+def is_constant(m2, mean):
+    """Variância (populacional) do tamanho do erro de arredondamento da média: a coluna é constante.
+
+    É o critério do ``scipy.stats.skew``/``kurtosis``, que respondem NaN nesse caso; sem ele uma coluna
+    constante de 1/3 tem m2 ~ 1e-33 e a assimetria sai -1. Vale para escalares, arrays e Series.
+    """
+    return m2 <= (np.finfo(float).eps * mean) ** 2
+
+
+def _numeric(values) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    return values[~np.isnan(values)]
+
+
+class MomentSketch:
+    """Contagem, média, momentos centrais M2..M4 (Welford/Chan/Pébay), mínimo e máximo.
+
+    Guarda o mesmo que (n, Σx, Σx², Σx³, Σx⁴, min, max), mas centrado na média: as somas de
+    potências perdem precisão por cancelamento quando a média é grande perto do desvio.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values) -> "MomentSketch":
+        values = _numeric(values)
+        if values.size == 0:
+            return self
+        chunk = MomentSketch()
+        chunk.count = int(values.size)
+        chunk.mean = float(values.mean())
+        centered = values - chunk.mean
+        squared = centered * centered
+        chunk.m2 = float(squared.sum())
+        chunk.m3 = float((squared * centered).sum())
+        chunk.m4 = float((squared * squared).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        return self.merge(chunk)
+
+    def merge(self, other: "MomentSketch") -> "MomentSketch":
+        if other.count == 0:
+            return self
+        na, nb = self.count, other.count
+        total = na + nb
+        delta = other.mean - self.mean
+        # fórmulas de Pébay (2008): M4 e M3 usam os M2/M3 de antes da junção
+        self.m4 += (
+            other.m4 + delta ** 4 * na * nb * (na * na - na * nb + nb * nb) / total ** 3
+            + 6 * delta ** 2 * (na * na * other.m2 + nb * nb * self.m2) / total ** 2
+            + 4 * delta * (na * other.m3 - nb * self.m3) / total
+        )
+        self.m3 += (
+            other.m3 + delta ** 3 * na * nb * (na - nb) / total ** 2
+            + 3 * delta * (na * other.m2 - nb * self.m2) / total
+        )
+        self.m2 += other.m2 + delta * delta * na * nb / total
+        self.mean += delta * nb / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def total(self) -> float:
+        return self.mean * self.count
+
+    def variance(self, ddof: int = 1) -> float:
+        dof = self.count - ddof
+        return self.m2 / dof if dof > 0 else np.nan
+
+    def std(self, ddof: int = 1) -> float:
+        return float(np.sqrt(self.variance(ddof)))
+
+    def skewness(self) -> float:
+        """Assimetria populacional (com viés), como ``scipy.stats.skew``."""
+        if self._constant():
+            return np.nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return float(np.float64(self.m3) * np.sqrt(self.count) / np.float64(self.m2) ** 1.5)
+
+    def kurtosis(self) -> float:
+        """Curtose de Fisher populacional (com viés), como ``scipy.stats.kurtosis``."""
+        if self._constant():
+            return np.nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return float(self.count * np.float64(self.m4) / np.float64(self.m2) ** 2 - 3)
+
+    def _constant(self) -> bool:
+        # m2 de uma coluna constante pode sobrar do arredondamento, e o valor dependeria dos blocos
+        return self.count == 0 or bool(is_constant(self.m2 / self.count, self.mean))
+
+    def to_dict(self) -> dict:
+        empty = self.count == 0
+        return {
+            "count": self.count, "mean": self.mean, "m2": self.m2, "m3": self.m3, "m4": self.m4,
+            "min": None if empty else self.min, "max": None if empty else self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MomentSketch":
+        sketch = cls()
+        sketch.count, sketch.mean = data["count"], data["mean"]
+        sketch.m2, sketch.m3, sketch.m4 = data["m2"], data["m3"], data["m4"]
+        sketch.min = np.inf if data["min"] is None else data["min"]
+        sketch.max = -np.inf if data["max"] is None else data["max"]
+        return sketch
+
+
+class QuantileSketch:
+    """Sketch KLL de quantis: erro de posto da ordem de 1.7 / k, memória O(k log(n / k)).
+
+    Enquanto nenhum nível foi compactado (n <= k) o sketch guarda todos os valores e responde
+    exatamente, com a mesma interpolação de ``Series.quantile``.
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def is_exact(self) -> bool:
+        return len(self._levels) == 1
+
+    def update(self, values) -> "QuantileSketch":
+        values = _numeric(values)
+        self.count += int(values.size)
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        for level, items in enumerate(other._levels):
+            if level == len(self._levels):
+                self._levels.append(np.empty(0))
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return np.nan
+        if self.is_exact:
+            return float(np.quantile(self._levels[0], q))
+        items, weights = self._weighted()
+        cumulative = np.cumsum(weights)
+        return float(items[np.searchsorted(cumulative, q * cumulative[-1], side="left")])
+
+    def histogram(self, edges) -> np.ndarray:
+        """Contagens por faixa com a convenção de ``np.histogram`` (última faixa fechada à direita).
+
+        Os pesos do KLL são potências de 2 e somam ``count``, então as contagens são inteiras; com o
+        sketch exato, são as mesmas de ``np.histogram``.
+        """
+        edges = np.asarray(edges, dtype=float)
+        items, weights = self._weighted()
+        cumulative = np.concatenate([[0.0], np.cumsum(weights)])
+        below = cumulative[np.searchsorted(items, edges, side="left")]
+        below[-1] = cumulative[np.searchsorted(items, edges[-1], side="right")]
+        return np.diff(below).astype(np.int64)
+
+    def to_dict(self) -> dict:
+        return {"k": self.k, "count": self.count, "levels": [level.tolist() for level in self._levels]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(k=data["k"])
+        sketch.count = data["count"]
+        sketch._levels = [np.asarray(level, dtype=float) for level in data["levels"]]
+        return sketch
+
+    def _weighted(self) -> tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(level.size, 2 ** h, dtype=float) for h, level in enumerate(self._levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if items.size <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+            items = np.sort(items)
+            # com tamanho ímpar o maior item fica no nível; os pares sobem com peso dobrado
+            even = items.size - items.size % 2
+            promoted = items[self._rng.integers(2):even:2]
+            self._levels[level] = items[even:]
+            self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+            level = 0
+
+
+class FrequentItems:
+    """Misra–Gries: mantém até ``capacity`` contadores; cada contagem é subestimada em no máximo
+    ``n / (capacity + 1)``. Sem nenhum decremento as contagens são exatas.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.count = 0
+        self.decremented = 0
+        self.counters = pd.Series(dtype="int64")
+
+    @property
+    def is_exact(self) -> bool:
+        return self.decremented == 0
+
+    def update(self, values) -> "FrequentItems":
+        counts = pd.Series(values).dropna().value_counts()
+        self.count += int(counts.sum())
+        return self._absorb(counts)
+
+    def merge(self, other: "FrequentItems") -> "FrequentItems":
+        self.count += other.count
+        self.decremented += other.decremented
+        return self._absorb(other.counters)
+
+    def most_common(self):
+        """Valor com maior contador; empates ficam com o menor valor, como ``Series.mode``."""
+        if self.counters.empty:
+            return None
+        top = self.counters[self.counters == self.counters.max()]
+        return top.index.min()
+
+    def top(self, k: int) -> list[tuple]:
+        """``(valor, mínima, máxima)`` dos ``k`` maiores contadores: a contagem real fica entre as duas."""
+        ranked = self.counters.sort_index().sort_values(ascending=False, kind="stable").iloc[:k]
+        return [(value, int(count), int(count) + self.decremented) for value, count in ranked.items()]
+
+    def proven_mode(self) -> list | None:
+        """Moda(s) que o sketch garante, ou None: sem decrementos é exata (com empates, como ``Series.mode``);
+        com decrementos, só quando o mínimo do primeiro passa o máximo possível de qualquer outro valor.
+        """
+        if self.counters.empty:
+            return [] if self.is_exact else None
+        if self.is_exact:
+            return self.counters[self.counters == self.counters.max()].index.sort_values().tolist()
+        (first, lower, _), *rest = self.top(2)
+        runner_up = rest[0][2] if rest else self.decremented
+        return [first] if lower > runner_up else None
+
+    def to_dict(self) -> dict:
+        return {
+            "capacity": self.capacity, "count": self.count, "decremented": self.decremented,
+            "items": [[value, int(count)] for value, count in self.counters.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FrequentItems":
+        sketch = cls(data["capacity"])
+        sketch.count, sketch.decremented = data["count"], data["decremented"]
+        if data["items"]:
+            values, counts = zip(*data["items"])
+            sketch.counters = pd.Series(counts, index=list(values), dtype="int64")
+        return sketch
+
+    def _absorb(self, counts: pd.Series) -> "FrequentItems":
+        merged = self.counters.add(counts, fill_value=0).astype("int64") if not self.counters.empty else counts
+        if len(merged) > self.capacity:
+            cut = int(merged.nlargest(self.capacity + 1).iloc[-1])
+            merged = merged[merged > cut] - cut
+            self.decremented += cut
+        self.counters = merged
+        return self
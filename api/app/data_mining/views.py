@@ -0,0 +1,130 @@
+"""Datasets derivados virtuais: um índice de linhas e transformações por coluna sobre um CSV pai.
+
+Amostragem e normalização não precisam reescrever o arquivo inteiro: o resultado é "as linhas
+1, 5 e 9 do pai" e/ou "min-max nestas 3 colunas". A view guarda só isso (``row_index`` compacto e
+a lista de ``transforms``) e referencia um CSV que não muda; as linhas são materializadas na leitura.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from app.common.files import iter_csv, read_csv
+from app.data_mining.normalization.strategies import get_strategy
+
+
+def encode_rows(positions) -> bytes:
+    # deltas deixam índices ordenados (intervalar, reservatório) quase constantes, e o zlib comprime bem
+    positions = np.asarray(positions, dtype=np.int64)
+    return zlib.compress(np.diff(positions, prepend=0).astype("<i8").tobytes())
+
+
+def decode_rows(blob: bytes) -> np.ndarray:
+    return np.cumsum(np.frombuffer(zlib.decompress(blob), dtype="<i8"))
+
+
+class DataSource:
+    """De onde uma etapa lê: um CSV no storage ou uma view (linhas + transformações) sobre ele."""
+
+    def __init__(self, url: str, rows: np.ndarray | None = None, transforms: list[dict] | None = None):
+        self.url = url
+        self.rows = rows
+        self.transforms = list(transforms or [])
+
+    @property
+    def is_view(self) -> bool:
+        return self.rows is not None or bool(self.transforms)
+
+    def columns(self) -> list[str]:
+        return list(read_csv(self.url, nrows=0).columns)
+
+    def read(self, nrows: int | None = None, **options) -> pd.DataFrame:
+        """A view inteira, ou só as ``nrows`` primeiras linhas dela."""
+        if self.rows is None:
+            if nrows is not None:
+                options["nrows"] = nrows
+            return self._transform(read_csv(self.url, **options))
+        rows = self.rows if nrows is None else self.rows[:nrows]
+        if nrows is not None:
+            options["nrows"] = int(rows.max()) + 1 if len(rows) else 0
+        frame = read_csv(self.url, **options)
+        return self._transform(frame.iloc[rows].reset_index(drop=True))
+
+    def iter(self, chunk_size: int, **options):
+        """Blocos de ``chunk_size`` linhas da view, com índice posicional contínuo como o ``iter_csv``."""
+        chunks = iter_csv(self.url, chunk_size, **options)
+        if self.rows is None:
+            return (self._transform(chunk) for chunk in chunks)
+        return (self._transform(chunk) for chunk in _rechunk(self._select(chunks), chunk_size))
+
+    def select(self, positions) -> "DataSource":
+        """View com as linhas ``positions`` (posições nesta fonte), sem tocar no pai."""
+        positions = np.asarray(positions, dtype=np.int64)
+        rows = positions if self.rows is None else self.rows[positions]
+        return DataSource(self.url, rows, self.transforms)
+
+    def then(self, transform: dict) -> "DataSource":
+        """View com mais uma transformação por coluna (``{"step", "method", "columns"}``)."""
+        return DataSource(self.url, self.rows, [*self.transforms, transform])
+
+    def view_fields(self) -> dict:
+        """Colunas do ``CleanDataset`` que guardam esta view."""
+        return {
+            "file_url": None,
+            "parent_url": self.url,
+            "row_index": None if self.rows is None else encode_rows(self.rows),
+            "transforms": self.transforms or None,
+        }
+
+    def _select(self, chunks):
+        # posições fora de ordem (amostra aleatória, top-k) só saem na ordem certa no fim
+        ordered = bool(np.all(np.diff(self.rows) >= 0))
+        order = np.arange(len(self.rows)) if ordered else np.argsort(self.rows, kind="stable")
+        wanted = self.rows[order]
+        start, picked = 0, []
+        for chunk in chunks:
+            end = start + len(chunk)
+            low, high = np.searchsorted(wanted, [start, end])
+            part = chunk.iloc[wanted[low:high] - start]
+            if ordered:
+                yield part
+            else:
+                picked.append(part.set_axis(order[low:high]))
+            start = end
+        if not ordered and picked:
+            yield pd.concat(picked).sort_index()
+
+    def _transform(self, frame: pd.DataFrame) -> pd.DataFrame:
+        for transform in self.transforms:
+            columns = [c for c in transform["columns"] if c in frame.columns]
+            if columns:
+                strategy = get_strategy(transform["method"])
+                frame[columns] = strategy.transform(frame[columns], {c: transform["columns"][c] for c in columns})
+        return frame
+
+
+def source_of(record) -> DataSource:
+    """``DataSource`` de um ``Dataset`` ou ``CleanDataset`` (arquivo próprio ou view)."""
+    if record.file_url or not getattr(record, "parent_url", None):
+        return DataSource(record.file_url)
+    rows = None if record.row_index is None else decode_rows(record.row_index)
+    return DataSource(record.parent_url, rows, record.transforms)
+
+
+def _rechunk(frames, chunk_size: int):
+    pending, buffered, start = [], 0, 0
+    for frame in frames:
+        pending.append(frame)
+        buffered += len(frame)
+        while buffered >= chunk_size:
+            merged = pd.concat(pending)
+            yield _positioned(merged.iloc[:chunk_size], start)
+            start += chunk_size
+            pending = [merged.iloc[chunk_size:]]
+            buffered -= chunk_size
+    if buffered:
+        yield _positioned(pd.concat(pending), start)
+
+
+def _positioned(frame: pd.DataFrame, start: int) -> pd.DataFrame:
+    return frame.set_axis(pd.RangeIndex(start, start + len(frame)))
@@ -0,0 +1,85 @@
+"""Medidas aproximadas sobre uma amostra uniforme, com intervalo de confiança de 95%.
+
+``precision`` é a meia largura desejada do intervalo da média, em desvios-padrão da feature: a
+amostra tem ``(1.96 / precision)²`` linhas, seja qual for o tamanho do arquivo. O intervalo de
+qualquer medida vem do método dos grupos aleatórios: a amostra é dividida em ``GROUPS`` partes,
+a medida é calculada em cada uma e a dispersão dessas estimativas dá o erro padrão. As contas são
+feitas sem arredondar; só a resposta é arredondada, com casas suficientes para o intervalo aparecer.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from app.data_mining.sampling import reservoir_sample
+
+Z = 1.96
+GROUPS = 20
+# t de Student com GROUPS - 1 graus de liberdade, para 95%
+T = 2.093
+MIN_SAMPLE = 10 * GROUPS
+# medidas escalares por feature e suaves o bastante para o método dos grupos (a amplitude, por
+# exemplo, cresce com a amostra e não tem intervalo assim), com as casas decimais da resposta exata
+SAMPLED_METHODS = {
+    "midpoint": 2, "median": None, "weighted_average": 2, "geometric_mean": 2, "harmonic_mean": 2,
+    "standard_deviation": 2, "variance": 2, "variation_coefficient": 2, "skewness": 2, "kurtosis": 2,
+}
+
+
+def sample_size(precision: float) -> int:
+    return max(math.ceil((Z / precision) ** 2), MIN_SAMPLE)
+
+
+def draw(chunks, precision: float, seed: int = 0) -> tuple[pd.DataFrame, bool]:
+    """``(amostra, exata)``: com semente fixa a mesma base dá sempre a mesma amostra (e a mesma resposta)."""
+    sample, rows = reservoir_sample(chunks, sample_size(precision), np.random.default_rng(seed))
+    if sample is None:
+        return pd.DataFrame(), True
+    return sample, len(sample) == rows
+
+
+def with_confidence(
+    measure, sample: pd.DataFrame, features: list[str], exact: bool, digits: int | None = None, seed: int = 0
+) -> dict:
+    """``{feature: {value, ci_low, ci_high, sample_size}}``; se a amostra é o arquivo inteiro, o intervalo é nulo."""
+    estimates = measure(sample, features, digits=None)
+    if exact:
+        spreads = {feature: 0.0 for feature in features}
+    else:
+        labels = np.random.default_rng(seed).permutation(len(sample)) % GROUPS
+        parts = [measure(sample[labels == group], features, digits=None) for group in range(GROUPS)]
+        spreads = {feature: _spread([part[feature] for part in parts]) for feature in features}
+    return {
+        feature: _interval(estimates[feature], spreads[feature], sample[feature], digits)
+        if estimates[feature] is not None else None
+        for feature in features
+    }
+
+
+def _spread(estimates: list) -> float:
+    values = np.array([np.nan if value is None else value for value in estimates], dtype=float)
+    values = values[np.isfinite(values)]
+    return float(T * values.std(ddof=1) / math.sqrt(len(values))) if len(values) > 1 else float("nan")
+
+
+def _interval(value: float, spread: float, column: pd.Series, digits: int | None) -> dict:
+    finite = math.isfinite(value) and math.isfinite(spread)
+    digits = _decimals(digits, spread) if finite else digits
+    return {
+        "value": _round(value, digits),
+        "ci_low": _round(value - spread, digits) if finite else None,
+        "ci_high": _round(value + spread, digits) if finite else None,
+        "sample_size": int(column.count()),
+    }
+
+
+def _decimals(digits: int | None, spread: float) -> int | None:
+    # pelo menos dois algarismos significativos da meia largura: um intervalo menor que as casas
+    # da medida não pode virar um ponto só
+    if digits is None or spread <= 0:
+        return digits
+    return max(digits, 1 - math.floor(math.log10(spread)))
+
+
+def _round(value: float, digits: int | None) -> float:
+    return float(value) if digits is None else float(round(value, digits))
@@ -0,0 +1,53 @@
+"""Covariância e correlação de todos os pares de features numa só conta matricial.
+
+Os NaN são tratados par a par (cada par usa as linhas em que as duas colunas têm valor), como
+``DataFrame.cov``/``corr``, mas sem o laço por par: com a máscara de valores presentes M e os
+valores zerados onde faltam X, todas as somas por par saem de produtos XᵀX, XᵀM, (X²)ᵀM e MᵀM,
+que o numpy manda para o BLAS.
+"""
+import numpy as np
+import pandas as pd
+
+CORRELATION_METHODS = ("pearson", "spearman")
+MATRIX_METHODS = ("covariance_matrix", "correlation_matrix")
+# p features geram p² células na resposta
+MAX_MATRIX_FEATURES = 500
+
+
+def pairwise_moments(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """``(n, cov, corr)`` p×p, com ``n`` = linhas completas do par e NaN onde ele não tem 2 linhas."""
+    mask = ~np.isnan(values)
+    weights = mask.astype(float)
+    # centrar na média da coluna não muda cov/corr, mas evita cancelamento nas somas de quadrados
+    means = np.where(mask, values, 0.0).sum(axis=0) / np.maximum(weights.sum(axis=0), 1)
+    centered = np.where(mask, values - means, 0.0)
+    n = weights.T @ weights
+    sums = centered.T @ weights          # [i, j]: soma de x_i nas linhas em que x_j também existe
+    squares = (centered ** 2).T @ weights
+    products = centered.T @ centered
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dof = np.where(n > 1, n - 1, np.nan)
+        cov = (products - sums * sums.T / n) / dof
+        var = (squares - sums ** 2 / n) / dof
+        corr = cov / np.sqrt(var * var.T)
+    return n.astype(np.int64), cov, np.clip(corr, -1.0, 1.0)
+
+
+def spearman(frame: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """``(n, corr)`` de Spearman, também com NaN tratado par a par.
+
+    Sem NaN, os postos da coluna inteira são os postos de cada par, e a conta é a de Pearson sobre
+    eles, vetorizada. Com NaN, cada par precisa ser reordenado só nas suas linhas completas; isso
+    fica com o ``corr(method="spearman")`` do pandas, que faz o laço por par em C.
+    """
+    if not frame.isna().to_numpy().any():
+        n, _, corr = pairwise_moments(frame.rank(method="average").to_numpy(dtype=float))
+        return n, corr
+    mask = frame.notna().to_numpy(dtype=float)
+    return (mask.T @ mask).astype(np.int64), frame.corr(method="spearman").to_numpy()
+
+
+def matrix_payload(matrix: np.ndarray, digits: int = 4) -> list[list[float | None]]:
+    rounded = np.round(matrix, digits).astype(object)
+    rounded[np.isnan(matrix)] = None
+    return rounded.tolist()
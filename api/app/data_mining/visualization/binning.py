@@ -0,0 +1,112 @@
+"""Faixas de histograma para várias features de uma vez: bordas float, contagens e pontos médios.
+
+A regra escolhe o número de classes a partir de estatísticas da coluna (contagem, mínimo, máximo,
+desvio, IQR), calculadas para todas as features juntas. As mesmas estatísticas vêm do DataFrame
+ou dos sketches do perfil; só as contagens dependem de onde os valores estão.
+"""
+import numpy as np
+import pandas as pd
+
+from app.common.errors import ValidationError
+
+BIN_RULES = ("sturges", "freedman_diaconis", "scott", "quantil", "fixo")
+MAX_BINS = 1000
+
+
+def validate_rule(rule: str, bins: int | None) -> None:
+    if rule not in BIN_RULES:
+        raise ValidationError("Dados inválidos!", {"bin_rule": [f"Escolha entre: {', '.join(BIN_RULES)}."]})
+    if rule == "fixo" and not bins:
+        raise ValidationError("Dados inválidos!", {"bins": ["A regra 'fixo' exige o número de classes."]})
+
+
+def class_counts(rule, count, low, high, std=None, iqr=None, bins: int | None = None) -> np.ndarray:
+    """Número de classes por feature; larguras nulas ou indefinidas caem na regra de Sturges."""
+    count = np.asarray(count, dtype=float)
+    span = np.asarray(high, dtype=float) - np.asarray(low, dtype=float)
+    sturges = np.floor(1 + 3.322 * np.log10(np.maximum(count, 1)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if rule in ("fixo", "quantil") and bins:
+            k = np.full(count.shape, float(bins))
+        elif rule == "freedman_diaconis":
+            k = np.ceil(span / (2 * np.asarray(iqr, dtype=float) * count ** (-1 / 3)))
+        elif rule == "scott":
+            k = np.ceil(span / (3.49 * np.asarray(std, dtype=float) * count ** (-1 / 3)))
+        else:
+            k = sturges
+    k = np.where(np.isfinite(k) & (k >= 1), k, sturges)
+    return np.clip(k, 1, MAX_BINS).astype(int)
+
+
+def bin_edges(low: float, high: float, k: int, quantile=None) -> np.ndarray:
+    """``k`` faixas de mesma largura, ou de mesma frequência com ``quantile(qs)``.
+
+    Coluna constante vira uma faixa de largura 1 em volta do valor, como no ``np.histogram``.
+    """
+    if high == low:
+        return np.array([low - 0.5, high + 0.5])
+    if quantile is not None:
+        edges = np.unique(quantile(np.linspace(0, 1, k + 1)))
+        return edges if len(edges) > 1 else np.array([low, high])
+    return np.linspace(low, high, k + 1)
+
+
+def histograms(df: pd.DataFrame, features: list[str], rule: str = "sturges", bins: int | None = None) -> dict:
+    """Histograma de cada feature, sobre os valores não nulos."""
+    features = list(dict.fromkeys(features))
+    values = df[features]
+    count, low, high = values.count(), values.min(), values.max()
+    std = values.std() if rule == "scott" else None
+    iqr = values.quantile(0.75) - values.quantile(0.25) if rule == "freedman_diaconis" else None
+    ks = class_counts(rule, count, low, high, std, iqr, bins)
+    results = {}
+    for feature, k in zip(features, ks):
+        column = values[feature].dropna().to_numpy(dtype=float)
+        if column.size == 0:
+            raise ValueError(f"a coluna '{feature}' não tem valores")
+        quantile = (lambda qs, column=column: np.quantile(column, qs)) if rule == "quantil" else None
+        edges = bin_edges(low[feature], high[feature], k, quantile)
+        results[feature] = histogram_payload(edges, np.histogram(column, edges)[0])
+    return results
+
+
+def sketch_histogram(moments, quantiles, rule: str = "sturges", bins: int | None = None) -> dict:
+    """O mesmo histograma a partir dos sketches: bordas de momentos/quantis, contagens do KLL."""
+    if moments.count == 0:
+        raise ValueError("a coluna não tem valores")
+    iqr = quantiles.quantile(0.75) - quantiles.quantile(0.25)
+    k = class_counts(rule, [moments.count], [moments.min], [moments.max], [moments.std()], [iqr], bins)[0]
+    quantile = (lambda qs: np.array([quantiles.quantile(q) for q in qs])) if rule == "quantil" else None
+    edges = bin_edges(moments.min, moments.max, k, quantile)
+    return histogram_payload(edges, quantiles.histogram(edges))
+
+
+def histogram_payload(edges: np.ndarray, counts: np.ndarray) -> dict:
+    midpoints = (edges[:-1] + edges[1:]) / 2
+    return {
+        "edges": edges.tolist(),
+        "counts": counts.tolist(),
+        "midpoints": midpoints.tolist(),
+        # formato antigo, mantido para os clientes que mostram a tabela de classes
+        "frequency_distribution": [
+            {"interval": f"{_label(lower)} - {_label(upper)}", "frequency": int(count)}
+            for lower, upper, count in zip(edges[:-1], edges[1:], counts)
+        ],
+    }
+
+
+def class_means(histogram: dict) -> dict:
+    """Média por classe (ponto médio) e média geral ponderada pelas contagens, direto dos arrays."""
+    midpoints, counts = np.asarray(histogram["midpoints"]), np.asarray(histogram["counts"])
+    total = counts.sum()
+    return {
+        "frequency_distribution_with_means": [
+            {**item, "class_mean": round(float(midpoint), 2)}
+            for item, midpoint in zip(histogram["frequency_distribution"], midpoints)
+        ],
+        "overall_mean": round(float(midpoints @ counts / total), 2) if total else 0,
+    }
+
+
+def _label(edge: float) -> str:
+    return np.format_float_positional(round(float(edge), 4), trim="-")
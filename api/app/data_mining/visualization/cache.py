@@ -0,0 +1,46 @@
+"""Cache dos resultados das medidas, por versão do conteúdo.
+
+A chave é (dataset, versão do conteúdo, opções da medida, grupo, método, features). A versão é o ``content_hash``
+do CSV original ou a ``fingerprint`` do dataset limpo, então um arquivo novo nunca reaproveita
+resultados antigos; ``invalidate`` só libera o espaço das entradas que não vão mais ser lidas.
+"""
+import json
+
+from app.data_mining.fingerprint import version_of
+
+# a ordem importa nas medidas de associação ("a e b" não é "b e a")
+_ORDERED_GROUPS = {"association"}
+
+
+class MeasureCache:
+    def __init__(self, backend):
+        self._backend = backend
+
+    def key(
+        self, dataset_id: int, record, group: str, method: str, features: list[str], options: dict | None = None
+    ) -> str | None:
+        """Chave da medida; None quando o registro não tem versão (resultado sem semente, base antiga)."""
+        version = version_of(record)
+        if not version:
+            return None
+        if group not in _ORDERED_GROUPS:
+            features = sorted(set(features))
+        kind = "dataset" if hasattr(record, "content_hash") else "clean"
+        # exact (sketch ou arquivo) e as faixas do histograma mudam o resultado
+        options = json.dumps(options or {}, sort_keys=True)
+        return f"{_prefix(dataset_id)}{kind}:{version}:{options}:{group}:{method}:{json.dumps(features)}"
+
+    def get(self, key: str | None):
+        return None if key is None else self._backend.get(key)
+
+    def set(self, key: str | None, value) -> None:
+        if key is not None:
+            self._backend.set(key, value)
+
+    def invalidate(self, dataset_id: int, clean_only: bool = False) -> None:
+        """Libera as entradas do dataset (ou só as do dataset limpo, numa escrita de pré-processamento)."""
+        self._backend.delete_prefix(_prefix(dataset_id) + ("clean:" if clean_only else ""))
+
+
+def _prefix(dataset_id: int) -> str:
+    return f"measure:{dataset_id}:"
@@ -0,0 +1,147 @@
+"""Medidas por classe de uma coluna (``group_by``) com um único ``groupby().agg``.
+
+Cada método precisa de algumas agregações simples por feature (soma, média, extremos, ...), às
+vezes sobre colunas derivadas (log, inverso, potências); as medidas pedidas juntam o que precisam
+num só frame e saem de uma passada. Assimetria e curtose vêm das somas de potências centradas na
+média da própria classe (um ``transform`` antes do ``agg``), para não cancelar quando as classes
+estão longe umas das outras; quartis são a única conta extra (``quantile``).
+"""
+import numpy as np
+import pandas as pd
+
+from app.common.errors import ValidationError
+from app.data_mining.sketches import is_constant
+
+MAX_GROUPS = 1000
+
+# método -> (coluna derivada, agregação) de que ele precisa
+_NEEDS = {
+    "midpoint": (("x", "mean"),),
+    "median": (("x", "median"),),
+    "weighted_average": (("xw", "sum"), ("w", "sum")),
+    "geometric_mean": (("log", "mean"),),
+    "harmonic_mean": (("inv", "sum"), ("x", "size")),
+    "amplitude": (("x", "max"), ("x", "min")),
+    "standard_deviation": (("x", "std"),),
+    "variance": (("x", "var"),),
+    "variation_coefficient": (("x", "std"), ("x", "mean")),
+    "quartiles": (),
+    "skewness": (("x", "count"), ("x", "mean"), ("p1", "sum"), ("p2", "sum"), ("p3", "sum")),
+    "kurtosis": (("x", "count"), ("x", "mean"), ("p1", "sum"), ("p2", "sum"), ("p3", "sum"), ("p4", "sum")),
+}
+GROUPED_METHODS = tuple(_NEEDS)
+
+
+def validate_groups(df: pd.DataFrame, group_by: str) -> None:
+    if group_by not in df.columns:
+        raise ValidationError("Dados inválidos!", {"group_by": [f"Campo não registrado: {group_by}"]})
+    if df[group_by].nunique() > MAX_GROUPS:
+        raise ValidationError("Dados inválidos!", {"group_by": [f"A coluna tem mais de {MAX_GROUPS} classes."]})
+
+
+def grouped_results(df: pd.DataFrame, group_by: str, specs) -> list:
+    """Resultado de cada ``(grupo, método, features)`` como ``{feature: {classe: valor}}``."""
+    validate_groups(df, group_by)
+    features = list(dict.fromkeys(f for _, _, fs in specs for f in fs if f in df.columns and f != group_by))
+    non_numeric = [feature for feature in features if not pd.api.types.is_numeric_dtype(df[feature])]
+    if non_numeric:
+        raise ValidationError("Dados inválidos!", {"features": [f"Colunas não numéricas: {', '.join(non_numeric)}"]})
+    methods = {method for _, method, _ in specs}
+    needs = {need for method in methods for need in _NEEDS[method]}
+    keys = df[group_by]
+    derived, aggregations = {}, {}
+    for feature in features:
+        for kind, function in needs:
+            if (feature, kind) not in derived:
+                derived[feature, kind] = _derived(df[feature], kind, keys)
+            aggregations.setdefault((feature, kind), []).append(function)
+    frame = pd.DataFrame(derived, index=df.index)
+    frame[group_by] = keys
+    stats = frame.groupby(group_by).agg(aggregations) if aggregations else None
+    labels = [str(label) for label in stats.index] if stats is not None else []
+    quartiles = "quartiles" in methods and features
+    quantiles = df.groupby(group_by)[features].quantile([0.25, 0.5, 0.75]) if quartiles else None
+
+    results = []
+    for _, method, spec_features in specs:
+        result = {}
+        for feature in spec_features:
+            if feature not in features:
+                result[feature] = None
+            elif method == "quartiles":
+                table = quantiles[feature].unstack()
+                result[feature] = {
+                    str(label): {"q1": _value(q1), "q2": _value(q2), "q3": _value(q3), "iqr": _value(q3 - q1)}
+                    for label, (q1, q2, q3) in zip(table.index, table.to_numpy())
+                }
+            else:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    values = _MEASURES[method](lambda kind, function: stats[feature, kind, function].to_numpy())
+                result[feature] = dict(zip(labels, (_value(value, _DIGITS.get(method)) for value in values)))
+        results.append(result)
+    return results
+
+
+def _derived(column: pd.Series, kind: str, keys: pd.Series) -> pd.Series:
+    values = column.astype(float)
+    if kind == "x":
+        return values
+    if kind == "w":
+        # mesmos pesos da média ponderada sem grupos: a posição da linha, a partir de 1
+        return pd.Series(np.arange(1, len(values) + 1), index=values.index).where(values.notna())
+    if kind == "xw":
+        return values * np.arange(1, len(values) + 1)
+    nonzero = values.replace(0, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if kind == "log":
+            return np.log(nonzero)
+        if kind == "inv":
+            return 1 / nonzero
+    # potências centradas na média da classe: p1 fica perto de 0 e as fórmulas de _central não cancelam
+    return (values - values.groupby(keys).transform("mean")) ** int(kind[1])
+
+
+def _central(get):
+    n = get("x", "count")
+    mean = get("p1", "sum") / n
+    m2 = get("p2", "sum") / n - mean ** 2
+    # classe constante: m2 é só arredondamento; NaN em vez de assimetria/curtose sem sentido
+    m2 = np.where(is_constant(m2, get("x", "mean")), np.nan, m2)
+    m3 = get("p3", "sum") / n - 3 * mean * get("p2", "sum") / n + 2 * mean ** 3
+    return mean, m2, m3
+
+
+def _skewness(get):
+    _, m2, m3 = _central(get)
+    return m3 / m2 ** 1.5
+
+
+def _kurtosis(get):
+    n = get("x", "count")
+    mean, m2, _ = _central(get)
+    m4 = (get("p4", "sum") / n - 4 * mean * get("p3", "sum") / n + 6 * mean ** 2 * get("p2", "sum") / n
+          - 3 * mean ** 4)
+    return m4 / m2 ** 2 - 3
+
+
+_MEASURES = {
+    "midpoint": lambda get: get("x", "mean"),
+    "median": lambda get: get("x", "median"),
+    "weighted_average": lambda get: get("xw", "sum") / get("w", "sum"),
+    "geometric_mean": lambda get: np.exp(get("log", "mean")),
+    "harmonic_mean": lambda get: get("x", "size") / get("inv", "sum"),
+    "amplitude": lambda get: get("x", "max") - get("x", "min"),
+    "standard_deviation": lambda get: get("x", "std"),
+    "variance": lambda get: get("x", "var"),
+    "variation_coefficient": lambda get: get("x", "std") / get("x", "mean") * 100,
+    "skewness": _skewness,
+    "kurtosis": _kurtosis,
+}
+# mesmos arredondamentos das medidas sem grupos
+_DIGITS = {method: 2 for method in _MEASURES if method not in ("median", "amplitude")}
+
+
+def _value(value, digits=None):
+    if pd.isna(value) or not np.isfinite(value):
+        return None
+    return float(round(value, digits)) if digits is not None else float(value)
@@ -1,249 +1,194 @@
+"""Medidas de visualização sobre as colunas de um dataset.
+
+Cada ``get_*_results`` aceita a fonte (URL ou ``DataSource``) ou um DataFrame já carregado e
+calcula a medida de todas as features de uma vez, coluna a coluna em numpy/pandas. ``evaluate``
+carrega uma única vez as colunas usadas por uma lista de medidas e responde todas sobre ela; média,
+dispersão, forma, mediana, quartis e histogramas saem dos sketches do perfil, quando ele cobre as
+features, sem ler o arquivo; valores frequentes também, e a moda quando o sketch a garante.
+"""
+from contextlib import contextmanager
+
 import numpy as np
-from scipy import stats
+import pandas as pd
 
-from app.common.files import read_csv
+from app.common.errors import ValidationError
+from app.common.files import iter_csv, read_csv
+from app.config import Config
+from app.data_mining.profiling import frequent_of, moments_of, quantiles_of
+from app.data_mining.sketches import FrequentItems, is_constant
+from app.data_mining.views import DataSource
+from app.data_mining.visualization.approximate import SAMPLED_METHODS, draw, with_confidence
+from app.data_mining.visualization.association import CORRELATION_METHODS, matrix_payload, pairwise_moments, spearman
+from app.data_mining.visualization.binning import class_means, histograms, sketch_histogram, validate_rule
+from app.data_mining.visualization.grouped import grouped_results
 
 
-def get_frequency_distribution_results(file_url, features):
-    results = {}
-    for feature in features:
-        results[feature] = get_frequency_distribution(file_url, feature)
-    return results
+def load_columns(source, features) -> pd.DataFrame:
+    """Só as colunas ``features`` da fonte; nomes que não existem no arquivo são ignorados."""
+    wanted = set(features)
+    options = {"usecols": lambda column: column in wanted}
+    # datasets limpos virtuais chegam como DataSource e se materializam na leitura
+    return source.read(**options) if isinstance(source, DataSource) else read_csv(source, **options)
 
 
-def get_mode_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            mode_values = df[feature].mode().tolist()
-            results[feature] = mode_values
-        else:
-            results[feature] = None
-    return results
+def iter_columns(source, features, chunk_size: int):
+    """As colunas ``features`` em blocos de ``chunk_size`` linhas, como ``load_columns``."""
+    wanted = set(features)
+    options = {"usecols": lambda column: column in wanted}
+    if isinstance(source, DataSource):
+        return source.iter(chunk_size, **options)
+    return iter_csv(source, chunk_size, **options)
 
 
-def get_midpoint_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            midpoint_values = round(df[feature].mean(), 2)
-            results[feature] = midpoint_values
-        else:
-            results[feature] = None
-    return results
+def _load(source, features) -> pd.DataFrame:
+    return source if isinstance(source, pd.DataFrame) else load_columns(source, features)
 
 
-def get_median_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            median_value = df[feature].median()
-            results[feature] = median_value
-        else:
-            results[feature] = None
-    return results
+def _present(df, features) -> list[str]:
+    return [feature for feature in dict.fromkeys(features) if feature in df.columns]
 
 
-def get_weighted_average_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            weighted_avg = np.average(df[feature], weights=df.index + 1)
-            results[feature] = round(weighted_avg, 2)
-        else:
-            results[feature] = None
-    return results
+def _by_feature(features, values: pd.Series, convert=float) -> dict:
+    # feature fora do dataset responde None, como sempre respondeu
+    return {feature: convert(values[feature]) if feature in values.index else None for feature in features}
 
 
-def get_mean_frequency_distribution_results(file_url, features):
-    results = {}
-    for feature in features:
-        freq_dist = get_frequency_distribution(file_url, feature)
-        results[feature] = calculate_mean_by_class(freq_dist["frequency_distribution"])
-    return results
+def _rounded(digits):
+    # digits=None: valor sem arredondar, para quem ainda vai fazer contas com ele
+    return float if digits is None else lambda value: float(round(value, digits))
 
 
-def get_geometric_mean_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            geometric_mean_value = round(
-                np.exp(np.log(df[feature].replace(0, np.nan)).mean()), 2
-            )
-            results[feature] = geometric_mean_value
-        else:
-            results[feature] = None
-    return results
+def _central_moments(df, features) -> tuple[pd.Series, pd.Series, pd.Series]:
+    # momentos populacionais (viés incluso), os mesmos de scipy.stats.skew/kurtosis; NaN fica de fora
+    values = df[_present(df, features)]
+    mean = values.mean()
+    centered = values - mean
+    m2 = (centered ** 2).mean()
+    # coluna constante: m2 vira NaN e assimetria e curtose também, como no scipy
+    m2 = m2.mask(is_constant(m2, mean))
+    return m2, (centered ** 3).mean(), (centered ** 4).mean()
 
 
-def get_harmonic_mean_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            harmonic_mean_value = round(
-                len(df[feature]) / np.sum(1 / df[feature].replace(0, np.nan)), 2
-            )
-            results[feature] = harmonic_mean_value
-        else:
-            results[feature] = None
-    return results
+def get_frequency_distribution_results(file_url, features, bin_rule="sturges", bins=None):
+    df = _load(file_url, features)
+    with _distribution_errors():
+        return histograms(df, features, bin_rule, bins)
 
 
-def get_skewness_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            skewness_value = float(round(stats.skew(df[feature].dropna()), 2))
-            results[feature] = skewness_value
-        else:
-            results[feature] = None
-    return results
+def get_mode_results(file_url, features):
+    df = _load(file_url, features)
+    return {feature: df[feature].mode().tolist() if feature in df.columns else None for feature in features}
 
 
-def get_kurtosis_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            kurtosis_value = float(round(stats.kurtosis(df[feature].dropna()), 2))
-            results[feature] = kurtosis_value
-        else:
-            results[feature] = None
-    return results
+def get_top_values_results(file_url, features, top_k=10):
+    """Os ``top_k`` valores mais frequentes de cada feature; sobre o arquivo as contagens são exatas."""
+    df = _load(file_url, features)
+    # capacidade >= número de linhas: nenhum contador é descartado
+    sketches = {feature: FrequentItems(max(len(df), 1)).update(df[feature]) for feature in _present(df, features)}
+    return {feature: _top_values(sketches[feature], top_k) if feature in sketches else None for feature in features}
 
 
-def get_frequency_distribution(file_url, feature):
-    try:
-        df = read_csv(file_url)
-        data = df[feature].dropna().values
-
-        n = len(data)
-        k = int(1 + 3.322 * np.log10(n))
-
-        X_max, X_min = max(data), min(data)
-        R = X_max - X_min
-        h = int(round(float(R / k)))
-
-        bins = np.arange(X_min, X_max + h, h)
-        freq, bins = np.histogram(data, bins=bins)
-
-        results = {
-            "frequency_distribution": [
-                {
-                    "interval": f"{int(bins[i])} - {int(bins[i + 1])}",
-                    "frequency": int(freq[i]),
-                }
-                for i in range(len(freq))
-            ]
-        }
-        return results
-    except Exception as e:
-        raise ValueError(f"Erro ao calcular distribuição de frequência: {e}")
+def _top_values(sketch: FrequentItems, top_k: int) -> dict:
+    return {
+        "count": sketch.count,
+        "exact": sketch.is_exact,
+        "values": [{"value": value, "min_count": low, "max_count": high} for value, low, high in sketch.top(top_k)],
+        "mode": sketch.proven_mode(),
+    }
 
 
-def calculate_mean_by_class(frequency_distribution):
-    try:
-        class_means = []
+def get_midpoint_results(file_url, features, digits=2):
+    df = _load(file_url, features)
+    return _by_feature(features, df[_present(df, features)].mean(), _rounded(digits))
 
-        for item in frequency_distribution:
-            interval = item["interval"]
-            frequency = item["frequency"]
 
-            limits = interval.split(" - ")
-            lower_limit = float(limits[0])
-            upper_limit = float(limits[1])
+def get_median_results(file_url, features, digits=None):
+    df = _load(file_url, features)
+    return _by_feature(features, df[_present(df, features)].median(), _rounded(digits))
 
-            class_mean = (lower_limit + upper_limit) / 2
 
-            class_means.append(
-                {
-                    "interval": interval,
-                    "frequency": frequency,
-                    "class_mean": round(class_mean, 2),
-                }
-            )
+def get_weighted_average_results(file_url, features, digits=2):
+    df = _load(file_url, features)
+    present = _present(df, features)
+    averages = np.average(df[present].to_numpy(dtype=float), axis=0, weights=df.index + 1) if len(df) else []
+    return _by_feature(features, pd.Series(averages, index=present, dtype=float), _rounded(digits))
 
-        return {
-            "frequency_distribution_with_means": class_means,
-            "overall_mean": calculate_overall_mean_from_classes(class_means),
-        }
 
-    except Exception as e:
-        raise ValueError(f"Erro ao calcular média por classe: {e}")
+def get_mean_frequency_distribution_results(file_url, features, bin_rule="sturges", bins=None):
+    results = get_frequency_distribution_results(file_url, features, bin_rule, bins)
+    return {feature: class_means(histogram) for feature, histogram in results.items()}
 
 
-def calculate_overall_mean_from_classes(class_means):
-    try:
-        total_freq = sum(item["frequency"] for item in class_means)
-        if total_freq == 0:
-            return 0
+def get_geometric_mean_results(file_url, features, digits=2):
+    df = _load(file_url, features)
+    values = df[_present(df, features)].replace(0, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _by_feature(features, np.exp(np.log(values).mean()), _rounded(digits))
+
+
+def get_harmonic_mean_results(file_url, features, digits=2):
+    df = _load(file_url, features)
+    values = df[_present(df, features)].replace(0, np.nan)
+    return _by_feature(features, len(df) / (1 / values).sum(), _rounded(digits))
+
+
+def get_quartile_results(file_url, features):
+    df = _load(file_url, features)
+    quartiles = df[_present(df, features)].quantile([0.25, 0.5, 0.75])
+    return {
+        feature: _quartiles(*quartiles[feature]) if feature in quartiles.columns else None for feature in features
+    }
+
+
+def _quartiles(q1, q2, q3) -> dict:
+    return {"q1": float(q1), "q2": float(q2), "q3": float(q3), "iqr": float(q3 - q1)}
 
-        weighted_sum = sum(
-            item["class_mean"] * item["frequency"] for item in class_means
-        )
-        overall_mean = weighted_sum / total_freq
 
-        return round(overall_mean, 2)
+def get_skewness_results(file_url, features, digits=2):
+    df = _load(file_url, features)
+    m2, m3, _ = _central_moments(df, features)
+    return _by_feature(features, m3 / m2 ** 1.5, _rounded(digits))
 
+
+def get_kurtosis_results(file_url, features, digits=2):
+    df = _load(file_url, features)
+    m2, _, m4 = _central_moments(df, features)
+    return _by_feature(features, m4 / m2 ** 2 - 3, _rounded(digits))
+
+
+@contextmanager
+def _distribution_errors():
+    try:
+        yield
     except Exception as e:
-        raise ValueError(f"Erro ao calcular média geral: {e}")
+        raise ValueError(f"Erro ao calcular distribuição de frequência: {e}")
+
+
+def _sketch_distribution(moments, quantiles, bin_rule="sturges", bins=None) -> dict:
+    with _distribution_errors():
+        return sketch_histogram(moments, quantiles, bin_rule, bins)
 
 
 def get_amplitude_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            amplitude_value = float(df[feature].max() - df[feature].min())
-            results[feature] = amplitude_value
-        else:
-            results[feature] = None
-    return results
+    df = _load(file_url, features)
+    values = df[_present(df, features)]
+    return _by_feature(features, values.max() - values.min())
 
 
-def get_standard_deviation_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            std_dev_value = float(round(df[feature].std(), 2))
-            results[feature] = std_dev_value
-        else:
-            results[feature] = None
-    return results
+def get_standard_deviation_results(file_url, features, digits=2):
+    df = _load(file_url, features)
+    return _by_feature(features, df[_present(df, features)].std(), _rounded(digits))
 
 
-def get_variance_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            variance_value = float(round(df[feature].var(), 2))
-            results[feature] = variance_value
-        else:
-            results[feature] = None
-    return results
+def get_variance_results(file_url, features, digits=2):
+    df = _load(file_url, features)
+    return _by_feature(features, df[_present(df, features)].var(), _rounded(digits))
 
 
-def get_variation_coefficient_results(file_url, features):
-    df = read_csv(file_url)
-    results = {}
-    for feature in features:
-        if feature in df.columns:
-            variation_coefficient_value = float(
-                round((df[feature].std() / df[feature].mean()) * 100, 2)
-            )
-            results[feature] = variation_coefficient_value
-        else:
-            results[feature] = None
-    return results
+def get_variation_coefficient_results(file_url, features, digits=2):
+    df = _load(file_url, features)
+    values = df[_present(df, features)]
+    return _by_feature(features, values.std() / values.mean() * 100, _rounded(digits))
 
 
 def get_covariance_results(file_url, features):
@@ -252,7 +197,7 @@ def get_covariance_results(file_url, features):
             "Para calcular a covariância são necessárias exatamente 2 features."
         )
 
-    df = read_csv(file_url)
+    df = _load(file_url, features)
     feature1, feature2 = features
 
     if feature1 not in df.columns or feature2 not in df.columns:
@@ -281,7 +226,7 @@ def get_correlation_results(file_url, features):
             "Para calcular a correlação são necessárias exatamente 2 features."
         )
 
-    df = read_csv(file_url)
+    df = _load(file_url, features)
     feature1, feature2 = features
 
     if feature1 not in df.columns or feature2 not in df.columns:
@@ -306,6 +251,45 @@ def get_correlation_results(file_url, features):
     return result
 
 
+def get_covariance_matrix_results(file_url, features):
+    """Covariância de todos os pares de ``features`` numa só conta, com NaN tratado par a par."""
+    names, values = _pairwise(file_url, features)
+    n, covariance, _ = pairwise_moments(values.to_numpy(dtype=float))
+    return {"features": names, "covariance": matrix_payload(covariance), "sample_size": n.tolist()}
+
+
+def get_correlation_matrix_results(file_url, features, correlation_method="pearson"):
+    """Correlação de Pearson (ou de Spearman, sobre os postos) de todos os pares de ``features``."""
+    if correlation_method not in CORRELATION_METHODS:
+        raise ValidationError("Dados inválidos!", {"correlation_method": [
+            f"Escolha entre: {', '.join(CORRELATION_METHODS)}."
+        ]})
+    names, values = _pairwise(file_url, features)
+    if correlation_method == "spearman":
+        n, correlation = spearman(values)
+    else:
+        n, _, correlation = pairwise_moments(values.to_numpy(dtype=float))
+    return {
+        "features": names,
+        "method": correlation_method,
+        "correlation": matrix_payload(correlation),
+        "sample_size": n.tolist(),
+    }
+
+
+def _pairwise(file_url, features) -> tuple[list[str], pd.DataFrame]:
+    names = list(dict.fromkeys(features))
+    df = _load(file_url, names)
+    missing = [feature for feature in names if feature not in df.columns]
+    if missing:
+        raise ValidationError("Dados inválidos!", {"features": [f"Campos não registrados: {', '.join(missing)}"]})
+    values = df[names]
+    non_numeric = [feature for feature in names if not pd.api.types.is_numeric_dtype(values[feature])]
+    if non_numeric:
+        raise ValidationError("Dados inválidos!", {"features": [f"Colunas não numéricas: {', '.join(non_numeric)}"]})
+    return names, values
+
+
 def interpret_covariance(covariance):
     if covariance > 0:
         return "Covariância positiva: As variáveis tendem a mover-se na mesma direção."
@@ -345,6 +329,7 @@ def interpret_correlation(correlation):
 CENTRAL_TENDENCY = {
     "frequency_distribution": get_frequency_distribution_results,
     "mode": get_mode_results,
+    "top_values": get_top_values_results,
     "midpoint": get_midpoint_results,
     "median": get_median_results,
     "weighted_average": get_weighted_average_results,
@@ -357,6 +342,114 @@ DISPERSION = {
     "standard_deviation": get_standard_deviation_results,
     "variance": get_variance_results,
     "variation_coefficient": get_variation_coefficient_results,
+    "quartiles": get_quartile_results,
 }
 SHAPE = {"skewness": get_skewness_results, "kurtosis": get_kurtosis_results}
-ASSOCIATION = {"covariance": get_covariance_results, "correlation": get_correlation_results}
+ASSOCIATION = {
+    "covariance": get_covariance_results,
+    "correlation": get_correlation_results,
+    "covariance_matrix": get_covariance_matrix_results,
+    "correlation_matrix": get_correlation_matrix_results,
+}
+
+MEASURE_GROUPS = {
+    "central_tendency": CENTRAL_TENDENCY,
+    "dispersion": DISPERSION,
+    "shape": SHAPE,
+    "association": ASSOCIATION,
+}
+
+
+def evaluate(
+    source, specs, profile: dict | None = None, exact: bool = False, bin_rule: str = "sturges", bins: int | None = None,
+    correlation_method: str = "pearson", group_by: str | None = None, top_k: int = 10, precision: float | None = None,
+) -> list:
+    """Resultados de ``specs`` — tuplas ``(grupo, método, features)`` — com no máximo uma leitura da fonte.
+
+    Medidas que os sketches do ``profile`` respondem não leem nada (``exact`` desliga esse atalho);
+    para as outras, só as colunas usadas são carregadas, e cada medida recebe o mesmo DataFrame.
+    ``bin_rule`` e ``bins`` valem para as distribuições de frequência, ``correlation_method`` para a
+    matriz de correlação, ``top_k`` para os valores mais frequentes. Com ``group_by`` cada medida sai
+    por classe dessa coluna, de um único ``groupby().agg`` (o perfil não tem sketches por classe).
+    Com ``precision`` cada medida sai de uma amostra uniforme, com intervalo de confiança.
+    """
+    validate_rule(bin_rule, bins)
+    if precision is not None:
+        features = [feature for _, _, features in specs for feature in features]
+        chunk_size = profile["chunk_rows"] if profile else Config.CSV_CHUNK_SIZE
+        sample, exact_sample = draw(iter_columns(source, features, chunk_size), precision)
+        return [
+            with_confidence(MEASURE_GROUPS[group][method], sample, features, exact_sample, SAMPLED_METHODS[method])
+            for group, method, features in specs
+        ]
+    if group_by is not None:
+        df = load_columns(source, [group_by, *(feature for _, _, features in specs for feature in features)])
+        return grouped_results(df, group_by, specs)
+    given = {"bin_rule": bin_rule, "bins": bins, "correlation_method": correlation_method, "top_k": top_k}
+    options = [{name: given[name] for name in _METHOD_OPTIONS.get(method, ())} for _, method, _ in specs]
+    sketches = {} if exact else _column_sketches(profile)
+    frequent = {} if exact else frequent_of(profile)
+    results = [
+        _from_frequent(method, features, frequent, opts) if method in _FROM_FREQUENT
+        else _from_sketches(method, features, sketches, opts)
+        for (_, method, features), opts in zip(specs, options)
+    ]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+        df = load_columns(source, [feature for i in pending for feature in specs[i][2]])
+        for i in pending:
+            group, method, features = specs[i]
+            results[i] = MEASURE_GROUPS[group][method](df, features, **options[i])
+    return results
+
+
+# (momentos, quantis) -> resultado, com os mesmos arredondamentos do cálculo sobre o DataFrame;
+# momentos são exatos a menos de ponto flutuante, quantis e contagens seguem o erro do sketch
+_FROM_SKETCHES = {
+    "midpoint": lambda moments, _: float(round(moments.mean, 2)),
+    "amplitude": lambda moments, _: float(moments.max - moments.min),
+    "standard_deviation": lambda moments, _: float(round(moments.std(), 2)),
+    "variance": lambda moments, _: float(round(moments.variance(), 2)),
+    "variation_coefficient": lambda moments, _: float(round(np.float64(moments.std()) / moments.mean * 100, 2)),
+    "skewness": lambda moments, _: float(round(moments.skewness(), 2)),
+    "kurtosis": lambda moments, _: float(round(moments.kurtosis(), 2)),
+    "median": lambda _, quantiles: quantiles.quantile(0.5),
+    "quartiles": lambda _, quantiles: _quartiles(*(quantiles.quantile(q) for q in (0.25, 0.5, 0.75))),
+    "frequency_distribution": _sketch_distribution,
+    "mean_frequency_distribution": lambda *sketches, **binning: class_means(_sketch_distribution(*sketches, **binning)),
+}
+# opções da requisição que cada medida recebe
+_METHOD_OPTIONS = {
+    "frequency_distribution": ("bin_rule", "bins"),
+    "mean_frequency_distribution": ("bin_rule", "bins"),
+    "correlation_matrix": ("correlation_method",),
+    "top_values": ("top_k",),
+}
+# moda e valores frequentes saem do Misra–Gries do perfil; a moda só quando o sketch a garante
+_FROM_FREQUENT = {
+    "mode": lambda sketch: sketch.proven_mode(),
+    "top_values": _top_values,
+}
+
+
+def _column_sketches(profile: dict | None) -> dict:
+    moments, quantiles = moments_of(profile), quantiles_of(profile)
+    # coluna só com NaN fica de fora: o cálculo sobre o DataFrame responde NaN, não 0 ou -inf
+    return {
+        column: (moments[column], quantiles[column])
+        for column in moments.keys() & quantiles.keys() if moments[column].count
+    }
+
+
+def _from_sketches(method: str, features: list[str], sketches: dict, options: dict) -> dict | None:
+    if method not in _FROM_SKETCHES or not all(feature in sketches for feature in features):
+        return None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {feature: _FROM_SKETCHES[method](*sketches[feature], **options) for feature in features}
+
+
+def _from_frequent(method: str, features: list[str], frequent: dict, options: dict) -> dict | None:
+    if not all(feature in frequent for feature in features):
+        return None
+    results = {feature: _FROM_FREQUENT[method](frequent[feature], **options) for feature in features}
+    return None if any(result is None for result in results.values()) else results
@@ -3,7 +3,7 @@ from app.schemas.data_mining.classification import ClassificationSchema
 from app.schemas.data_mining.cleaning import DataCleaningSchema
 from app.schemas.data_mining.normalization import DataNormalizationSchema
 from app.schemas.data_mining.reduction import DataReductionSchema
-from app.schemas.data_mining.visualization import VisualizationSchema
+from app.schemas.data_mining.visualization import VisualizationBatchSchema, VisualizationSchema
 from app.schemas.dataset import (CleanDatasetReadSchema, DatasetCreateSchema,
                                  DatasetReadSchema, DatasetUpdateSchema)
 from app.schemas.project import (DatasetSummarySchema, ProjectCreateSchema,
@@ -19,7 +19,7 @@ _SCHEMAS = [
     ProjectDetailSchema, DatasetSummarySchema,
     DatasetCreateSchema, DatasetUpdateSchema, DatasetReadSchema, CleanDatasetReadSchema,
     DataCleaningSchema, DataNormalizationSchema, DataReductionSchema,
-    ClassificationSchema, VisualizationSchema,
+    ClassificationSchema, VisualizationSchema, VisualizationBatchSchema,
 ]
 
 
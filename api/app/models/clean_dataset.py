@@ -7,14 +7,34 @@ class CleanDataset(db.Model):
     __tablename__ = "clean_datasets"
     id = db.Column(db.Integer, primary_key=True)
     size_file = db.Column(db.String(255), nullable=False)
-    file_url = db.Column(db.String(255), nullable=False)
+    # sem arquivo próprio quando é uma view sobre parent_url (ver app/data_mining/views.py)
+    file_url = db.Column(db.String(255), nullable=True)
+    parent_url = db.Column(db.String(255), nullable=True)
+    row_index = db.Column(db.LargeBinary, nullable=True)
+    transforms = db.Column(db.JSON, nullable=True)
     dataset_id = db.Column(
         db.Integer, db.ForeignKey("datasets.id"), nullable=False, unique=True
     )
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    # parâmetros ajustados pela etapa que gerou o arquivo (ex.: min/max da normalização)
+    params = db.Column(db.JSON, nullable=True)
+    # zone map por bloco do arquivo (ver app/data_mining/profiling.py)
+    profile = db.Column(db.JSON, nullable=True)
+    # versão da entrada e impressão digital da execução que gerou o registro (ver app/data_mining/fingerprint.py)
+    source_version = db.Column(db.String(64), nullable=True)
+    fingerprint = db.Column(db.String(64), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=None, onupdate=datetime.utcnow)
 
     # Relacionamentos
     dataset = db.relationship("Dataset", back_populates="clean_dataset")
     user = db.relationship("User", back_populates="clean_datasets")
+
+    @property
+    def is_view(self) -> bool:
+        return not self.file_url and bool(self.parent_url)
+
+    def stored_urls(self) -> set[str]:
+        """Arquivos no storage que pertencem a este registro; o CSV original é do dataset."""
+        urls = {self.file_url, self.parent_url} - {None}
+        return urls - {self.dataset.file_url} if self.dataset else urls
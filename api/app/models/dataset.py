@@ -11,6 +11,10 @@ class Dataset(db.Model):
     description = db.Column(db.String(2000), nullable=True)
     size_file = db.Column(db.String(255), nullable=False)
     file_url = db.Column(db.String(255), nullable=True)
+    # zone map por bloco do arquivo (ver app/data_mining/profiling.py)
+    profile = db.Column(db.JSON, nullable=True)
+    # sha256 do CSV enviado; versão da fonte para memoização do pré-processamento
+    content_hash = db.Column(db.String(64), nullable=True)
     created_at = db.Column(db.TIMESTAMP, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(
         db.TIMESTAMP, default=None, onupdate=datetime.utcnow, nullable=True
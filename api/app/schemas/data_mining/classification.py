@@ -11,6 +11,8 @@ class ClassificationSchema(BaseModel):
     k_neighbors: int = Field(default=5, ge=1)
     test_size: float = Field(default=0.3, ge=0.1, le=0.9)
     use_clean_dataset: bool = False
+    encoding: str | None = None
+    hash_features: int = Field(default=1024, ge=2, le=2**20)
 
     @model_validator(mode="after")
     def _check(self):
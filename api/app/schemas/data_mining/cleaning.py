@@ -5,3 +5,8 @@ class DataCleaningSchema(BaseModel):
     features: list[str] = Field(min_length=1)
     methods: str
     missing_values: list[str] = Field(min_length=1, max_length=4)
+    group_by: str | None = None
+    knn_neighbors: int = Field(default=5, ge=1)
+    chunked: bool = False
+    dry_run: bool = False
+    dry_run_rows: int | None = Field(default=None, ge=1)
@@ -4,3 +4,7 @@ from pydantic import BaseModel, Field
 class DataNormalizationSchema(BaseModel):
     features: list[str] = Field(min_length=1)
     methods: str
+    chunked: bool = False
+    virtual: bool = False
+    dry_run: bool = False
+    dry_run_rows: int | None = Field(default=None, ge=1)
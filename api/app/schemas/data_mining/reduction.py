@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class DataReductionSchema(BaseModel):
@@ -6,5 +6,31 @@ class DataReductionSchema(BaseModel):
     methods: str
     target: str | None = None
     random_records: int | None = None
+    random_seed: int | None = Field(default=None, ge=0)
     systematic_records: int | None = None
     systematic_method: str | None = None
+    interval_records: int | None = Field(default=None, ge=1)
+    stratified_records: int | None = Field(default=None, ge=1)
+    stratified_allocation: str | None = None
+    outlier_method: str | None = None
+    outlier_threshold: float | None = Field(default=None, gt=0)
+    outlier_action: str | None = None
+    dedup_keep: str | None = None
+    dedup_max_hashes: int = Field(default=10_000_000, ge=1)
+    encoding: str | None = None
+    hash_features: int = Field(default=1024, ge=2, le=2**20)
+    n_components: int | None = Field(default=None, ge=1)
+    explained_variance: float | None = Field(default=None, gt=0, lt=1)
+    jl_epsilon: float | None = Field(default=None, gt=0, lt=1)
+    chunked: bool = False
+    virtual: bool = False
+    dry_run: bool = False
+    dry_run_rows: int | None = Field(default=None, ge=1)
+
+    @model_validator(mode="after")
+    def _check(self):
+        if self.n_components and self.explained_variance:
+            raise ValueError("Informe n_components ou explained_variance, não os dois.")
+        if self.n_components and self.jl_epsilon:
+            raise ValueError("Informe n_components ou jl_epsilon, não os dois.")
+        return self
@@ -5,3 +5,36 @@ class VisualizationSchema(BaseModel):
     features: list[str] = Field(min_length=1)
     visualization_method: str
     use_clean_dataset: bool = False
+    # ignora os sketches do perfil e calcula sobre o arquivo
+    exact: bool = False
+    # faixas das distribuições de frequência: sturges, freedman_diaconis, scott, quantil ou fixo
+    bin_rule: str = "sturges"
+    bins: int | None = Field(default=None, ge=1, le=1000)
+    # matriz de correlação: pearson ou spearman
+    correlation_method: str = "pearson"
+    # quantos valores mais frequentes devolver em top_values
+    top_k: int = Field(default=10, ge=1, le=100)
+    # coluna de classes: as medidas de tendência central, dispersão e forma saem por classe
+    group_by: str | None = None
+    # meia largura do IC de 95% da média, em desvios-padrão: calcula sobre uma amostra do tamanho necessário
+    precision: float | None = Field(default=None, gt=0, lt=1)
+
+
+class VisualizationBatchItemSchema(BaseModel):
+    group: str
+    method: str
+    features: list[str] = Field(min_length=1)
+    # chave do resultado na resposta; padrão "<group>.<method>"
+    key: str | None = None
+
+
+class VisualizationBatchSchema(BaseModel):
+    measures: list[VisualizationBatchItemSchema] = Field(min_length=1, max_length=100)
+    use_clean_dataset: bool = False
+    exact: bool = False
+    bin_rule: str = "sturges"
+    bins: int | None = Field(default=None, ge=1, le=1000)
+    correlation_method: str = "pearson"
+    group_by: str | None = None
+    top_k: int = Field(default=10, ge=1, le=100)
+    precision: float | None = Field(default=None, gt=0, lt=1)
@@ -17,7 +17,9 @@ class CleanDatasetReadSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: int
     size_file: str
-    file_url: str
+    file_url: str | None
+    parent_url: str | None = None
+    params: dict | None = None
 
 
 class DatasetReadSchema(BaseModel):
@@ -1,6 +1,7 @@
 from app.common.errors import NotFoundError, ValidationError
 from app.common.files import read_csv
 from app.data_mining.classification.strategies import get_strategy
+from app.data_mining.views import DataSource, source_of
 from app.repositories.clean_dataset_repository import CleanDatasetRepository
 from app.repositories.dataset_repository import DatasetRepository
 
@@ -20,9 +21,9 @@ class ClassificationService:
             clean = self._clean.get_by_dataset(dataset.id)
             if not clean:
                 raise NotFoundError("Dataset limpo não encontrado!")
-            file_url = clean.file_url
+            file_url = source_of(clean)
 
-        df = read_csv(file_url)
+        df = file_url.read() if isinstance(file_url, DataSource) else read_csv(file_url)
         if len(df) < 4:
             raise ValidationError("Dados inválidos!", {"dataset": ["O dataset deve ter pelo menos 4 amostras."]})
         invalid = [f for f in data.features if f not in df.columns]
@@ -2,20 +2,29 @@ import pandas as pd
 
 from app.common.decorators import transactional
 from app.common.errors import NotFoundError, ValidationError
-from app.common.files import dataframe_to_csv_upload, read_csv
+from app.common.files import (chunks_to_csv_upload, dataframe_to_csv_upload, iter_csv,
+                              missing_value_options, read_csv)
 from app.data_mining.cleaning.strategies import get_strategy
+from app.data_mining.fingerprint import matches, run_fingerprint, version_of
+from app.data_mining.preview import dry_run_report
+from app.data_mining.profiling import ProfileBuilder, profile_frame
 from app.models import CleanDataset
 from app.repositories.clean_dataset_repository import CleanDatasetRepository
 from app.repositories.dataset_repository import DatasetRepository
 
-_MISSING_MAP = {"null": None, "0": 0, "?": "?", "": None}
+_STEP = "cleaning"
 
 
 class DataCleaningService:
-    def __init__(self, datasets: DatasetRepository, clean_datasets: CleanDatasetRepository, storage):
+    def __init__(
+        self, datasets: DatasetRepository, clean_datasets: CleanDatasetRepository, storage, chunk_size: int = 50_000,
+        cache=None,
+    ):
         self._datasets = datasets
         self._clean = clean_datasets
         self._storage = storage
+        self._chunk_size = chunk_size
+        self._cache = cache
 
     @transactional
     def clean(self, dataset_id: int, data, user_id: int) -> CleanDataset:
@@ -23,35 +32,81 @@ class DataCleaningService:
         if not dataset:
             raise NotFoundError("Base de dados não encontrada!")
 
-        df_original = read_csv(dataset.file_url)
-        self._validate_features(df_original, data.features)
-        df_clean = self._apply(df_original, data)
+        existing = self._clean.get_by_dataset(dataset.id)
+        if matches(existing, _STEP, data) and existing.source_version == version_of(dataset):
+            return existing
 
         filename = f"{dataset.file_url.split('/')[-1].split('.')[0]}_clean.csv"
-        upload, size_label = dataframe_to_csv_upload(df_clean, filename)
+        options = missing_value_options(data.features, data.missing_values)
+        if data.chunked:
+            self._validate_features(read_csv(dataset.file_url, nrows=0), data.features)
+            builder = ProfileBuilder(self._chunk_size)
+            chunks = builder.track(self._apply_chunks(dataset.file_url, data, options))
+            upload, size_label = chunks_to_csv_upload(chunks, filename)
+            profile = builder.result()
+        else:
+            df_original = read_csv(dataset.file_url, **options)
+            self._validate_features(df_original, data.features)
+            df_clean = self._apply(df_original, data)
+            upload, size_label = dataframe_to_csv_upload(df_clean, filename)
+            profile = profile_frame(df_clean, self._chunk_size)
         file_url = self._storage.upload(upload)
 
-        existing = self._clean.get_by_dataset(dataset.id)
         if existing:
-            if existing.file_url:
-                self._storage.delete(existing.file_url)
+            for url in existing.stored_urls() - {file_url}:
+                self._storage.delete(url)
             self._clean.delete(existing)
+        if self._cache:
+            self._cache.invalidate(dataset.id, clean_only=True)
 
         return self._clean.add(CleanDataset(
-            size_file=size_label, file_url=file_url, dataset_id=dataset.id, user_id=user_id,
+            size_file=size_label, file_url=file_url, dataset_id=dataset.id, user_id=user_id, profile=profile,
+            source_version=version_of(dataset), fingerprint=run_fingerprint(version_of(dataset), _STEP, data),
         ))
 
+    def preview(self, dataset_id: int, data, user_id: int) -> dict:
+        """``dry_run``: limpa em memória (ou só as ``dry_run_rows`` primeiras linhas) sem gravar nada."""
+        dataset = self._datasets.get_owned(dataset_id, user_id)
+        if not dataset:
+            raise NotFoundError("Base de dados não encontrada!")
+        options = missing_value_options(data.features, data.missing_values)
+        if data.dry_run_rows:
+            options["nrows"] = data.dry_run_rows
+        df_original = read_csv(dataset.file_url, **options)
+        self._validate_features(df_original, data.features)
+        return dry_run_report(df_original, self._apply(df_original, data))
+
     def _apply(self, df, data):
-        missing = [_MISSING_MAP.get(v, v) for v in data.missing_values]
+        # as sentinelas já chegam como NaN do parser; to_numeric só converte o que sobrou como texto
         strategy = get_strategy(data.methods)
         result = df.copy()
         for column in data.features:
-            result[column] = result[column].replace(missing, pd.NA)
-            result[column] = strategy.apply(pd.to_numeric(result[column], errors="coerce"))
-        return result
+            result[column] = _numeric(result[column])
+        return strategy.fill(result, data.features, data.model_dump())
+
+    def _apply_chunks(self, file_url, data, options):
+        """Dois passos sobre o arquivo: acumula um sketch por feature e depois preenche bloco a bloco."""
+        strategy = get_strategy(data.methods)
+        sketches = {column: strategy.sketch() for column in data.features}
+        for chunk in iter_csv(file_url, self._chunk_size, usecols=data.features, **options):
+            for column, sketch in sketches.items():
+                sketch.update(_numeric(chunk[column]))
+        fills = {column: strategy.fill_value(sketch) for column, sketch in sketches.items()}
+
+        for chunk in iter_csv(file_url, self._chunk_size, **options):
+            for column, value in fills.items():
+                values = _numeric(chunk[column])
+                chunk[column] = values if value is None else values.fillna(value)
+            yield chunk
 
     @staticmethod
     def _validate_features(df, features):
         invalid = [f for f in features if f not in df.columns]
         if invalid:
             raise ValidationError("Dados inválidos!", {"features": [f"Campos não registrados: {', '.join(invalid)}"]})
+
+
+def _numeric(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(values):
+        return values
+    return pd.to_numeric(values, errors="coerce")
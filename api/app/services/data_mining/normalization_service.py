@@ -1,19 +1,33 @@
+from itertools import chain
+
 import pandas as pd
 
 from app.common.decorators import transactional
 from app.common.errors import NotFoundError, ValidationError
-from app.common.files import dataframe_to_csv_upload, read_csv
+from app.common.files import bytes_to_mb_label, chunks_to_csv_upload, dataframe_to_csv_upload, iter_csv
+from app.data_mining.fingerprint import matches, run_fingerprint, version_of
 from app.data_mining.normalization.strategies import get_strategy
+from app.data_mining.preview import dry_run_report
+from app.data_mining.profiling import ProfileBuilder, profile_frame
+from app.data_mining.sketches import MomentSketch
+from app.data_mining.views import source_of
 from app.models import CleanDataset
 from app.repositories.clean_dataset_repository import CleanDatasetRepository
 from app.repositories.dataset_repository import DatasetRepository
 
+_STEP = "normalization"
+
 
 class DataNormalizationService:
-    def __init__(self, datasets: DatasetRepository, clean_datasets: CleanDatasetRepository, storage):
+    def __init__(
+        self, datasets: DatasetRepository, clean_datasets: CleanDatasetRepository, storage, chunk_size: int = 50_000,
+        cache=None,
+    ):
         self._datasets = datasets
         self._clean = clean_datasets
         self._storage = storage
+        self._chunk_size = chunk_size
+        self._cache = cache
 
     @transactional
     def normalize(self, dataset_id: int, data, user_id: int) -> CleanDataset:
@@ -22,33 +36,127 @@ class DataNormalizationService:
             raise NotFoundError("Base de dados não encontrada!")
 
         existing = self._clean.get_by_dataset(dataset.id)
-        source_url = existing.file_url if existing else dataset.file_url
-
-        df = read_csv(source_url)
-        invalid = [f for f in data.features if f not in df.columns]
-        if invalid:
-            raise ValidationError("Dados inválidos!", {"features": [f"Campos não registrados: {', '.join(invalid)}"]})
-
-        non_numeric = [f for f in data.features if not pd.api.types.is_numeric_dtype(df[f])]
-        if non_numeric:
-            raise ValidationError(
-                "Dados inválidos!",
-                {"features": [f"Colunas não numéricas: {', '.join(non_numeric)}"]},
-            )
+        if matches(existing, _STEP, data):
+            # reenvio da mesma normalização: reaplicar sobre o próprio resultado não muda nada
+            return existing
+        source_version = version_of(existing or dataset)
+        source = source_of(existing or dataset)
 
+        base_name = dataset.file_url.split("/")[-1].split(".")[0].split("_")[0]
+        filename = f"{base_name}_normalized.csv"
         strategy = get_strategy(data.methods)
-        for feature in data.features:
-            df[feature] = strategy.apply(df[feature])
+        if data.chunked:
+            _validate_features(source.columns(), data.features)
+            columns = self._fit_chunks(strategy, source, data.features)
+            builder = ProfileBuilder(self._chunk_size)
+            chunks = builder.track(_transform_chunks(strategy, columns, source.iter(self._chunk_size)))
+            if data.virtual:
+                for _ in chunks:
+                    pass
+            else:
+                upload, size_label = chunks_to_csv_upload(chunks, filename)
+            profile = builder.result()
+        else:
+            df = source.read()
+            _validate_features(df.columns, data.features)
+            _validate_numeric(df, data.features)
+            columns = strategy.fit(df[data.features])
+            df[data.features] = strategy.transform(df[data.features], columns)
+            if not data.virtual:
+                upload, size_label = dataframe_to_csv_upload(df, filename)
+            profile = profile_frame(df, self._chunk_size)
 
-        base_name = dataset.file_url.split("/")[-1].split(".")[0].split("_")[0]
-        upload, size_label = dataframe_to_csv_upload(df, f"{base_name}_normalized.csv")
-        file_url = self._storage.upload(upload)
+        params = {"step": _STEP, "method": strategy.name, "columns": columns}
+        if data.virtual:
+            # só os parâmetros por coluna vão para o banco; o pai continua sendo a fonte
+            fields = source.then(params).view_fields()
+            size_label = bytes_to_mb_label(len(fields["row_index"] or b""))
+        else:
+            fields = {"file_url": self._storage.upload(upload)}
 
         if existing:
-            if existing.file_url:
-                self._storage.delete(existing.file_url)
+            for url in existing.stored_urls() - {fields["file_url"], fields.get("parent_url")}:
+                self._storage.delete(url)
             self._clean.delete(existing)
+        if self._cache:
+            self._cache.invalidate(dataset.id, clean_only=True)
 
         return self._clean.add(CleanDataset(
-            size_file=size_label, file_url=file_url, dataset_id=dataset.id, user_id=user_id,
+            size_file=size_label, dataset_id=dataset.id, user_id=user_id, params=params, profile=profile, **fields,
+            source_version=source_version, fingerprint=run_fingerprint(source_version, _STEP, data),
         ))
+
+    def preview(self, dataset_id: int, data, user_id: int) -> dict:
+        """``dry_run``: ajusta e aplica em memória (ou nas ``dry_run_rows`` primeiras linhas) sem gravar nada."""
+        dataset = self._datasets.get_owned(dataset_id, user_id)
+        if not dataset:
+            raise NotFoundError("Base de dados não encontrada!")
+        df = source_of(self._clean.get_by_dataset(dataset.id) or dataset).read(nrows=data.dry_run_rows)
+        _validate_features(df.columns, data.features)
+        _validate_numeric(df, data.features)
+        strategy = get_strategy(data.methods)
+        columns = strategy.fit(df[data.features])
+        normalized = df.copy()
+        normalized[data.features] = strategy.transform(df[data.features], columns)
+        params = {"step": _STEP, "method": strategy.name, "columns": columns}
+        return {**dry_run_report(df, normalized), "params": params}
+
+    def transform(self, dataset_id: int, csv_file, user_id: int):
+        """Aplica os parâmetros salvos na última normalização a um CSV novo, bloco a bloco.
+
+        Devolve um gerador de pedaços de CSV; as validações rodam antes do primeiro ``yield``.
+        """
+        dataset = self._datasets.get_owned(dataset_id, user_id)
+        if not dataset:
+            raise NotFoundError("Base de dados não encontrada!")
+
+        clean = self._clean.get_by_dataset(dataset.id)
+        params = clean.params if clean else None
+        if not params or params.get("step") != _STEP:
+            raise NotFoundError("Parâmetros de normalização não encontrados!")
+
+        try:
+            chunks = iter_csv(csv_file, self._chunk_size)
+            first = next(chunks)
+        except (pd.errors.EmptyDataError, StopIteration):
+            raise ValidationError("Dados inválidos!", {"csv_file": ["O arquivo está vazio."]})
+        features = list(params["columns"])
+        missing = [f for f in features if f not in first.columns]
+        if missing:
+            raise ValidationError("Dados inválidos!", {"csv_file": [f"Campos não registrados: {', '.join(missing)}"]})
+
+        strategy = get_strategy(params["method"])
+        chunks = _transform_chunks(strategy, params["columns"], chain([first], chunks), coerce=True)
+        return (chunk.to_csv(index=False, header=i == 0) for i, chunk in enumerate(chunks))
+
+    def _fit_chunks(self, strategy, source, features: list[str]) -> dict:
+        """1º passo do modo em blocos: min/max/média/M2 mergeáveis por feature, sem carregar o arquivo."""
+        sketches = {feature: MomentSketch() for feature in features}
+        for chunk in source.iter(self._chunk_size, usecols=features):
+            _validate_numeric(chunk, features)
+            for feature, sketch in sketches.items():
+                sketch.update(chunk[feature].to_numpy())
+        return strategy.fit_sketches(sketches)
+
+
+def _transform_chunks(strategy, columns: dict, chunks, coerce: bool = False):
+    features = list(columns)
+    for chunk in chunks:
+        values = chunk[features].apply(pd.to_numeric, errors="coerce") if coerce else chunk[features]
+        chunk[features] = strategy.transform(values, columns)
+        yield chunk
+
+
+def _validate_features(columns, features):
+    invalid = [f for f in features if f not in columns]
+    if invalid:
+        raise ValidationError("Dados inválidos!", {"features": [f"Campos não registrados: {', '.join(invalid)}"]})
+
+
+def _validate_numeric(df, features):
+    non_numeric = [f for f in features if not pd.api.types.is_numeric_dtype(df[f])]
+    if non_numeric:
+        raise ValidationError(
+            "Dados inválidos!",
+            {"features": [f"Colunas não numéricas: {', '.join(non_numeric)}"]},
+        )
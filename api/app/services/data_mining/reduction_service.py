@@ -1,17 +1,30 @@
+import numpy as np
+
 from app.common.decorators import transactional
 from app.common.errors import NotFoundError, ValidationError
-from app.common.files import dataframe_to_csv_upload, read_csv
+from app.common.files import bytes_to_mb_label, chunks_to_csv_upload, dataframe_to_csv_upload
+from app.data_mining.fingerprint import matches, run_fingerprint, version_of
+from app.data_mining.preview import dry_run_report
+from app.data_mining.profiling import ProfileBuilder, profile_frame
 from app.data_mining.reduction.strategies import get_strategy
+from app.data_mining.views import source_of
 from app.models import CleanDataset
 from app.repositories.clean_dataset_repository import CleanDatasetRepository
 from app.repositories.dataset_repository import DatasetRepository
 
+_STEP = "reduction"
+
 
 class DataReductionService:
-    def __init__(self, datasets: DatasetRepository, clean_datasets: CleanDatasetRepository, storage):
+    def __init__(
+        self, datasets: DatasetRepository, clean_datasets: CleanDatasetRepository, storage, chunk_size: int = 50_000,
+        cache=None,
+    ):
         self._datasets = datasets
         self._clean = clean_datasets
         self._storage = storage
+        self._chunk_size = chunk_size
+        self._cache = cache
 
     @transactional
     def reduce(self, dataset_id: int, data, user_id: int) -> CleanDataset:
@@ -20,25 +33,79 @@ class DataReductionService:
             raise NotFoundError("Base de dados não encontrada!")
 
         existing = self._clean.get_by_dataset(dataset.id)
-        source_url = existing.file_url if existing else dataset.file_url
-
-        df = read_csv(source_url)
-        invalid = [f for f in data.features if f not in df.columns]
-        if invalid:
-            raise ValidationError("Dados inválidos!", {"features": [f"Campos não registrados: {', '.join(invalid)}"]})
-
         strategy = get_strategy(data.methods)
-        reduced = strategy.reduce(df, data.features, data.model_dump())
+        # sem semente, repetir a amostragem deve sortear de novo
+        deterministic = not strategy.randomized or data.random_seed is not None
+        if deterministic and matches(existing, _STEP, data):
+            return existing
+        record = existing or dataset
+        source = source_of(record)
+        source_version = version_of(record) if deterministic else None
 
         base_name = dataset.file_url.split("/")[-1].split(".")[0].split("_")[0]
-        upload, size_label = dataframe_to_csv_upload(reduced, f"{base_name}_reduced.csv")
-        file_url = self._storage.upload(upload)
+        filename = f"{base_name}_reduced.csv"
+        if data.virtual and not strategy.row_subset(data.model_dump()):
+            raise ValidationError(
+                "Dados inválidos!", {"virtual": [f"O método '{strategy.name}' gera colunas novas e não vira view."]}
+            )
+        if data.chunked:
+            self._validate_features(source.columns(), data.features)
+            # lê com o mesmo tamanho de bloco do perfil, para o zone map ficar alinhado
+            chunk_rows = record.profile["chunk_rows"] if record.profile else self._chunk_size
+            chunks = strategy.reduce_chunks(
+                lambda: source.iter(chunk_rows), data.features, data.model_dump(), profile=record.profile
+            )
+            builder = ProfileBuilder(self._chunk_size)
+            if data.virtual:
+                positions = [chunk.index.to_numpy() for chunk in builder.track(chunks)]
+                positions = np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
+            else:
+                upload, size_label = chunks_to_csv_upload(builder.track(chunks), filename)
+            profile = builder.result()
+        else:
+            df = source.read()
+            self._validate_features(df.columns, data.features)
+            reduced = strategy.reduce(df, data.features, data.model_dump())
+            if data.virtual:
+                positions = reduced.index.to_numpy()
+            else:
+                upload, size_label = dataframe_to_csv_upload(reduced, filename)
+            profile = profile_frame(reduced, self._chunk_size)
+
+        if data.virtual:
+            # o índice das linhas amostradas é a posição delas na fonte; só ele vai para o banco
+            fields = source.select(positions).view_fields()
+            size_label = bytes_to_mb_label(len(fields["row_index"]))
+        else:
+            fields = {"file_url": self._storage.upload(upload)}
 
         if existing:
-            if existing.file_url:
-                self._storage.delete(existing.file_url)
+            for url in existing.stored_urls() - {fields["file_url"], fields.get("parent_url")}:
+                self._storage.delete(url)
             self._clean.delete(existing)
+        if self._cache:
+            self._cache.invalidate(dataset.id, clean_only=True)
 
         return self._clean.add(CleanDataset(
-            size_file=size_label, file_url=file_url, dataset_id=dataset.id, user_id=user_id,
+            size_file=size_label, dataset_id=dataset.id, user_id=user_id,
+            params={"step": _STEP, "method": strategy.name, **strategy.summary}, profile=profile, **fields,
+            source_version=source_version, fingerprint=run_fingerprint(source_version, _STEP, data),
         ))
+
+    def preview(self, dataset_id: int, data, user_id: int) -> dict:
+        """``dry_run``: reduz em memória (ou as ``dry_run_rows`` primeiras linhas) sem gravar nada."""
+        dataset = self._datasets.get_owned(dataset_id, user_id)
+        if not dataset:
+            raise NotFoundError("Base de dados não encontrada!")
+        df = source_of(self._clean.get_by_dataset(dataset.id) or dataset).read(nrows=data.dry_run_rows)
+        self._validate_features(df.columns, data.features)
+        strategy = get_strategy(data.methods)
+        reduced = strategy.reduce(df, data.features, data.model_dump())
+        params = {"step": _STEP, "method": strategy.name, **strategy.summary}
+        return {**dry_run_report(df, reduced), "params": params}
+
+    @staticmethod
+    def _validate_features(columns, features):
+        invalid = [f for f in features if f not in columns]
+        if invalid:
+            raise ValidationError("Dados inválidos!", {"features": [f"Campos não registrados: {', '.join(invalid)}"]})
@@ -1,39 +1,118 @@
 from app.common.errors import NotFoundError, ValidationError
-from app.data_mining.visualization.measures import ASSOCIATION, CENTRAL_TENDENCY, DISPERSION, SHAPE
+from app.data_mining.visualization.approximate import SAMPLED_METHODS
+from app.data_mining.visualization.association import MATRIX_METHODS, MAX_MATRIX_FEATURES
+from app.data_mining.visualization.grouped import GROUPED_METHODS
+from app.data_mining.visualization.measures import MEASURE_GROUPS, evaluate
+from app.data_mining.views import source_of
 from app.repositories.clean_dataset_repository import CleanDatasetRepository
 from app.repositories.dataset_repository import DatasetRepository
 
-_GROUPS = {
-    "central_tendency": CENTRAL_TENDENCY,
-    "dispersion": DISPERSION,
-    "shape": SHAPE,
-    "association": ASSOCIATION,
-}
-
 
 class VisualizationService:
-    def __init__(self, datasets: DatasetRepository, clean_datasets: CleanDatasetRepository):
+    def __init__(self, datasets: DatasetRepository, clean_datasets: CleanDatasetRepository, cache=None):
         self._datasets = datasets
         self._clean = clean_datasets
+        self._cache = cache
 
     def measure(self, group: str, dataset_id: int, data, user_id: int) -> dict:
+        dataset = self._get_dataset(dataset_id, user_id)
+        options = _options(data)
+        _validate_spec(group, data.visualization_method, data.features, "visualization_method", "features", options)
+        record = self._record(dataset, data.use_clean_dataset)
+        specs = [(group, data.visualization_method, data.features)]
+        return self._evaluate(dataset.id, record, specs, options)[0]
+
+    def measure_batch(self, dataset_id: int, data, user_id: int) -> dict:
+        """Várias medidas de grupos diferentes sobre uma única leitura, indexadas pela ``key`` de cada uma."""
+        dataset = self._get_dataset(dataset_id, user_id)
+        options = _options(data)
+        keys = []
+        for i, item in enumerate(data.measures):
+            if item.group not in MEASURE_GROUPS:
+                raise ValidationError("Dados inválidos!", {f"measures.{i}.group": [
+                    f"Grupo '{item.group}' não é válido. Escolha entre: {', '.join(MEASURE_GROUPS)}."
+                ]})
+            _validate_spec(
+                item.group, item.method, item.features, f"measures.{i}.method", f"measures.{i}.features", options,
+            )
+            key = item.key or f"{item.group}.{item.method}"
+            if key in keys:
+                raise ValidationError("Dados inválidos!", {f"measures.{i}.key": [
+                    f"Chave '{key}' repetida; informe uma key diferente para cada medida."
+                ]})
+            keys.append(key)
+        record = self._record(dataset, data.use_clean_dataset)
+        specs = [(item.group, item.method, item.features) for item in data.measures]
+        return dict(zip(keys, self._evaluate(dataset.id, record, specs, options)))
+
+    def _get_dataset(self, dataset_id: int, user_id: int):
         dataset = self._datasets.get_owned(dataset_id, user_id)
         if not dataset:
             raise NotFoundError("Base de dados não encontrada!")
+        return dataset
+
+    def _record(self, dataset, use_clean_dataset: bool):
+        if not use_clean_dataset:
+            return dataset
+        clean = self._clean.get_by_dataset(dataset.id)
+        if not clean:
+            raise NotFoundError("Dataset limpo não encontrado!")
+        return clean
+
+    def _evaluate(self, dataset_id: int, record, specs, options: dict) -> list:
+        """Resultados de ``specs``: os que estão no cache saem dele; o resto sai de uma única leitura."""
+        if self._cache is None:
+            return evaluate(_source(record), specs, record.profile, **options)
+        keys = [self._cache.key(dataset_id, record, *spec, options) for spec in specs]
+        results = [self._cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            computed = evaluate(_source(record), [specs[i] for i in missing], record.profile, **options)
+            for i, result in zip(missing, computed):
+                self._cache.set(keys[i], result)
+                results[i] = result
+        return results
+
+
+def _validate_spec(
+    group: str, method: str, features: list[str], method_field: str, features_field: str, options: dict,
+) -> None:
+    if method not in MEASURE_GROUPS[group]:
+        raise ValidationError(
+            "Dados inválidos!", {method_field: [f"Método '{method}' não é válido para {group}."]}
+        )
+    if options["group_by"] is not None and options["precision"] is not None:
+        raise ValidationError("Dados inválidos!", {"precision": ["precision não pode ser usado com group_by."]})
+    for option, available in (("group_by", GROUPED_METHODS), ("precision", SAMPLED_METHODS)):
+        if options[option] is not None and method not in available:
+            raise ValidationError(
+                "Dados inválidos!", {method_field: [f"Método '{method}' não está disponível com {option}."]}
+            )
+    if method in MATRIX_METHODS:
+        if not 2 <= len(set(features)) <= MAX_MATRIX_FEATURES:
+            raise ValidationError("Dados inválidos!", {features_field: [
+                f"A matriz de associação exige entre 2 e {MAX_MATRIX_FEATURES} features distintas."
+            ]})
+    elif group == "association" and len(features) != 2:
+        raise ValidationError(
+            "Dados inválidos!",
+            {features_field: ["Para medidas de associação é necessário exatamente 2 features."]},
+        )
 
-        registry = _GROUPS[group]
-        method = registry.get(data.visualization_method)
-        if method is None:
-            raise ValidationError("Dados inválidos!", {"visualization_method": [f"Método '{data.visualization_method}' não é válido para {group}."]})
 
-        if group == "association" and len(data.features) != 2:
-            raise ValidationError("Dados inválidos!", {"features": ["Para medidas de associação é necessário exatamente 2 features."]})
+def _options(data) -> dict:
+    return {
+        "exact": data.exact,
+        "bin_rule": data.bin_rule,
+        "bins": data.bins,
+        "correlation_method": data.correlation_method,
+        "group_by": data.group_by,
+        "top_k": data.top_k,
+        "precision": data.precision,
+    }
 
-        file_url = dataset.file_url
-        if data.use_clean_dataset:
-            clean = self._clean.get_by_dataset(dataset.id)
-            if not clean:
-                raise NotFoundError("Dataset limpo não encontrado!")
-            file_url = clean.file_url
 
-        return method(file_url, data.features)
+def _source(record):
+    # arquivo próprio vai como URL; só as views precisam do DataSource para se materializar
+    source = source_of(record)
+    return source if source.is_view else source.url
@@ -1,19 +1,27 @@
 import hashlib
 
+import pandas as pd
+
 from app.common.decorators import transactional
 from app.common.errors import NotFoundError, ValidationError
-from app.common.files import bytes_to_mb_label
+from app.common.files import bytes_to_mb_label, chunks_to_csv_upload, content_hash, iter_csv
 from app.config import Config
+from app.data_mining.profiling import ProfileBuilder
+from app.data_mining.views import source_of
 from app.models import Dataset
 from app.repositories.dataset_repository import DatasetRepository
 from app.repositories.project_repository import ProjectRepository
 
 
 class DatasetService:
-    def __init__(self, datasets: DatasetRepository, projects: ProjectRepository, storage):
+    def __init__(
+        self, datasets: DatasetRepository, projects: ProjectRepository, storage, chunk_size: int = 50_000, cache=None
+    ):
         self._datasets = datasets
         self._projects = projects
         self._storage = storage
+        self._chunk_size = chunk_size
+        self._cache = cache
 
     def list(self, user_id: int) -> list[Dataset]:
         return self._datasets.list_by_user(user_id)
@@ -32,10 +40,12 @@ class DatasetService:
         project = self._projects.get_owned(data.project_id, user_id)
         if not project:
             raise ValidationError("Dados inválidos!", {"project_id": ["O projeto não existe."]})
+        profile = self._profile(csv_file)
+        digest = content_hash(csv_file)
         size_label, file_url = self._store(csv_file, user_id, data.name)
         return self._datasets.add(Dataset(
-            name=data.name, description=data.description, size_file=size_label,
-            file_url=file_url, project_id=data.project_id, user_id=user_id,
+            name=data.name, description=data.description, size_file=size_label, file_url=file_url,
+            project_id=data.project_id, user_id=user_id, profile=profile, content_hash=digest,
         ))
 
     @transactional
@@ -47,9 +57,16 @@ class DatasetService:
             raise ValidationError("Dados inválidos!", {"project_id": ["O projeto não existe."]})
         if csv_file:
             self._validate_file(csv_file)
+            clean = dataset.clean_dataset
+            if clean and clean.is_view and clean.parent_url == dataset.file_url:
+                # o upload novo pode sobrescrever o pai; a view vira arquivo antes
+                self._materialize(clean)
+            dataset.profile = self._profile(csv_file)
+            dataset.content_hash = content_hash(csv_file)
             size_label, file_url = self._store(csv_file, user_id, data.name or dataset.name)
             dataset.size_file = size_label
             dataset.file_url = file_url
+            self._invalidate(dataset.id)
         if data.name:
             dataset.name = data.name
         if data.description:
@@ -61,13 +78,36 @@ class DatasetService:
     @transactional
     def delete(self, dataset_id: int, user_id: int) -> Dataset:
         dataset = self.get(dataset_id, user_id)
-        if dataset.clean_dataset and dataset.clean_dataset.file_url:
-            self._storage.delete(dataset.clean_dataset.file_url)
+        if dataset.clean_dataset:
+            for url in dataset.clean_dataset.stored_urls():
+                self._storage.delete(url)
         if dataset.file_url:
             self._storage.delete(dataset.file_url)
         self._datasets.delete(dataset)
+        self._invalidate(dataset.id)
         return dataset
 
+    def export_clean(self, dataset_id: int, user_id: int):
+        """CSV completo do dataset limpo em pedaços de texto; views são materializadas só aqui."""
+        dataset = self.get(dataset_id, user_id)
+        if not dataset.clean_dataset:
+            raise NotFoundError("Dataset limpo não encontrado!")
+        chunks = source_of(dataset.clean_dataset).iter(self._chunk_size)
+        return (chunk.to_csv(index=False, header=i == 0) for i, chunk in enumerate(chunks))
+
+    def _invalidate(self, dataset_id: int) -> None:
+        if self._cache:
+            self._cache.invalidate(dataset_id)
+
+    def _materialize(self, clean) -> None:
+        base_name = clean.dataset.file_url.split("/")[-1].split(".")[0]
+        upload, size_label = chunks_to_csv_upload(
+            source_of(clean).iter(self._chunk_size), f"{base_name}_{clean.params['step']}.csv"
+        )
+        clean.file_url = self._storage.upload(upload)
+        clean.size_file = size_label
+        clean.parent_url = clean.row_index = clean.transforms = None
+
     def _store(self, csv_file, user_id: int, name: str) -> tuple[str, str]:
         csv_file.seek(0, 2)
         size_label = bytes_to_mb_label(csv_file.tell())
@@ -77,6 +117,19 @@ class DatasetService:
         url = self._storage.upload(csv_file)
         return size_label, url
 
+    def _profile(self, csv_file) -> dict | None:
+        # o perfil é um atalho para leituras em blocos; CSV que o pandas não lê fica sem perfil
+        csv_file.seek(0)
+        builder = ProfileBuilder(self._chunk_size)
+        try:
+            for chunk in iter_csv(csv_file, self._chunk_size):
+                builder.add(chunk)
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError):
+            return None
+        finally:
+            csv_file.seek(0)
+        return builder.result()
+
     @staticmethod
     def _validate_file(csv_file) -> None:
         if not (csv_file.filename or "").lower().endswith(".csv"):
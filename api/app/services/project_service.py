@@ -41,7 +41,8 @@ class ProjectService:
         for dataset in list(project.datasets):
             if dataset.file_url:
                 self._storage.delete(dataset.file_url)
-            if dataset.clean_dataset and dataset.clean_dataset.file_url:
-                self._storage.delete(dataset.clean_dataset.file_url)
+            if dataset.clean_dataset:
+                for url in dataset.clean_dataset.stored_urls():
+                    self._storage.delete(url)
         self._projects.delete(project)
         return project
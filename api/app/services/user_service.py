@@ -44,8 +44,8 @@ class UserService:
             if dataset.file_url:
                 self._storage.delete(dataset.file_url)
         for clean in list(user.clean_datasets):
-            if clean.file_url:
-                self._storage.delete(clean.file_url)
+            for url in clean.stored_urls():
+                self._storage.delete(url)
         self._users.delete(user)
         return user
 
@@ -52,3 +52,19 @@ def test_classification_endpoint(auth_client, s3, monkeypatch):
     resp = client.post(f"/api/classification/{ds.id}", json=payload)
     assert resp.status_code == 200
     assert "performance_metrics" in resp.get_json()["data"]
+
+
+@pytest.mark.parametrize("encoding", ["onehot", "hashing"])
+def test_knn_accepts_sparse_categorical_features(encoding):
+    df = pd.DataFrame({
+        "cor": ["azul", "azul", "azul", "azul", "verde", "verde", "verde", "verde"] * 2,
+        "x": [1.0, 1.1, 0.9, 1.2, 5.0, 5.1, 4.9, 5.2] * 2,
+        "label": [0, 0, 0, 0, 1, 1, 1, 1] * 2,
+    })
+    result = KNNStrategy().run(df, features=["cor", "x"], target="label", params={
+        "k_neighbors": 3, "distance_metric": "euclidean", "test_size": 0.25, "encoding": encoding,
+        "hash_features": 16,
+    })
+    assert result["performance_metrics"]["accuracy"] == 1.0
+    assert result["dataset_info"]["encoded_features"] == (3 if encoding == "onehot" else 17)
+    assert len(result["plot_algorithm"]["x"]) == 4
@@ -1,7 +1,10 @@
+import io
+
 import pandas as pd
 import pytest
 
 from app.common.errors import ValidationError
+from app.common.files import missing_value_options
 from app.data_mining.cleaning.strategies import (MeanFillStrategy,
                                                  ModeFillStrategy, get_strategy)
 
@@ -32,15 +35,136 @@ def test_get_strategy_unknown():
         get_strategy("inexistente")
 
 
+def test_missing_value_options_parse_sentinels_as_float():
+    csv = "idade,nota,codigo\n10,?,0\n?,7.5,1\n0,8,?\n"
+    df = pd.read_csv(io.StringIO(csv), **missing_value_options(["idade", "nota"], ["?", "0"]))
+    assert df["idade"].dtype == "float64"
+    assert df["nota"].dtype == "float64"
+    assert df["idade"].isna().sum() == 2
+    # sentinelas não vazam para colunas fora das features
+    assert df["codigo"].tolist() == ["0", "1", "?"]
+
+
 def test_data_cleaning_endpoint(auth_client, s3, monkeypatch):
     client, user = auth_client
     from tests.factories import make_project, make_dataset
     from app.services.data_mining import cleaning_service as mod
-    df = pd.DataFrame({"idade": [10, 0, 30], "peso": [50, 60, 70]})
-    monkeypatch.setattr(mod, "read_csv", lambda url: df.copy())
+    csv = "idade,peso\n10,50\n0,60\n30,70\n"
+    monkeypatch.setattr(mod, "read_csv", lambda url, **kw: pd.read_csv(io.StringIO(csv), **kw))
     project = make_project(user)
     ds = make_dataset(user, project)
     payload = {"features": ["idade"], "methods": "media", "missing_values": ["0"]}
     resp = client.post(f"/api/preprocessing/data-cleaning/{ds.id}", json=payload)
     assert resp.status_code == 200
     assert "clean_dataset" in resp.get_json()["data"]
+
+
+def _s3_csv(s3, file_url):
+    key = file_url.split("/")[-1]
+    return pd.read_csv(s3.get_object(Bucket="test-bucket", Key=key)["Body"])
+
+
+@pytest.mark.parametrize("method", ["media", "mediana", "moda"])
+def test_chunked_cleaning_matches_in_memory(auth_client, s3, tmp_path, method):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    path = tmp_path / "base.csv"
+    path.write_text("idade,peso\n10,50\n?,60\n30,?\n30,80\n0,90\n22,?\n14,70\n")
+    project = make_project(user)
+    ds = make_dataset(user, project, file_url=str(path))
+    client.application.services["cleaning"]._chunk_size = 3
+    results = []
+    for chunked in (False, True):
+        payload = {"features": ["idade", "peso"], "methods": method, "missing_values": ["?", "0"], "chunked": chunked}
+        resp = client.post(f"/api/preprocessing/data-cleaning/{ds.id}", json=payload)
+        assert resp.status_code == 200
+        results.append(_s3_csv(s3, resp.get_json()["data"]["clean_dataset"]["file_url"]))
+    pd.testing.assert_frame_equal(results[0], results[1])
+
+
+def test_cleaning_dry_run_reports_deltas_without_writing(auth_client, s3, tmp_path):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    from app.extensions import db
+    from app.models import CleanDataset
+    path = tmp_path / "base.csv"
+    path.write_text("idade,peso\n10,50\n?,60\n30,?\n20,80\n")
+    ds = make_dataset(user, make_project(user), file_url=str(path))
+    payload = {"features": ["idade", "peso"], "methods": "media", "missing_values": ["?"], "dry_run": True}
+    resp = client.post(f"/api/preprocessing/data-cleaning/{ds.id}", json=payload)
+    assert resp.status_code == 200
+    report = resp.get_json()["data"]["dry_run"]
+    assert report["rows_kept"] == 4
+    assert report["features"]["idade"]["nulls_filled"] == 1
+    assert report["features"]["idade"]["after"] == {"min": 10.0, "max": 30.0, "mean": 20.0}
+    assert report["preview"][1] == {"idade": 20.0, "peso": 60.0}
+    assert db.session.query(CleanDataset).count() == 0
+    assert s3.list_objects_v2(Bucket="test-bucket").get("KeyCount", 0) == 0
+
+
+def test_repeated_cleaning_returns_memoised_result(auth_client, s3, tmp_path):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    from app.extensions import db
+    from app.models import CleanDataset
+    path = tmp_path / "base.csv"
+    path.write_text("idade,peso\n10,50\n?,60\n30,?\n")
+    ds = make_dataset(user, make_project(user), file_url=str(path))
+    ds.content_hash = "a" * 64
+    db.session.commit()
+    payload = {"features": ["idade"], "methods": "media", "missing_values": ["?"]}
+    first = client.post(f"/api/preprocessing/data-cleaning/{ds.id}", json=payload).get_json()
+    s3.delete_object(Bucket="test-bucket", Key=first["data"]["clean_dataset"]["file_url"].split("/")[-1])
+    fingerprint = db.session.query(CleanDataset).one().fingerprint
+    # mesma fonte e mesmos parâmetros (ordem das chaves não importa): nada é recalculado nem reenviado
+    again = client.post(f"/api/preprocessing/data-cleaning/{ds.id}", json=dict(reversed(payload.items())))
+    assert again.get_json()["data"]["clean_dataset"]["id"] == first["data"]["clean_dataset"]["id"]
+    assert s3.list_objects_v2(Bucket="test-bucket").get("KeyCount", 0) == 0
+
+    client.post(f"/api/preprocessing/data-cleaning/{ds.id}", json={**payload, "methods": "mediana"})
+    assert db.session.query(CleanDataset).one().fingerprint != fingerprint
+    fingerprint = db.session.query(CleanDataset).one().fingerprint
+    ds.content_hash = "b" * 64
+    db.session.commit()
+    client.post(f"/api/preprocessing/data-cleaning/{ds.id}", json={**payload, "methods": "mediana"})
+    assert db.session.query(CleanDataset).one().source_version == "b" * 64
+
+
+def test_group_mean_fills_from_own_group_and_falls_back_to_global():
+    df = pd.DataFrame({
+        "turma": ["a", "a", "a", "b", "b", "c", None],
+        "nota": [2.0, None, 4.0, 10.0, None, None, None],
+        "peso": [1.0, 1.0, None, 5.0, 7.0, 3.0, None],
+    })
+    result = get_strategy("media_por_grupo").fill(df.copy(), ["nota", "peso"], {"group_by": "turma"})
+    assert result["nota"].tolist() == [2.0, 3.0, 4.0, 10.0, 10.0, 5.3333, 5.3333]
+    assert result["peso"].tolist() == [1.0, 1.0, 1.0, 5.0, 7.0, 3.0, 3.4]
+    with pytest.raises(ValidationError):
+        get_strategy("mediana_por_grupo").fill(df.copy(), ["nota"], {"group_by": "inexistente"})
+
+
+def test_knn_fill_uses_nearest_complete_rows_in_batches():
+    from app.data_mining.cleaning.strategies import KNNFillStrategy
+    df = pd.DataFrame({
+        "x": [0.0, 0.1, 0.2, 10.0, 10.1, 10.2, 0.15, 10.05, None],
+        "y": [1.0, 1.0, 1.0, 50.0, 50.0, 50.0, None, None, None],
+    })
+    result = KNNFillStrategy(batch_size=1).fill(df.copy(), ["x", "y"], {"knn_neighbors": 3})
+    assert result["y"].tolist()[6:8] == [1.0, 50.0]
+    # linha sem nenhum valor observado: média global
+    assert result.iloc[8].tolist() == [round(df["x"].mean(), 4), round(df["y"].mean(), 4)]
+
+
+def test_frame_strategies_do_not_run_chunked(auth_client, s3, tmp_path):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    path = tmp_path / "base.csv"
+    path.write_text("x,y\n1,2\n?,3\n")
+    ds = make_dataset(user, make_project(user), file_url=str(path))
+    resp = client.post(f"/api/preprocessing/data-cleaning/{ds.id}",
+                       json={"features": ["x"], "methods": "knn", "missing_values": ["?"], "chunked": True})
+    assert resp.status_code == 422
+    assert "chunked" in resp.get_json()["errors"]
+    resp = client.post(f"/api/preprocessing/data-cleaning/{ds.id}",
+                       json={"features": ["x", "y"], "methods": "knn", "missing_values": ["?"]})
+    assert resp.status_code == 200
@@ -38,6 +38,13 @@ def test_create_dataset(auth_client, s3):
     resp = client.post("/api/datasets/create-dataset", data=data, content_type="multipart/form-data")
     assert resp.status_code == 201
     assert resp.get_json()["data"]["name"] == "Nova Base"
+    from app.extensions import db
+    from app.models import Dataset
+    created = db.session.get(Dataset, resp.get_json()["data"]["id"])
+    profile = created.profile
+    assert profile["rows"] == 2
+    assert profile["chunks"][0]["max"] == {"a": 3.0, "b": 4.0}
+    assert len(created.content_hash) == 64
 
 
 def test_create_dataset_invalid_project(auth_client, s3):
@@ -20,7 +20,7 @@ def test_get_strategy_unknown():
 def test_normalization_endpoint(auth_client, s3, monkeypatch):
     client, user = auth_client
     from tests.factories import make_project, make_dataset
-    from app.services.data_mining import normalization_service as mod
+    from app.data_mining import views as mod
     df = pd.DataFrame({"idade": [10.0, 20.0, 30.0]})
     monkeypatch.setattr(mod, "read_csv", lambda url: df.copy())
     project = make_project(user)
@@ -34,7 +34,7 @@ def test_normalization_endpoint(auth_client, s3, monkeypatch):
 def test_normalization_non_numeric_column(auth_client, s3, monkeypatch):
     client, user = auth_client
     from tests.factories import make_project, make_dataset
-    from app.services.data_mining import normalization_service as mod
+    from app.data_mining import views as mod
     df = pd.DataFrame({"nome": ["a", "b", "c"]})
     monkeypatch.setattr(mod, "read_csv", lambda url: df.copy())
     project = make_project(user)
@@ -42,3 +42,88 @@ def test_normalization_non_numeric_column(auth_client, s3, monkeypatch):
     resp = client.post(f"/api/preprocessing/data-normalization/{ds.id}",
                        json={"features": ["nome"], "methods": "minmax"})
     assert resp.status_code == 422
+
+
+def test_fit_once_and_transform_with_stored_params():
+    from app.data_mining.normalization.strategies import ZScoreStrategy
+    df = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [10.0, 10.0, 10.0]})
+    strategy = ZScoreStrategy()
+    params = strategy.fit(df)
+    assert params["a"]["mean"] == 2.0
+    result = strategy.transform(pd.DataFrame({"a": [4.0], "b": [10.0]}), params)
+    assert result["a"].iloc[0] == round(2.0 / params["a"]["std"], 4)
+    # coluna constante: escala 1, como no StandardScaler
+    assert result["b"].iloc[0] == 0.0
+
+
+def test_normalization_transform_endpoint_streams_new_csv(auth_client, s3, monkeypatch):
+    import io
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    from app.data_mining import views as mod
+    df = pd.DataFrame({"idade": [10.0, 20.0, 30.0], "nome": ["a", "b", "c"]})
+    monkeypatch.setattr(mod, "read_csv", lambda url: df.copy())
+    project = make_project(user)
+    ds = make_dataset(user, project)
+    resp = client.post(f"/api/preprocessing/data-normalization/{ds.id}",
+                       json={"features": ["idade"], "methods": "minmax"})
+    assert resp.get_json()["data"]["normalized_dataset"]["params"]["columns"]["idade"] == {"min": 10.0, "max": 30.0}
+
+    client.application.services["normalization"]._chunk_size = 2
+    upload = (io.BytesIO(b"idade,nome\n20,x\n40,y\n0,z\n"), "novo.csv")
+    resp = client.post(f"/api/preprocessing/data-normalization/{ds.id}/transform",
+                       data={"csv_file": upload}, content_type="multipart/form-data")
+    assert resp.status_code == 200
+    result = pd.read_csv(io.StringIO(resp.get_data(as_text=True)))
+    assert result["idade"].tolist() == [0.5, 1.5, -0.5]
+    assert result["nome"].tolist() == ["x", "y", "z"]
+
+
+def test_normalization_transform_without_params(auth_client, s3):
+    import io
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    project = make_project(user)
+    ds = make_dataset(user, project)
+    upload = (io.BytesIO(b"idade\n1\n"), "novo.csv")
+    resp = client.post(f"/api/preprocessing/data-normalization/{ds.id}/transform",
+                       data={"csv_file": upload}, content_type="multipart/form-data")
+    assert resp.status_code == 404
+
+
+def test_chunked_normalization_matches_in_memory(auth_client, s3, tmp_path):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    path = tmp_path / "base.csv"
+    path.write_text("a,b,nome\n1,10,x\n4,10,y\n2,11,z\n8,13,w\n5,10,v\n")
+    project = make_project(user)
+    ds = make_dataset(user, project, file_url=str(path))
+    client.application.services["normalization"]._chunk_size = 2
+    outputs = []
+    for chunked in (False, True):
+        resp = client.post(f"/api/preprocessing/data-normalization/{ds.id}",
+                           json={"features": ["a", "b"], "methods": "zscore", "chunked": chunked})
+        assert resp.status_code == 200
+        outputs.append(resp.get_json()["data"]["normalized_dataset"]["params"]["columns"])
+        # a próxima normalização lê o limpo; volta a apontar para o original
+        from app.extensions import db
+        from app.models import CleanDataset
+        db.session.query(CleanDataset).delete()
+        db.session.commit()
+    for column in ("a", "b"):
+        for key in ("mean", "std"):
+            assert abs(outputs[0][column][key] - outputs[1][column][key]) < 1e-9
+
+
+def test_normalization_dry_run_returns_params_and_preview(auth_client, s3, tmp_path):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    path = tmp_path / "base.csv"
+    path.write_text("a,nome\n0,x\n5,y\n10,z\n")
+    ds = make_dataset(user, make_project(user), file_url=str(path))
+    resp = client.post(f"/api/preprocessing/data-normalization/{ds.id}",
+                       json={"features": ["a"], "methods": "minmax", "dry_run": True})
+    report = resp.get_json()["data"]["dry_run"]
+    assert report["params"]["columns"]["a"] == {"min": 0.0, "max": 10.0}
+    assert report["features"]["a"]["before"]["max"] == 10.0 and report["features"]["a"]["after"]["max"] == 1.0
+    assert [row["a"] for row in report["preview"]] == [0.0, 0.5, 1.0]
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -43,7 +44,7 @@ def test_systematic_sampling_takes_largest():
 def test_reduction_endpoint_random(auth_client, s3, monkeypatch):
     client, user = auth_client
     from tests.factories import make_project, make_dataset
-    from app.services.data_mining import reduction_service as mod
+    from app.data_mining import views as mod
     df = pd.DataFrame({"idade": range(10), "peso": range(10)})
     monkeypatch.setattr(mod, "read_csv", lambda url: df.copy())
     project = make_project(user)
@@ -52,3 +53,477 @@ def test_reduction_endpoint_random(auth_client, s3, monkeypatch):
                        json={"features": ["idade"], "methods": "amostragem_aleatoria", "random_records": 5})
     assert resp.status_code == 200
     assert "reduced_dataset" in resp.get_json()["data"]
+
+
+def _wide_frame(rows=60, cols=6):
+    import numpy as np
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=(rows, 2))
+    data = base @ rng.normal(size=(2, cols)) + rng.normal(scale=0.05, size=(rows, cols))
+    df = pd.DataFrame(data, columns=[f"f{i}" for i in range(cols)])
+    df["alvo"] = [i % 2 for i in range(rows)]
+    return df
+
+
+def test_pca_configurable_components_reports_variance():
+    df = _wide_frame()
+    strategy = PCAStrategy()
+    result = strategy.reduce(df, features=list(df.columns[:-1]), params={"target": "alvo", "n_components": 3})
+    assert list(result.columns) == ["PC1", "PC2", "PC3", "alvo"]
+    assert len(strategy.summary["explained_variance_ratio"]) == 3
+
+
+def test_pca_explained_variance_target_picks_components():
+    df = _wide_frame()
+    strategy = PCAStrategy()
+    result = strategy.reduce(df, features=list(df.columns[:-1]), params={"target": "alvo", "explained_variance": 0.95})
+    # os dados têm posto 2 (mais ruído), então 2 componentes bastam
+    assert list(result.columns) == ["PC1", "PC2", "alvo"]
+    assert sum(strategy.summary["explained_variance_ratio"]) >= 0.95
+
+
+def test_pca_too_many_components():
+    df = _wide_frame(cols=3)
+    with pytest.raises(ValidationError):
+        PCAStrategy().reduce(df, features=["f0", "f1", "f2"], params={"target": "alvo", "n_components": 4})
+
+
+def test_incremental_pca_matches_full_pca_variance():
+    df = _wide_frame(rows=90)
+    features = list(df.columns[:-1])
+    full = PCAStrategy()
+    full.reduce(df, features, {"target": "alvo", "n_components": 2})
+    incremental = PCAStrategy()
+    chunks = incremental.reduce_chunks(
+        lambda: (df.iloc[i:i + 20] for i in range(0, len(df), 20)), features, {"target": "alvo", "n_components": 2}
+    )
+    result = pd.concat(list(chunks))
+    assert len(result) == 90
+    for a, b in zip(full.summary["explained_variance_ratio"], incremental.summary["explained_variance_ratio"]):
+        assert abs(a - b) < 0.01
+
+
+def test_reduction_endpoint_pca_chunked(auth_client, s3, tmp_path):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    path = tmp_path / "base.csv"
+    _wide_frame(rows=40, cols=4).to_csv(path, index=False)
+    project = make_project(user)
+    ds = make_dataset(user, project, file_url=str(path))
+    client.application.services["reduction"]._chunk_size = 10
+    resp = client.post(f"/api/preprocessing/data-reduction/{ds.id}",
+                       json={"features": ["f0", "f1", "f2", "f3"], "methods": "pca", "target": "alvo",
+                             "chunked": True})
+    assert resp.status_code == 200
+    params = resp.get_json()["data"]["reduced_dataset"]["params"]
+    assert params["solver"] == "incremental"
+    assert len(params["explained_variance_ratio"]) == 2
+
+
+def test_reduction_chunked_unsupported_by_default():
+    from app.data_mining.reduction.strategies import ReductionStrategy
+
+    class InMemoryOnly(ReductionStrategy):
+        name = "so_memoria"
+
+        def reduce(self, df, features, params):
+            return df
+
+    with pytest.raises(ValidationError):
+        InMemoryOnly().reduce_chunks(lambda: iter([]), ["a"], {})
+
+
+def _chunks(df, size):
+    return lambda: (df.iloc[i:i + size].reset_index(drop=True) for i in range(0, len(df), size))
+
+
+def test_random_sampling_seed_is_reproducible():
+    df = pd.DataFrame({"a": range(100)})
+    first = RandomSamplingStrategy().reduce(df, ["a"], {"random_records": 10, "random_seed": 7})
+    second = RandomSamplingStrategy().reduce(df, ["a"], {"random_records": 10, "random_seed": 7})
+    assert first["a"].tolist() == second["a"].tolist()
+
+
+def test_negative_random_seed_is_rejected():
+    from pydantic import ValidationError as SchemaError
+
+    from app.schemas.data_mining.reduction import DataReductionSchema
+    with pytest.raises(SchemaError):
+        DataReductionSchema(features=["a"], methods="amostragem_aleatoria", random_records=3, random_seed=-1)
+
+
+def test_reservoir_sampling_streams_chunks():
+    df = pd.DataFrame({"a": range(1000), "b": [i * 2 for i in range(1000)]})
+    strategy = RandomSamplingStrategy()
+    sample = pd.concat(strategy.reduce_chunks(_chunks(df, 64), ["a"], {"random_records": 50, "random_seed": 3}))
+    assert len(sample) == 50
+    assert sample["a"].is_unique and sample["a"].is_monotonic_increasing
+    assert (sample["b"] == sample["a"] * 2).all()
+    again = pd.concat(RandomSamplingStrategy().reduce_chunks(
+        _chunks(df, 100), ["a"], {"random_records": 50, "random_seed": 3}))
+    # mesma semente, mesmo resultado, independente do tamanho do bloco
+    assert sample["a"].tolist() == again["a"].tolist()
+    assert strategy.summary["random_seed"] == 3
+
+
+def test_reservoir_sampling_is_uniform():
+    import numpy as np
+    df = pd.DataFrame({"a": range(200)})
+    hits = np.zeros(200)
+    for seed in range(300):
+        params = {"random_records": 20, "random_seed": seed}
+        sample = RandomSamplingStrategy().reduce_chunks(_chunks(df, 30), ["a"], params)
+        hits[sample[0]["a"].to_numpy()] += 1
+    # cada linha deveria aparecer em ~10% das amostras; primeira e segunda metade equilibradas
+    assert abs(hits[:100].sum() - hits[100:].sum()) < 0.1 * hits.sum()
+
+
+def test_reservoir_sampling_too_large():
+    df = pd.DataFrame({"a": range(5)})
+    with pytest.raises(ValidationError):
+        RandomSamplingStrategy().reduce_chunks(_chunks(df, 2), ["a"], {"random_records": 6})
+
+
+def test_systematic_chunked_matches_in_memory_and_skips_chunks():
+    from app.data_mining.profiling import profile_frame
+    values = [5, 1, 2, 9, 9, 3, 0, 1, 2, 8, 9, 4, 1, 1, 0]
+    df = pd.DataFrame({"a": values, "id": range(len(values))})
+    params = {"systematic_records": 3, "systematic_method": "maiores"}
+    expected = SystematicSamplingStrategy().reduce(df, ["a"], params)
+    strategy = SystematicSamplingStrategy()
+    result = strategy.reduce_chunks(_chunks(df, 3), ["a"], params, profile=profile_frame(df, 3))[0]
+    assert result["id"].tolist() == expected["id"].tolist()
+    # blocos [0,1,2] e [1,1,0] ficam abaixo do piso garantido pelo zone map
+    assert strategy.summary["chunks_skipped"] >= 2
+
+
+def test_systematic_chunked_smallest_without_profile():
+    df = pd.DataFrame({"a": [4.0, None, 2.0, 7.0, 2.0, 1.0]})
+    params = {"systematic_records": 2, "systematic_method": "menores"}
+    expected = SystematicSamplingStrategy().reduce(df, ["a"], params)
+    result = SystematicSamplingStrategy().reduce_chunks(_chunks(df, 4), ["a"], params)[0]
+    assert result["a"].tolist() == expected["a"].tolist()
+
+
+def test_interval_sampling_takes_every_kth_row():
+    from app.data_mining.reduction.strategies import IntervalSamplingStrategy
+    df = pd.DataFrame({"a": range(100)})
+    strategy = IntervalSamplingStrategy()
+    result = strategy.reduce(df, ["a"], {"interval_records": 10, "random_seed": 5})
+    assert len(result) == 10
+    assert strategy.summary["interval"] == 10
+    assert set(result["a"].diff().dropna()) == {10}
+    assert result["a"].iloc[0] < 10
+
+
+def test_interval_sampling_chunked_uses_profile_row_count():
+    from app.data_mining.profiling import profile_frame
+    from app.data_mining.reduction.strategies import IntervalSamplingStrategy
+    df = pd.DataFrame({"a": range(95)})
+    params = {"interval_records": 9, "random_seed": 2}
+    expected = IntervalSamplingStrategy().reduce(df, ["a"], params)
+    chunks = IntervalSamplingStrategy().reduce_chunks(_chunks(df, 20), ["a"], params, profile=profile_frame(df, 20))
+    assert pd.concat(chunks)["a"].tolist() == expected["a"].tolist()
+    with pytest.raises(ValidationError):
+        IntervalSamplingStrategy().reduce_chunks(_chunks(df, 20), ["a"], params)
+
+
+def test_stratified_sampling_proportional_keeps_class_balance():
+    from app.data_mining.reduction.strategies import StratifiedSamplingStrategy
+    df = pd.DataFrame({"x": range(100), "classe": ["a"] * 70 + ["b"] * 20 + ["c"] * 10})
+    strategy = StratifiedSamplingStrategy()
+    result = strategy.reduce(df, ["x"], {"target": "classe", "stratified_records": 20, "random_seed": 1})
+    assert result["classe"].value_counts().to_dict() == {"a": 14, "b": 4, "c": 2}
+    assert strategy.summary["class_distribution"] == {"a": 14, "b": 4, "c": 2}
+    assert result.index.is_monotonic_increasing
+
+
+def test_stratified_sampling_equal_allocation_caps_small_classes():
+    from app.data_mining.reduction.strategies import StratifiedSamplingStrategy
+    df = pd.DataFrame({"x": range(100), "classe": ["a"] * 70 + ["b"] * 27 + ["c"] * 3})
+    result = StratifiedSamplingStrategy().reduce(
+        df, ["x"], {"target": "classe", "stratified_records": 21, "stratified_allocation": "igual"}
+    )
+    counts = result["classe"].value_counts().to_dict()
+    assert counts["c"] == 3
+    assert counts["a"] + counts["b"] == 18 and abs(counts["a"] - counts["b"]) <= 1
+
+
+def test_stratified_sampling_not_chunked(auth_client, s3, tmp_path):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    path = tmp_path / "base.csv"
+    path.write_text("a,classe\n1,x\n3,y\n")
+    project = make_project(user)
+    ds = make_dataset(user, project, file_url=str(path))
+    resp = client.post(f"/api/preprocessing/data-reduction/{ds.id}",
+                       json={"features": ["a"], "methods": "amostragem_estratificada", "target": "classe",
+                             "stratified_records": 1, "chunked": True})
+    assert resp.status_code == 422
+
+
+def _base_csv(tmp_path):
+    path = tmp_path / "base.csv"
+    pd.DataFrame({"a": range(40), "b": [float(i % 7) for i in range(40)]}).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_virtual_reduction_stores_row_index_and_downloads_same_rows(auth_client, s3, tmp_path, chunked):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    ds = make_dataset(user, make_project(user), file_url=str(_base_csv(tmp_path)))
+    client.application.services["reduction"]._chunk_size = 7
+    client.application.services["dataset"]._chunk_size = 6
+    payload = {"features": ["a"], "methods": "amostragem_aleatoria", "random_records": 9, "random_seed": 3,
+               "chunked": chunked}
+    materialized = client.post(f"/api/preprocessing/data-reduction/{ds.id}", json=payload).get_json()
+    expected = pd.read_csv(s3.get_object(
+        Bucket="test-bucket", Key=materialized["data"]["reduced_dataset"]["file_url"].split("/")[-1])["Body"])
+
+    from app.extensions import db
+    from app.models import CleanDataset
+    db.session.query(CleanDataset).delete()
+    db.session.commit()
+    resp = client.post(f"/api/preprocessing/data-reduction/{ds.id}", json={**payload, "virtual": True})
+    assert resp.status_code == 200
+    assert resp.get_json()["data"]["reduced_dataset"]["file_url"] is None
+    clean = db.session.query(CleanDataset).one()
+    assert clean.is_view and clean.parent_url == str(tmp_path / "base.csv")
+
+    resp = client.get(f"/api/datasets/{ds.id}/clean-dataset/download")
+    assert resp.status_code == 200
+    import io
+    pd.testing.assert_frame_equal(pd.read_csv(io.StringIO(resp.get_data(as_text=True))), expected)
+
+
+def test_virtual_normalization_then_sampling_composes_over_parent(auth_client, s3, tmp_path):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    ds = make_dataset(user, make_project(user), file_url=str(_base_csv(tmp_path)))
+    resp = client.post(f"/api/preprocessing/data-normalization/{ds.id}",
+                       json={"features": ["a"], "methods": "minmax", "virtual": True})
+    assert resp.status_code == 200
+    resp = client.post(f"/api/preprocessing/data-reduction/{ds.id}",
+                       json={"features": ["a"], "methods": "amostragem_intervalar", "interval_records": 4,
+                             "random_seed": 0, "virtual": True})
+    assert resp.status_code == 200
+    from app.extensions import db
+    from app.models import CleanDataset
+    from app.data_mining.views import source_of
+    clean = db.session.query(CleanDataset).one()
+    assert clean.parent_url == str(tmp_path / "base.csv")
+    rows = source_of(clean).rows
+    assert len(rows) == 4 and set(np.diff(rows)) == {10}
+    assert source_of(clean).read()["a"].tolist() == [round(i / 39, 4) for i in rows]
+    assert s3.list_objects_v2(Bucket="test-bucket").get("KeyCount", 0) == 0
+
+
+def test_virtual_pca_is_rejected(auth_client, s3, tmp_path):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    ds = make_dataset(user, make_project(user), file_url=str(_base_csv(tmp_path)))
+    resp = client.post(f"/api/preprocessing/data-reduction/{ds.id}",
+                       json={"features": ["a", "b"], "methods": "pca", "virtual": True})
+    assert resp.status_code == 422
+    assert "virtual" in resp.get_json()["errors"]
+
+
+def test_virtual_view_is_materialized_before_dataset_update(auth_client, s3, tmp_path):
+    import io
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    ds = make_dataset(user, make_project(user), file_url=str(_base_csv(tmp_path)))
+    client.post(f"/api/preprocessing/data-reduction/{ds.id}",
+                json={"features": ["a"], "methods": "amostragem_intervalar", "interval_records": 5,
+                      "random_seed": 1, "virtual": True})
+    upload = (io.BytesIO(b"a,b\n1,2\n"), "nova.csv")
+    resp = client.put(f"/api/datasets/{ds.id}", data={"csv_file": upload}, content_type="multipart/form-data")
+    assert resp.status_code == 200
+    clean = resp.get_json()["data"]["clean_dataset"]
+    assert clean["file_url"] and clean["parent_url"] is None
+    stored = pd.read_csv(s3.get_object(Bucket="test-bucket", Key=clean["file_url"].split("/")[-1])["Body"])
+    assert len(stored) == 5 and set(stored["a"].diff().dropna()) == {8}
+
+
+def test_reduction_dry_run_on_first_rows(auth_client, s3, tmp_path):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    ds = make_dataset(user, make_project(user), file_url=str(_base_csv(tmp_path)))
+    resp = client.post(f"/api/preprocessing/data-reduction/{ds.id}",
+                       json={"features": ["a"], "methods": "amostragem_intervalar", "interval_records": 5,
+                             "dry_run": True, "dry_run_rows": 20})
+    report = resp.get_json()["data"]["dry_run"]
+    assert report["rows_before"] == 20 and report["rows_kept"] == 5
+    assert report["params"]["interval"] == 4
+    assert len(report["preview"]) == 5
+    assert s3.list_objects_v2(Bucket="test-bucket").get("KeyCount", 0) == 0
+
+
+def test_seeded_sampling_is_memoised_but_unseeded_is_not(auth_client, s3, tmp_path):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    from app.extensions import db
+    ds = make_dataset(user, make_project(user), file_url=str(_base_csv(tmp_path)))
+    ds.content_hash = "c" * 64
+    db.session.commit()
+
+    def run(payload):
+        return client.post(f"/api/preprocessing/data-reduction/{ds.id}", json=payload).get_json()["data"]
+
+    payload = {"features": ["a"], "methods": "amostragem_aleatoria", "random_records": 40, "virtual": True}
+    seeded = {**payload, "random_seed": 7}
+    first = run(seeded)
+    from app.models import CleanDataset
+    created_at = db.session.query(CleanDataset).one().created_at
+    assert run(seeded)["reduced_dataset"]["id"] == first["reduced_dataset"]["id"]
+    assert db.session.query(CleanDataset).one().created_at == created_at
+
+    first, second = run(payload), run(payload)
+    assert first["reduced_dataset"]["params"]["random_seed"] != second["reduced_dataset"]["params"]["random_seed"]
+    # a amostra sem semente não tem versão estável; nada derivado dela é memoizado
+    assert db.session.query(CleanDataset).one().fingerprint is None
+
+
+@pytest.mark.parametrize("method", ["iqr", "zscore", "mad"])
+def test_outlier_filter_drops_rows_and_counts_per_feature(method):
+    from app.data_mining.reduction.strategies import OutlierFilterStrategy
+    df = pd.DataFrame({"a": [float(i % 10) for i in range(60)], "b": [5.0] * 30 + [6.0] * 30})
+    df.loc[7, "a"], df.loc[21, "b"] = 1_000.0, -1_000.0
+    strategy = OutlierFilterStrategy()
+    params = {"outlier_method": method, "outlier_threshold": 2.0 if method == "zscore" else None}
+    result = strategy.reduce(df, ["a", "b"], params)
+    assert 7 not in result.index and 21 not in result.index
+    assert strategy.summary["outliers"]["a"] >= 1 and strategy.summary["rows"] == len(df) - len(result)
+
+
+def test_mad_outlier_filter_skips_feature_with_zero_mad():
+    from app.data_mining.reduction.strategies import OutlierFilterStrategy
+    # 70% dos valores na mediana: MAD = 0
+    df = pd.DataFrame({"a": [5.0] * 70 + [float(i) for i in range(30)], "b": [float(i % 10) for i in range(100)]})
+    df.loc[3, "b"] = 1_000.0
+    params = {"outlier_method": "mad", "outlier_action": "marcar"}
+    strategy = OutlierFilterStrategy()
+    flagged = strategy.reduce(df, ["a", "b"], params)
+    assert flagged.index[flagged["outlier"]].tolist() == [3]
+    assert strategy.summary["outliers"]["a"] == 0 and strategy.summary["bounds"]["a"] == [None, None]
+    chunked = OutlierFilterStrategy()
+    result = pd.concat(chunked.reduce_chunks(_chunks(df, 30), ["a", "b"], params))
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), flagged)
+
+
+def test_outlier_filter_flags_and_matches_in_chunks():
+    from app.data_mining.reduction.strategies import OutlierFilterStrategy
+    df = pd.DataFrame({"a": [float(i % 13) for i in range(90)]})
+    df.loc[[4, 50], "a"] = [300.0, -250.0]
+    params = {"outlier_method": "iqr", "outlier_action": "marcar"}
+    flagged = OutlierFilterStrategy().reduce(df, ["a"], params)
+    assert flagged["outlier"].sum() == 2 and len(flagged) == len(df)
+    strategy = OutlierFilterStrategy()
+    chunked = pd.concat(strategy.reduce_chunks(_chunks(df, 20), ["a"], params))
+    pd.testing.assert_frame_equal(chunked.reset_index(drop=True), flagged)
+    assert strategy.summary["outliers"] == {"a": 2}
+    assert not OutlierFilterStrategy().row_subset(params)
+
+
+@pytest.mark.parametrize("keep", ["primeira", "ultima"])
+def test_deduplication_in_memory_and_chunked_agree(keep):
+    from app.data_mining.reduction.strategies import DeduplicationStrategy
+    df = pd.DataFrame({"a": [1, 2, 1, 3, 2, 1, 4, 3, 5, 1], "b": list("xyxzyxwzvq")})
+    strategy = DeduplicationStrategy()
+    expected = strategy.reduce(df, ["a", "b"], {"dedup_keep": keep})
+    assert len(expected) == 6
+    assert strategy.summary == {"rows": 10, "duplicates": 4, "duplicate_ratio": 0.4}
+    assert expected.index.tolist() == ([0, 1, 3, 6, 8, 9] if keep == "primeira" else [4, 5, 6, 7, 8, 9])
+
+    chunked = DeduplicationStrategy()
+    frames = chunked.reduce_chunks(lambda: (df.iloc[i:i + 3] for i in range(0, 10, 3)), ["a", "b"],
+                                   {"dedup_keep": keep})
+    pd.testing.assert_frame_equal(pd.concat(frames), expected)
+    assert chunked.summary == strategy.summary
+
+
+@pytest.mark.parametrize("keep", ["primeira", "ultima"])
+def test_deduplication_chunked_on_empty_csv(keep):
+    import io
+
+    from app.data_mining.reduction.strategies import DeduplicationStrategy
+    def read_chunks():
+        return pd.read_csv(io.StringIO("a,b\n"), chunksize=4)
+
+    strategy = DeduplicationStrategy()
+    frames = list(strategy.reduce_chunks(read_chunks, ["a", "b"], {"dedup_keep": keep}))
+    assert sum(len(frame) for frame in frames) == 0
+    assert strategy.summary == {"rows": 0, "duplicates": 0, "duplicate_ratio": 0.0}
+
+
+def test_deduplication_chunked_respects_hash_limit():
+    from app.data_mining.reduction.strategies import DeduplicationStrategy
+    df = pd.DataFrame({"a": range(10)})
+    with pytest.raises(ValidationError):
+        DeduplicationStrategy().reduce_chunks(_chunks(df, 4), ["a"], {"dedup_max_hashes": 5})
+
+
+def test_pca_on_sparse_onehot_matches_dense_encoding():
+    df = pd.DataFrame({"cor": list("abcab" * 8), "x": np.linspace(0, 1, 40), "alvo": [0, 1] * 20})
+    params = {"target": "alvo", "encoding": "onehot", "n_components": 2}
+    strategy = PCAStrategy()
+    result = strategy.reduce(df, ["cor", "x"], params)
+    assert strategy.summary["solver"] == "arpack"
+    dense = pd.get_dummies(df["cor"], dtype=float).assign(x=df["x"])
+    expected = PCAStrategy().reduce(dense.assign(alvo=df["alvo"]), ["a", "b", "c", "x"], {"target": "alvo"})
+    np.testing.assert_allclose(np.abs(result[["PC1", "PC2"]]), np.abs(expected[["PC1", "PC2"]]), atol=1e-6)
+    with pytest.raises(ValidationError):
+        PCAStrategy().reduce_chunks(_chunks(df, 10), ["cor", "x"], params)
+
+
+def test_truncated_svd_chunked_matches_in_memory():
+    from app.data_mining.reduction.strategies import TruncatedSVDStrategy
+    df = _wide_frame(rows=80)
+    features = list(df.columns[:-1])
+    params = {"target": "alvo", "n_components": 2}
+    strategy = TruncatedSVDStrategy()
+    result = strategy.reduce(df, features, params)
+    assert list(result.columns) == ["SV1", "SV2", "alvo"]
+    chunked = TruncatedSVDStrategy()
+    streamed = pd.concat(chunked.reduce_chunks(_chunks(df, 25), features, params), ignore_index=True)
+    np.testing.assert_allclose(np.abs(streamed[["SV1", "SV2"]]), np.abs(result[["SV1", "SV2"]]), atol=1e-6)
+    assert chunked.summary["explained_variance_ratio"] == strategy.summary["explained_variance_ratio"]
+    with pytest.raises(ValidationError):
+        TruncatedSVDStrategy().reduce(df, features, {"jl_epsilon": 0.5})
+
+
+def test_truncated_svd_keeps_onehot_sparse():
+    from app.data_mining.reduction.strategies import TruncatedSVDStrategy
+    df = pd.DataFrame({"cor": list("abcde" * 8), "x": np.linspace(0, 1, 40)})
+    result = TruncatedSVDStrategy().reduce(df, ["cor", "x"], {"encoding": "hashing", "hash_features": 16})
+    assert list(result.columns) == ["SV1", "SV2"]
+    assert len(result) == 40
+
+
+@pytest.mark.parametrize("method", ["projecao_gaussiana", "projecao_esparsa"])
+def test_random_projection_chunked_matches_in_memory(method):
+    df = _wide_frame(rows=50, cols=8)
+    features = list(df.columns[:-1])
+    params = {"target": "alvo", "n_components": 3, "random_seed": 4}
+    result = get_strategy(method).reduce(df, features, params)
+    assert list(result.columns) == ["RP1", "RP2", "RP3", "alvo"]
+    streamed = pd.concat(get_strategy(method).reduce_chunks(_chunks(df, 15), features, params), ignore_index=True)
+    np.testing.assert_allclose(streamed.to_numpy(), result.to_numpy())
+
+
+def test_random_projection_jl_epsilon_sizes_components():
+    from sklearn.random_projection import johnson_lindenstrauss_min_dim
+    df = pd.DataFrame(np.random.default_rng(0).normal(size=(20, 300)), columns=[f"f{i}" for i in range(300)])
+    strategy = get_strategy("projecao_esparsa")
+    result = strategy.reduce(df, list(df.columns), {"jl_epsilon": 0.9})
+    expected = int(johnson_lindenstrauss_min_dim(20, eps=0.9))
+    assert result.shape == (20, expected)
+    assert strategy.summary["n_components"] == expected and "random_seed" in strategy.summary
+    chunked = get_strategy("projecao_esparsa")
+    chunks = chunked.reduce_chunks(_chunks(df, 7), list(df.columns), {"jl_epsilon": 0.9, "random_seed": 1})
+    assert chunked.summary["n_components"] == expected
+    assert sum(len(chunk) for chunk in chunks) == 20
+    # 20 linhas com ε pequeno pedem mais componentes que as 300 features
+    with pytest.raises(ValidationError):
+        get_strategy("projecao_gaussiana").reduce(df, list(df.columns), {"jl_epsilon": 0.05})
@@ -1,4 +1,5 @@
 import pandas as pd
+import pytest
 
 from app.data_mining.visualization.measures import (
     CENTRAL_TENDENCY, DISPERSION, get_median_results, get_variance_results,
@@ -8,7 +9,7 @@ from app.data_mining.visualization.measures import (
 def test_median_results(monkeypatch):
     import app.data_mining.visualization.measures as mod
     df = pd.DataFrame({"idade": [10, 20, 30]})
-    monkeypatch.setattr(mod, "read_csv", lambda url: df.copy())
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: df.copy())
     result = get_median_results("fake", ["idade"])
     assert result["idade"] == 20
 
@@ -16,7 +17,7 @@ def test_median_results(monkeypatch):
 def test_variance_results(monkeypatch):
     import app.data_mining.visualization.measures as mod
     df = pd.DataFrame({"idade": [10, 20, 30]})
-    monkeypatch.setattr(mod, "read_csv", lambda url: df.copy())
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: df.copy())
     result = get_variance_results("fake", ["idade"])
     assert result["idade"] == 100.0
 
@@ -31,7 +32,7 @@ def test_central_tendency_endpoint(auth_client, monkeypatch):
     from tests.factories import make_project, make_dataset
     import app.data_mining.visualization.measures as mod
     df = pd.DataFrame({"idade": [10, 20, 30, 40]})
-    monkeypatch.setattr(mod, "read_csv", lambda url: df.copy())
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: df.copy())
     project = make_project(user)
     ds = make_dataset(user, project)
     resp = client.post(f"/api/data-visualization/measure-central-tendency/{ds.id}",
@@ -45,9 +46,435 @@ def test_association_requires_two_features(auth_client, monkeypatch):
     from tests.factories import make_project, make_dataset
     import app.data_mining.visualization.measures as mod
     df = pd.DataFrame({"a": [1, 2, 3], "b": [4, 5, 6]})
-    monkeypatch.setattr(mod, "read_csv", lambda url: df.copy())
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: df.copy())
     project = make_project(user)
     ds = make_dataset(user, project)
     resp = client.post(f"/api/data-visualization/association-measure/{ds.id}",
                        json={"features": ["a"], "visualization_method": "correlation"})
     assert resp.status_code == 422
+
+
+def test_evaluate_loads_requested_columns_once(monkeypatch):
+    import numpy as np
+    from scipy import stats
+
+    import app.data_mining.visualization.measures as mod
+    df = pd.DataFrame({"a": [1.0, 4.0, 2.0, np.nan, 8.0, 3.0], "b": [5, 1, 1, 7, 2, 9], "c": list("xyzxyz")})
+    calls = []
+
+    def fake_read_csv(url, **options):
+        calls.append(options)
+        return df[[c for c in df.columns if options["usecols"](c)]].copy()
+
+    monkeypatch.setattr(mod, "read_csv", fake_read_csv)
+    # a distribuição de frequência sempre recusou feature ausente; as demais respondem None
+    specs = [
+        ("central_tendency", method, ["a", "b"] if "frequency" in method else ["a", "b", "ausente"])
+        for method in mod.CENTRAL_TENDENCY
+    ]
+    specs += [("dispersion", "variance", ["a", "b"]), ("shape", "skewness", ["a"]), ("shape", "kurtosis", ["b"])]
+    results = mod.evaluate("fake", specs)
+
+    assert len(calls) == 1
+    by_method = {method: result for (_, method, _), result in zip(specs, results)}
+    assert by_method["median"] == {"a": 3.0, "b": 3.5, "ausente": None}
+    assert by_method["midpoint"]["a"] == round(df["a"].mean(), 2)
+    assert by_method["mode"]["b"] == [1]
+    assert by_method["variance"] == {"a": round(df["a"].var(), 2), "b": round(df["b"].var(), 2)}
+    assert by_method["skewness"]["a"] == round(float(stats.skew(df["a"].dropna())), 2)
+    assert by_method["kurtosis"]["b"] == round(float(stats.kurtosis(df["b"])), 2)
+    assert by_method["frequency_distribution"]["b"]["frequency_distribution"]
+
+
+def test_batch_endpoint_returns_keyed_results(auth_client, monkeypatch):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    import app.data_mining.visualization.measures as mod
+    df = pd.DataFrame({"a": [1, 2, 3, 4], "b": [2, 4, 6, 9]})
+    calls = []
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: calls.append(url) or df.copy())
+    ds = make_dataset(user, make_project(user))
+    resp = client.post(f"/api/data-visualization/batch/{ds.id}", json={"measures": [
+        {"group": "central_tendency", "method": "median", "features": ["a", "b"]},
+        {"group": "dispersion", "method": "variance", "features": ["a"]},
+        {"group": "association", "method": "correlation", "features": ["a", "b"]},
+        {"group": "central_tendency", "method": "median", "features": ["b"], "key": "mediana_b"},
+    ]})
+    assert resp.status_code == 200
+    data = resp.get_json()["data"]
+    assert len(calls) == 1
+    assert data["central_tendency.median"] == {"a": 2.5, "b": 5.0}
+    assert data["dispersion.variance"]["a"] == round(df["a"].var(), 2)
+    assert data["association.correlation"]["sample_size"] == 4
+    assert data["mediana_b"] == {"b": 5.0}
+
+
+def test_batch_endpoint_validates_each_spec(auth_client):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    ds = make_dataset(user, make_project(user))
+    url = f"/api/data-visualization/batch/{ds.id}"
+    median = {"group": "central_tendency", "method": "median", "features": ["a"]}
+    resp = client.post(url, json={"measures": [median, {"group": "shape", "method": "median", "features": ["a"]}]})
+    assert resp.status_code == 422
+    assert "measures.1.method" in resp.get_json()["errors"]
+    resp = client.post(url, json={"measures": [{"group": "forma", "method": "skewness", "features": ["a"]}]})
+    assert "measures.0.group" in resp.get_json()["errors"]
+    resp = client.post(url, json={"measures": [median, median]})
+    assert "measures.1.key" in resp.get_json()["errors"]
+    resp = client.post(url, json={"measures": [{"group": "association", "method": "covariance", "features": ["a"]}]})
+    assert "measures.0.features" in resp.get_json()["errors"]
+
+
+def test_measures_are_cached_by_content_version(auth_client, s3, tmp_path, monkeypatch):
+    import io
+
+    import app.data_mining.visualization.measures as mod
+    from app.extensions import db
+    from tests.factories import make_project, make_dataset
+    client, user = auth_client
+    path = tmp_path / "base.csv"
+    pd.DataFrame({"a": [1, 2, 3, 10]}).to_csv(path, index=False)
+    ds = make_dataset(user, make_project(user), file_url=str(path))
+    ds.content_hash = "v1"
+    db.session.commit()
+    reads = []
+    real_read_csv = mod.read_csv
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: reads.append(url) or real_read_csv(url, **options))
+
+    url = f"/api/data-visualization/dispersion-measure/{ds.id}"
+    body = {"features": ["a"], "visualization_method": "amplitude"}
+    first = client.post(url, json=body).get_json()["data"]
+    second = client.post(url, json=body).get_json()["data"]
+    batch = client.post(f"/api/data-visualization/batch/{ds.id}", json={"measures": [
+        {"group": "dispersion", "method": "amplitude", "features": ["a"]},
+        {"group": "central_tendency", "method": "median", "features": ["a"]},
+    ]}).get_json()["data"]
+    assert first == second == batch["dispersion.amplitude"] == {"a": 9.0}
+    assert batch["central_tendency.median"] == {"a": 2.5}
+    # uma leitura para a amplitude e outra só para a mediana que faltava no cache
+    assert len(reads) == 2
+
+    cache = client.application.services["visualization"]._cache
+    resp = client.put(f"/api/datasets/{ds.id}", data={"csv_file": (io.BytesIO(b"a\n1\n2\n"), "nova.csv")},
+                      content_type="multipart/form-data")
+    assert resp.status_code == 200
+    assert len(cache._backend) == 0
+
+
+def test_dispersion_and_shape_answer_from_profile_moments(monkeypatch):
+    import numpy as np
+
+    import app.data_mining.visualization.measures as mod
+    from app.data_mining.profiling import ProfileBuilder, profile_frame
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({"a": rng.exponential(3, 500).round(1), "b": rng.normal(40, 7, 500), "c": ["x"] * 500})
+    df.loc[::17, "a"] = np.nan
+    # k acima do número de linhas: o sketch de quantis guarda tudo e os quartis também batem
+    builder = ProfileBuilder(chunk_rows=64, quantile_k=1000)
+    for i in range(0, len(df), 90):
+        builder.add(df.iloc[i:i + 90])
+    profile = builder.result()
+    assert set(profile["moments"]) == {"a", "b"}
+
+    specs = [
+        ("central_tendency", "midpoint", ["a", "b"]),
+        *[("dispersion", method, ["a", "b"]) for method in mod.DISPERSION],
+        *[("shape", method, ["a", "b"]) for method in mod.SHAPE],
+    ]
+    expected = [mod.MEASURE_GROUPS[g][m](df, f) for g, m, f in specs]
+
+    def no_reads(*args, **kwargs):
+        raise AssertionError("o perfil deveria responder sem ler o arquivo")
+
+    monkeypatch.setattr(mod, "read_csv", no_reads)
+    assert mod.evaluate("fake", specs, profile) == expected
+    # coluna de texto não tem momentos: a medida volta a ler o arquivo
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: df.copy())
+    assert mod.evaluate("fake", [("central_tendency", "mode", ["c"])], profile) == [{"c": ["x"]}]
+    # coluna numérica só com NaN tem sketch vazio: a resposta é a do DataFrame (NaN), não 0 ou -inf
+    empty = pd.DataFrame({"d": [np.nan] * 4, "e": [1.0, 2.0, 3.0, 4.0]})
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: empty.copy())
+    empty_specs = [("central_tendency", "midpoint", ["d"]), ("dispersion", "amplitude", ["d"])]
+    midpoint, amplitude = mod.evaluate("fake", empty_specs, profile_frame(empty, 2))
+    assert np.isnan(midpoint["d"]) and np.isnan(amplitude["d"])
+
+
+def test_median_quartiles_and_histogram_from_quantile_sketch(monkeypatch):
+    import numpy as np
+
+    import app.data_mining.visualization.measures as mod
+    from app.data_mining.profiling import ProfileBuilder
+    values = np.random.default_rng(6).lognormal(3, 1, 40_000)
+    df = pd.DataFrame({"a": values})
+    builder = ProfileBuilder(chunk_rows=10_000, quantile_k=200)
+    for i in range(0, len(df), 7_000):
+        builder.add(df.iloc[i:i + 7_000])
+    profile = builder.result()
+
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: df.copy())
+    specs = [
+        ("central_tendency", "median", ["a"]),
+        ("dispersion", "quartiles", ["a"]),
+        ("central_tendency", "frequency_distribution", ["a"]),
+    ]
+    median, quartiles, distribution = mod.evaluate("fake", specs, profile)
+    # erro de posto do KLL com k=200 fica bem abaixo de 2%
+    for estimate, q in [(median["a"], 0.5), (quartiles["a"]["q1"], 0.25), (quartiles["a"]["q3"], 0.75)]:
+        assert abs((values <= estimate).mean() - q) < 0.02
+    exact = mod.evaluate("fake", specs, profile, exact=True)
+    assert exact[0] == {"a": float(np.median(values))}
+    approx = [item["frequency"] for item in distribution["a"]["frequency_distribution"]]
+    counts = [item["frequency"] for item in exact[2]["a"]["frequency_distribution"]]
+    assert sum(approx) == sum(counts) == len(values)
+    assert max(abs(x - y) for x, y in zip(approx, counts)) < 0.02 * len(values)
+
+
+def test_exact_flag_reads_the_file(auth_client, tmp_path, monkeypatch):
+    import app.data_mining.visualization.measures as mod
+    from app.data_mining.profiling import profile_frame
+    from app.extensions import db
+    from tests.factories import make_project, make_dataset
+    client, user = auth_client
+    path = tmp_path / "base.csv"
+    df = pd.DataFrame({"a": [5, 1, 4, 2, 3]})
+    df.to_csv(path, index=False)
+    ds = make_dataset(user, make_project(user), file_url=str(path))
+    ds.profile = profile_frame(df, 100)
+    db.session.commit()
+    reads = []
+    real_read_csv = mod.read_csv
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: reads.append(url) or real_read_csv(url, **options))
+    url = f"/api/data-visualization/dispersion-measure/{ds.id}"
+    body = {"features": ["a"], "visualization_method": "quartiles"}
+    sketched = client.post(url, json=body).get_json()["data"]
+    assert reads == []
+    exact = client.post(url, json={**body, "exact": True}).get_json()["data"]
+    assert len(reads) == 1
+    assert sketched == exact == {"a": {"q1": 2.0, "q2": 3.0, "q3": 4.0, "iqr": 2.0}}
+
+
+def test_association_matrix_matches_pandas_pairwise(monkeypatch):
+    import numpy as np
+
+    import app.data_mining.visualization.measures as mod
+    from app.data_mining.visualization.measures import (
+        get_correlation_matrix_results, get_covariance_matrix_results,
+    )
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame(rng.normal(size=(300, 4)) * [1, 10, 100, 1] + 1e4, columns=list("abcd"))
+    df.loc[rng.random(300) < 0.2, "a"] = np.nan
+    df.loc[rng.random(300) < 0.3, "c"] = np.nan
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: df.copy())
+
+    covariance = get_covariance_matrix_results("fake", list("abcd"))
+    correlation = get_correlation_matrix_results("fake", list("abcd"))
+    assert covariance["features"] == list("abcd")
+    assert np.allclose(covariance["covariance"], df.cov().round(4), atol=1e-4)
+    assert np.allclose(correlation["correlation"], df.corr().round(4), atol=1e-4)
+    assert correlation["sample_size"][0][2] == len(df[["a", "c"]].dropna())
+
+    # com NaN em colunas diferentes os postos são refeitos por par, como no pandas
+    spearman = get_correlation_matrix_results("fake", list("abcd"), correlation_method="spearman")
+    assert np.allclose(spearman["correlation"], df.corr("spearman").round(4), atol=1e-4)
+    complete = df.dropna()
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: complete.copy())
+    spearman = get_correlation_matrix_results("fake", list("abcd"), correlation_method="spearman")
+    assert np.allclose(spearman["correlation"], complete.corr("spearman").round(4), atol=1e-4)
+
+
+def test_association_matrix_endpoint(auth_client, monkeypatch):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    import app.data_mining.visualization.measures as mod
+    df = pd.DataFrame({"a": [1, 2, 3, 4], "b": [2, 4, 6, 8], "c": [4, 3, 2, None], "nome": list("wxyz")})
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: df.copy())
+    ds = make_dataset(user, make_project(user))
+    url = f"/api/data-visualization/association-measure/{ds.id}"
+    resp = client.post(url, json={
+        "features": ["a", "b", "c"], "visualization_method": "correlation_matrix", "correlation_method": "spearman",
+    })
+    assert resp.status_code == 200
+    data = resp.get_json()["data"]
+    assert data["method"] == "spearman"
+    assert data["correlation"][0] == [1.0, 1.0, -1.0]
+    assert data["sample_size"][2] == [3, 3, 3]
+
+    for body in (
+        {"features": ["a"], "visualization_method": "covariance_matrix"},
+        {"features": ["a", "nome"], "visualization_method": "covariance_matrix"},
+        {"features": ["a", "b"], "visualization_method": "correlation_matrix", "correlation_method": "kendall"},
+    ):
+        assert client.post(url, json=body).status_code == 422
+
+
+def test_grouped_measures_match_per_class_results(monkeypatch):
+    import numpy as np
+
+    import app.data_mining.visualization.measures as mod
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "classe": rng.choice(["a", "b", "c"], 400), "x": rng.gamma(2, 3, 400) + 100, "y": rng.normal(size=400),
+    })
+    df.loc[rng.random(400) < 0.1, "y"] = np.nan
+    calls = []
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: calls.append(url) or df.copy())
+    methods = [
+        ("central_tendency", "midpoint"), ("central_tendency", "median"), ("central_tendency", "harmonic_mean"),
+        ("dispersion", "variance"), ("dispersion", "quartiles"), ("shape", "skewness"), ("shape", "kurtosis"),
+    ]
+    specs = [(group, method, ["x", "y"]) for group, method in methods]
+    grouped = mod.evaluate("fake", specs, group_by="classe")
+    assert len(calls) == 1
+    for label, part in df.groupby("classe"):
+        part = part.reset_index(drop=True)
+        expected = [mod.MEASURE_GROUPS[group][method](part, ["x", "y"]) for group, method, _ in specs]
+        for (_, method, _), result, reference in zip(specs, grouped, expected):
+            for feature in ("x", "y"):
+                if method == "quartiles":
+                    assert result[feature][label] == pytest.approx(reference[feature])
+                else:
+                    assert result[feature][label] == pytest.approx(reference[feature], abs=0.011), (method, feature)
+
+
+def test_grouped_shape_with_distant_class_means():
+    import numpy as np
+    from scipy import stats
+
+    from app.data_mining.visualization.grouped import grouped_results
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"classe": ["a"] * 500 + ["b"] * 500, "x": np.r_[rng.normal(0, 1, 500), rng.normal(1e6, 1, 500)]})
+    skewness, kurtosis = grouped_results(df, "classe", [("shape", "skewness", ["x"]), ("shape", "kurtosis", ["x"])])
+    for label, part in df.groupby("classe"):
+        assert skewness["x"][label] == round(stats.skew(part["x"]), 2)
+        assert kurtosis["x"][label] == round(stats.kurtosis(part["x"]), 2)
+
+    constant = pd.DataFrame({"classe": ["a"] * 10 + ["b"] * 10, "x": [1 / 3] * 10 + list(range(10))})
+    specs = [("shape", "skewness", ["x"]), ("shape", "kurtosis", ["x"])]
+    skewness, kurtosis = grouped_results(constant, "classe", specs)
+    assert skewness["x"]["a"] is None and kurtosis["x"]["a"] is None
+    assert skewness["x"]["b"] == round(stats.skew(range(10)), 2)
+
+
+def test_grouped_endpoint_validates_method_and_group_count(auth_client, monkeypatch):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    import app.data_mining.visualization.grouped as grouped
+    import app.data_mining.visualization.measures as mod
+    df = pd.DataFrame({"classe": ["a", "a", "b", "c"], "x": [1, 3, 5, 7]})
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: df.copy())
+    ds = make_dataset(user, make_project(user))
+    url = f"/api/data-visualization/measure-central-tendency/{ds.id}"
+    resp = client.post(url, json={"features": ["x"], "visualization_method": "midpoint", "group_by": "classe"})
+    assert resp.status_code == 200
+    assert resp.get_json()["data"] == {"x": {"a": 2.0, "b": 5.0, "c": 7.0}}
+
+    for method, group_by in (("mode", "classe"), ("median", "z")):
+        body = {"features": ["x"], "visualization_method": method, "group_by": group_by}
+        assert client.post(url, json=body).status_code == 422
+    monkeypatch.setattr(grouped, "MAX_GROUPS", 2)
+    body = {"features": ["x"], "visualization_method": "median", "group_by": "classe"}
+    assert client.post(url, json=body).status_code == 422
+
+
+def test_mode_and_top_values_from_profile_sketch(monkeypatch):
+    import json
+
+    import numpy as np
+
+    import app.data_mining.visualization.measures as mod
+    from app.data_mining.profiling import ProfileBuilder
+    rng = np.random.default_rng(8)
+    df = pd.DataFrame({
+        "cidade": rng.choice(["Recife", "Natal", "Salvador"], 20_000, p=[0.5, 0.3, 0.2]),
+        "id": rng.integers(0, 1_000_000, 20_000),
+    })
+    builder = ProfileBuilder(chunk_rows=5_000, frequent_capacity=64)
+    for i in range(0, len(df), 3_000):
+        builder.add(df.iloc[i:i + 3_000])
+    # o perfil vai para uma coluna JSON no banco
+    profile = json.loads(json.dumps(builder.result()))
+    calls = []
+    monkeypatch.setattr(mod, "read_csv", lambda url, **options: calls.append(url) or df.copy())
+
+    mode, top = mod.evaluate("fake", [
+        ("central_tendency", "mode", ["cidade"]), ("central_tendency", "top_values", ["cidade", "id"]),
+    ], profile, top_k=2)
+    assert calls == []
+    assert mode == {"cidade": ["Recife"]}
+    assert [item["value"] for item in top["cidade"]["values"]] == ["Recife", "Natal"]
+    assert top["cidade"]["exact"] and top["cidade"]["count"] == len(df)
+    counts = df["id"].value_counts()
+    assert not top["id"]["exact"]
+    for item in top["id"]["values"]:
+        assert item["min_count"] <= counts[item["value"]] <= item["max_count"]
+
+    # sem garantia de moda no sketch do id, a moda sai do arquivo
+    assert mod.evaluate("fake", [("central_tendency", "mode", ["id"])], profile) == [
+        {"id": df["id"].mode().tolist()}
+    ]
+    assert len(calls) == 1
+
+
+def test_precision_answers_from_a_sample_with_confidence_interval(monkeypatch):
+    import numpy as np
+
+    import app.data_mining.visualization.measures as mod
+    rng = np.random.default_rng(14)
+    df = pd.DataFrame({"a": rng.normal(50, 10, 200_000), "b": rng.exponential(3, 200_000)})
+
+    def chunks(url, chunk_size, **options):
+        return (df.iloc[i:i + chunk_size].copy() for i in range(0, len(df), chunk_size))
+    monkeypatch.setattr(mod, "iter_csv", chunks)
+    specs = [("central_tendency", "midpoint", ["a", "b"]), ("central_tendency", "median", ["a", "b"])]
+    midpoint, median = mod.evaluate("fake", specs, precision=0.05)
+    for result, truth in ((midpoint, df.mean()), (median, df.median())):
+        for feature in ("a", "b"):
+            item = result[feature]
+            assert item["sample_size"] == 1537
+            assert item["ci_low"] < truth[feature] < item["ci_high"]
+            assert item["ci_high"] - item["ci_low"] < 0.3 * df[feature].std()
+
+    small = df.iloc[:100]
+    monkeypatch.setattr(mod, "iter_csv", lambda url, chunk_size, **options: iter([small.copy()]))
+    (exact,) = mod.evaluate("fake", [("dispersion", "variance", ["a"])], precision=0.05)
+    assert exact["a"]["value"] == exact["a"]["ci_low"] == exact["a"]["ci_high"] == round(small["a"].var(), 2)
+
+
+def test_precision_interval_survives_small_scale_features(monkeypatch):
+    import numpy as np
+
+    import app.data_mining.visualization.measures as mod
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({"a": rng.normal(0.001, 0.002, 50_000)})
+    monkeypatch.setattr(mod, "iter_csv", lambda url, chunk_size, **options: iter([df.copy()]))
+    specs = [("central_tendency", "midpoint", ["a"]), ("dispersion", "standard_deviation", ["a"])]
+    midpoint, deviation = mod.evaluate("fake", specs, precision=0.05)
+    for result, truth in ((midpoint, df["a"].mean()), (deviation, df["a"].std())):
+        item = result["a"]
+        assert item["ci_low"] < item["ci_high"]
+        assert item["ci_low"] < truth < item["ci_high"]
+
+
+def test_precision_rejects_methods_without_interval(auth_client, monkeypatch):
+    client, user = auth_client
+    from tests.factories import make_project, make_dataset
+    ds = make_dataset(user, make_project(user))
+    url = f"/api/data-visualization/dispersion-measure/{ds.id}"
+    body = {"features": ["a"], "visualization_method": "amplitude", "precision": 0.05}
+    assert client.post(url, json=body).status_code == 422
+    body = {"features": ["a"], "visualization_method": "variance", "precision": 0.05, "group_by": "b"}
+    assert client.post(url, json=body).status_code == 422
+    body = {"features": ["a"], "visualization_method": "variance", "precision": 1.5}
+    assert client.post(url, json=body).status_code == 422
+
+
+def test_shape_of_constant_column_is_nan_like_scipy():
+    import numpy as np
+    from scipy import stats
+
+    from app.data_mining.visualization.measures import get_kurtosis_results, get_skewness_results
+    df = pd.DataFrame({"c": [1 / 3] * 10, "x": [1.0, 2.0, 4.0, 8.0, 1.0, 2.0, 3.0, 5.0, 9.0, 1.0]})
+    skewness, kurtosis = get_skewness_results(df, ["c", "x"]), get_kurtosis_results(df, ["c", "x"])
+    assert np.isnan(skewness["c"]) and np.isnan(kurtosis["c"])
+    assert skewness["x"] == round(stats.skew(df["x"]), 2) and kurtosis["x"] == round(stats.kurtosis(df["x"]), 2)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.common.errors import ValidationError
+from app.data_mining.sketches import MomentSketch, QuantileSketch
+from app.data_mining.visualization.binning import (class_means, histograms, sketch_histogram,
+                                                   validate_rule)
+
+
+def test_sturges_handles_ranges_smaller_than_class_count():
+    # amplitude 1 com 9 classes: a largura inteira antiga virava 0 e o np.arange quebrava
+    df = pd.DataFrame({"x": np.linspace(0, 1, 300)})
+    result = histograms(df, ["x"])["x"]
+    assert len(result["counts"]) == 9
+    assert result["edges"][0] == 0.0 and result["edges"][-1] == 1.0
+    assert sum(result["counts"]) == 300
+    assert result["frequency_distribution"][0]["interval"] == "0 - 0.1111"
+
+
+@pytest.mark.parametrize("rule", ["sturges", "freedman_diaconis", "scott", "quantil"])
+def test_rules_cover_every_value(rule):
+    df = pd.DataFrame({"a": np.random.default_rng(0).normal(size=500), "b": np.arange(500) % 13})
+    for feature, result in histograms(df, ["a", "b"], rule).items():
+        edges = np.asarray(result["edges"])
+        assert np.all(np.diff(edges) > 0)
+        assert sum(result["counts"]) == 500
+        assert np.allclose(result["midpoints"], (edges[:-1] + edges[1:]) / 2)
+
+
+def test_quantile_rule_balances_counts_and_fixed_rule_uses_bins():
+    df = pd.DataFrame({"a": np.random.default_rng(1).exponential(size=1000)})
+    counts = histograms(df, ["a"], "quantil", bins=4)["a"]["counts"]
+    assert counts == [250, 250, 250, 250]
+    assert len(histograms(df, ["a"], "fixo", bins=7)["a"]["counts"]) == 7
+    with pytest.raises(ValidationError):
+        validate_rule("fixo", None)
+    with pytest.raises(ValidationError):
+        validate_rule("doane", None)
+
+
+def test_constant_column_gets_one_class():
+    result = histograms(pd.DataFrame({"a": [3.0] * 10}), ["a"])["a"]
+    assert result["edges"] == [2.5, 3.5] and result["counts"] == [10]
+
+
+def test_class_means_come_from_numeric_midpoints():
+    df = pd.DataFrame({"a": [0.0, 0.1, 0.2, 0.9, 1.0]})
+    result = class_means(histograms(df, ["a"], "fixo", bins=2)["a"])
+    assert [item["class_mean"] for item in result["frequency_distribution_with_means"]] == [0.25, 0.75]
+    assert result["overall_mean"] == round((0.25 * 3 + 0.75 * 2) / 5, 2)
+
+
+def test_sketch_histogram_matches_frame_when_sketch_is_exact():
+    values = np.random.default_rng(2).gamma(2, 2, 150)
+    moments, quantiles = MomentSketch().update(values), QuantileSketch(k=200).update(values)
+    for rule in ("sturges", "scott", "freedman_diaconis", "quantil"):
+        expected = histograms(pd.DataFrame({"a": values}), ["a"], rule)["a"]
+        result = sketch_histogram(moments, quantiles, rule)
+        assert result["counts"] == expected["counts"]
+        assert np.allclose(result["edges"], expected["edges"])
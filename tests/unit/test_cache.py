@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+from app.common.cache import MemoryCache, RedisCache, build_cache
+from app.data_mining.visualization.cache import MeasureCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_cache_expires_entries():
+    clock = _Clock()
+    cache = MemoryCache(ttl=10, clock=clock)
+    cache.set("a", {"x": 1})
+    clock.now = 9
+    assert cache.get("a") == {"x": 1}
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+class _FakeRedis:
+    """O mínimo da API do redis-py que o ``RedisCache`` usa."""
+
+    def __init__(self):
+        self.data, self.ttls = {}, {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key], self.ttls[key] = value, ex
+
+    def scan_iter(self, match):
+        return [key for key in self.data if key.startswith(match.rstrip("*"))]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def test_redis_cache_round_trips_json_with_ttl():
+    client = _FakeRedis()
+    cache = RedisCache(client, ttl=30)
+    cache.set("measure:1:x", {"a": [1.5, None]})
+    assert cache.get("measure:1:x") == {"a": [1.5, None]}
+    assert client.ttls == {"easyminer:measure:1:x": 30}
+    cache.delete_prefix("measure:1:")
+    assert cache.get("measure:1:x") is None
+
+
+def test_build_cache_disabled_with_zero_ttl():
+    assert build_cache(None, 0, 10) is None
+    assert isinstance(build_cache(None, 60, 10), MemoryCache)
+
+
+def test_measure_cache_keys_by_version_and_sorted_features():
+    backend = MemoryCache()
+    cache = MeasureCache(backend)
+    dataset = SimpleNamespace(content_hash="h1")
+    clean = SimpleNamespace(fingerprint="f1")
+    key = cache.key(1, dataset, "dispersion", "variance", ["b", "a"])
+    assert key == cache.key(1, dataset, "dispersion", "variance", ["a", "b"])
+    assert key != cache.key(1, SimpleNamespace(content_hash="h2"), "dispersion", "variance", ["a", "b"])
+    # associação depende da ordem das features
+    assert cache.key(1, dataset, "association", "covariance", ["a", "b"]) != cache.key(
+        1, dataset, "association", "covariance", ["b", "a"]
+    )
+    # sem versão (reamostragem sem semente) não há cache
+    assert cache.key(1, SimpleNamespace(fingerprint=None), "shape", "skewness", ["a"]) is None
+
+    cache.set(key, {"a": 1.0})
+    cache.set(cache.key(1, clean, "shape", "skewness", ["a"]), {"a": 0.0})
+    cache.invalidate(1, clean_only=True)
+    assert len(backend) == 1 and cache.get(key) == {"a": 1.0}
+    cache.invalidate(1)
+    assert len(backend) == 0
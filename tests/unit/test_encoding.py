@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+from app.common.errors import ValidationError
+from app.data_mining.encoding import encode_features
+
+
+def test_onehot_from_category_codes_keeps_numeric_columns():
+    df = pd.DataFrame({"cor": ["azul", "verde", None, "azul"], "peso": [1.5, 2.0, 3.0, 4.0]})
+    matrix, names = encode_features(df, ["cor", "peso"], "onehot")
+    assert sparse.isspmatrix_csr(matrix)
+    assert names == ["cor=azul", "cor=verde", "peso"]
+    assert matrix.toarray().tolist() == [[1, 0, 1.5], [0, 1, 2.0], [0, 0, 3.0], [1, 0, 4.0]]
+
+
+def test_hashing_has_fixed_width_and_one_entry_per_category():
+    df = pd.DataFrame({"cidade": [f"c{i % 5000}" for i in range(20_000)], "uf": ["sp", "rj"] * 10_000})
+    matrix, names = encode_features(df, ["cidade", "uf"], "hashing", hash_features=64)
+    assert matrix.shape == (20_000, 64) and len(names) == 64
+    assert matrix.nnz <= 2 * 20_000
+    assert set(np.abs(matrix.data)) <= {1.0, 2.0}
+
+
+def test_unknown_encoding():
+    with pytest.raises(ValidationError):
+        encode_features(pd.DataFrame({"a": ["x"]}), ["a"], "ordinal")
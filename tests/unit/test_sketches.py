@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from app.data_mining.sketches import FrequentItems, MomentSketch, QuantileSketch
+
+
+def test_moment_sketch_merge_matches_full_column():
+    values = np.random.default_rng(1).normal(50, 10, 1000)
+    merged = MomentSketch()
+    for chunk in np.array_split(values, 7):
+        merged.merge(MomentSketch().update(chunk))
+    assert merged.count == 1000
+    assert np.isclose(merged.mean, values.mean())
+    assert np.isclose(merged.variance(), values.var(ddof=1))
+    assert merged.min == values.min() and merged.max == values.max()
+
+
+def test_moment_sketch_higher_moments_merge_like_scipy():
+    from scipy import stats
+    values = np.random.default_rng(4).gamma(2.0, 3.0, 5000) + 1e6
+    merged = MomentSketch()
+    for chunk in np.array_split(values, 11):
+        merged.merge(MomentSketch().update(chunk))
+    assert np.isclose(merged.skewness(), stats.skew(values))
+    assert np.isclose(merged.kurtosis(), stats.kurtosis(values))
+    restored = MomentSketch.from_dict(merged.to_dict())
+    assert restored.to_dict() == merged.to_dict()
+    assert MomentSketch.from_dict(MomentSketch().to_dict()).count == 0
+
+
+def test_moment_sketch_shape_of_constant_column_is_nan_for_any_chunking():
+    whole = MomentSketch().update([1 / 3] * 10)
+    merged = MomentSketch().update([1 / 3] * 5).merge(MomentSketch().update([1 / 3] * 5))
+    for sketch in (whole, merged):
+        assert np.isnan(sketch.skewness()) and np.isnan(sketch.kurtosis())
+
+
+def test_moment_sketch_ignores_nan():
+    sketch = MomentSketch().update([1.0, np.nan, 3.0])
+    assert sketch.count == 2
+    assert sketch.mean == 2.0
+
+
+def test_quantile_sketch_exact_for_small_columns():
+    sketch = QuantileSketch(k=50).update([10, 20, 30, 40])
+    assert sketch.is_exact
+    assert sketch.quantile(0.5) == pd.Series([10, 20, 30, 40]).median()
+
+
+def test_quantile_sketch_rank_error_is_bounded():
+    values = np.random.default_rng(2).exponential(5, 20_000)
+    sketch = QuantileSketch(k=200)
+    for chunk in np.array_split(values, 9):
+        sketch.update(chunk)
+    assert not sketch.is_exact
+    estimate = sketch.quantile(0.5)
+    rank = (values <= estimate).mean()
+    assert abs(rank - 0.5) < 0.02
+
+
+def test_frequent_items_exact_until_capacity():
+    sketch = FrequentItems(capacity=10)
+    sketch.update([1, 2, 2, 3]).update([2, 3, 3, 3])
+    assert sketch.is_exact
+    assert sketch.most_common() == 3
+
+
+def test_frequent_items_finds_heavy_hitter_after_decrements():
+    rng = np.random.default_rng(3)
+    values = np.concatenate([rng.integers(0, 5000, 5000), np.full(2000, 7)])
+    rng.shuffle(values)
+    sketch = FrequentItems(capacity=20)
+    for chunk in np.array_split(values, 10):
+        sketch.update(chunk)
+    assert not sketch.is_exact
+    assert sketch.most_common() == 7
+
+
+def test_frequent_items_bounds_proven_mode_and_round_trip():
+    rng = np.random.default_rng(5)
+    values = pd.Series(np.concatenate([rng.integers(0, 3000, 6000), np.full(1500, 7), np.full(900, 11)]))
+    values = values.sample(frac=1, random_state=1)
+    left, right = FrequentItems(capacity=30), FrequentItems(capacity=30)
+    for i, chunk in enumerate(np.array_split(values.to_numpy(), 8)):
+        (left if i % 2 else right).update(chunk)
+    sketch = FrequentItems.from_dict(left.merge(right).to_dict())
+    counts = values.value_counts()
+    assert not sketch.is_exact
+    for value, low, high in sketch.top(5):
+        assert low <= counts[value] <= high
+    assert sketch.proven_mode() == [7]
+
+    tied = FrequentItems(capacity=10).update(["b", "a", "a", "b", "c"])
+    assert tied.proven_mode() == pd.Series(["b", "a", "a", "b", "c"]).mode().tolist()
+    assert FrequentItems(capacity=2).update([1, 2, 3, 4, 1, 2, 3]).proven_mode() is None
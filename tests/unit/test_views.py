@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from app.data_mining.views import DataSource, decode_rows, encode_rows
+
+
+def _csv(tmp_path, rows=23):
+    path = tmp_path / "pai.csv"
+    pd.DataFrame({"a": range(rows), "b": [float(i * i) for i in range(rows)]}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_row_index_roundtrip_keeps_order():
+    positions = np.array([9, 2, 2, 40, 0])
+    assert decode_rows(encode_rows(positions)).tolist() == positions.tolist()
+    assert len(encode_rows(np.arange(0, 100_000, 3))) < 1_000
+
+
+def test_select_composes_positions_over_the_parent(tmp_path):
+    source = DataSource(_csv(tmp_path)).select([1, 5, 9, 13]).select([3, 0])
+    assert source.rows.tolist() == [13, 1]
+    assert source.read()["a"].tolist() == [13, 1]
+
+
+def test_iter_matches_read_for_unsorted_rows_and_transforms(tmp_path):
+    transform = {"step": "normalization", "method": "minmax", "columns": {"b": {"min": 0.0, "max": 100.0}}}
+    source = DataSource(_csv(tmp_path)).select([20, 3, 7, 4, 11, 0, 18]).then(transform)
+    chunks = list(source.iter(3))
+    assert [len(c) for c in chunks] == [3, 3, 1]
+    assert chunks[-1].index.tolist() == [6]
+    pd.testing.assert_frame_equal(pd.concat(chunks), source.read())
+    assert source.read()["b"].tolist()[:2] == [4.0, 0.09]
+
+
+def test_read_first_rows_of_a_view(tmp_path):
+    source = DataSource(_csv(tmp_path)).select([4, 2, 8, 1])
+    assert source.read(nrows=2)["a"].tolist() == [4, 2]
+    assert len(DataSource(_csv(tmp_path)).read(nrows=3)) == 3